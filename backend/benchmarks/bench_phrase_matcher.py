@@ -0,0 +1,88 @@
+"""
+Benchmark: phrase matching cost as the phrase dictionary grows.
+Compares the token-trie PhraseMatcher with the old substring scan
+(`if phrase in text` + `str.replace` per phrase).
+python benchmarks/bench_phrase_matcher.py
+"""
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.phrase_matcher import PhraseMatcher
+
+PHRASE_COUNTS = [15, 100, 1_000, 10_000, 50_000]
+
+
+def make_vocabulary(rng: random.Random, size: int) -> list[str]:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))))
+    return sorted(words)
+
+
+def make_phrases(rng: random.Random, vocab: list[str], count: int) -> list[list[str]]:
+    phrases = set()
+    while len(phrases) < count:
+        phrases.add(tuple(rng.choices(vocab, k=rng.randint(2, 5))))
+    return [list(p) for p in phrases]
+
+
+def legacy_match(text: str, phrases: list[str]) -> str:
+    for phrase in phrases:
+        if phrase in text:
+            text = text.replace(phrase, phrase.replace(" ", "_").upper())
+    return text
+
+
+def time_per_call(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Phrase matcher scaling benchmark")
+    parser.add_argument("--tokens", type=int, default=200, help="Tokens per input text")
+    parser.add_argument("--repeat", type=int, default=200, help="Calls per measurement")
+    parser.add_argument("--legacy", action="store_true", help="Also time the old substring scan")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocab = make_vocabulary(rng, 20_000)
+    all_phrases = make_phrases(rng, vocab, max(PHRASE_COUNTS))
+    words = rng.choices(vocab, k=args.tokens)
+    # Plant a few real phrases so the matcher has work to do
+    for phrase in all_phrases[:10]:
+        pos = rng.randrange(0, len(words))
+        words[pos:pos] = phrase
+    text = " ".join(words)
+
+    header = f"{'phrases':>8}  {'trie µs/call':>13}"
+    if args.legacy:
+        header += f"  {'legacy µs/call':>15}"
+    print(f"Input: {len(words)} tokens\n")
+    print(header)
+
+    for count in PHRASE_COUNTS:
+        phrases = all_phrases[:count]
+        matcher = PhraseMatcher()
+        for phrase in phrases:
+            matcher.add(phrase, " ".join(phrase))
+
+        trie_t = time_per_call(lambda: matcher.segment(words), args.repeat)
+        line = f"{count:>8}  {trie_t * 1e6:>13.1f}"
+        if args.legacy:
+            joined = sorted((" ".join(p) for p in phrases), key=len, reverse=True)
+            legacy_t = time_per_call(lambda: legacy_match(text, joined), max(1, args.repeat // 20))
+            line += f"  {legacy_t * 1e6:>15.1f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: import time and memory of the gloss module in a fresh interpreter.
+Fails (exit 1) if the default rule path imports spaCy.
+python benchmarks/bench_startup.py [--linguistic]
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Runs in a child process so every measurement starts from a cold interpreter
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+from services.isl_grammar import convert_to_isl_gloss, get_gloss_engine
+get_gloss_engine()
+imported = time.perf_counter()
+convert_to_isl_gloss("Good morning teacher, I am absent today", "rule")
+rule_done = time.perf_counter()
+result = {
+    "import_ms": (imported - start) * 1000,
+    "first_rule_call_ms": (rule_done - imported) * 1000,
+    "spacy_loaded_after_rule": "spacy" in sys.modules,
+    "max_rss_mb_after_rule": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}
+if LINGUISTIC:
+    convert_to_isl_gloss("The birds are running to school", "linguistic")
+    result["first_linguistic_call_ms"] = (time.perf_counter() - rule_done) * 1000
+    result["max_rss_mb_after_linguistic"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps(result))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gloss module startup benchmark")
+    parser.add_argument("--linguistic", action="store_true", help="Also load the spaCy pipeline")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to average over")
+    args = parser.parse_args()
+
+    code = f"LINGUISTIC = {args.linguistic}\n{PROBE}"
+    runs = []
+    for _ in range(args.runs):
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    for key in runs[0]:
+        values = [r[key] for r in runs]
+        if isinstance(values[0], bool):
+            print(f"{key:>30}: {any(values)}")
+        else:
+            print(f"{key:>30}: {sum(values) / len(values):.1f}")
+
+    if any(r["spacy_loaded_after_rule"] for r in runs):
+        print("FAIL: the rule gloss path imported spaCy")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Benchmark suite for the gloss / lookup hot path and the HTTP layer.
+
+Cases:
+- gloss/<category>, lookup/<category>: convert_to_isl_gloss and resolve_clips
+  over each tests/phase1/prompts.json category
+- gloss/long_text, lookup/long_text: a seeded synthetic 2,000-word text
+- synthetic_dict/*: the same text against a synthetic 50,000-entry dictionary,
+  plus per-token ClipIndex.match() for exact, lemma ("+s") and missing tokens
+  and ClipIndex.fuzzy_match() (one edit allowed) for one-typo tokens, and loading it from JSON vs the compiled .idx form
+- http/*: the FastAPI app in-process (httpx ASGI transport), including
+  /api/transcribe against stub S3 / Transcribe clients (no AWS needed)
+
+Each case records throughput and p50/p99 latency. With --save the results
+become the baseline; otherwise they are compared to it and the script exits
+non-zero if any case's p50 or p99 regressed beyond --tolerance, or if there
+is no baseline. benchmarks/baseline.json is committed; re-record it with
+--save on the machine that runs the check (e.g. the CI runner).
+
+python benchmarks/bench_suite.py --save          # record benchmarks/baseline.json
+python benchmarks/bench_suite.py                 # compare against it
+python benchmarks/bench_suite.py --only gloss/   # subset by case-name prefix
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(Path(__file__).parent))
+os.chdir(BACKEND_DIR)
+
+import httpx
+
+import main
+from load_transcribe import StubS3Client, StubTranscribeClient, StubTranscribeService, percentile
+from routes.text_to_isl import gloss_cache
+from services import transcribe
+from services.clip_index import FUZZY_MAX_EDITS, FUZZY_MIN_LENGTH, ClipIndex, get_clip_index
+from services.compiled_dictionary import build
+from services.isl_grammar import GlossEngine, convert_to_isl_gloss
+from services.isl_lookup import resolve_clips
+from services.s3 import S3Service
+
+# Per-request INFO logs would dominate the timings
+logging.disable(logging.WARNING)
+
+PROMPTS_PATH = BACKEND_DIR / "tests" / "phase1" / "prompts.json"
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+# Differences below this many ms are timer noise, never a regression
+NOISE_FLOOR_MS = 0.05
+# With fewer samples p99 is just the slowest call, so only p50 is compared
+MIN_P99_OPS = 100
+
+
+def timeit(func, items: list, iterations: int) -> dict:
+    """Run func(item) for every item, `iterations` times; per-call latency stats."""
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for item in items:
+            t = time.perf_counter()
+            func(item)
+            latencies.append((time.perf_counter() - t) * 1000)
+    elapsed = time.perf_counter() - start
+    return summarize(latencies, elapsed)
+
+
+def summarize(latencies: list[float], elapsed: float) -> dict:
+    return {
+        "ops": len(latencies),
+        "ops_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(statistics.median(latencies), 4),
+        "p99_ms": round(percentile(latencies, 99), 4),
+    }
+
+
+def synthetic_text(vocabulary: list[str], words: int, seed: int) -> str:
+    """Deterministic text mixing dictionary words, filler words and unknowns."""
+    rng = random.Random(seed)
+    filler = ["the", "is", "a", "very", "and", "to", "was", "i'm", "don't", "zorblat", "quux"]
+    pool = vocabulary + filler
+    return " ".join(rng.choice(pool) for _ in range(words))
+
+
+def typo(word: str, rng: random.Random) -> str:
+    """`word` with one character substituted."""
+    i = rng.randrange(len(word))
+    return word[:i] + ("z" if word[i] != "z" else "y") + word[i + 1:]
+
+
+def synthetic_engine(entries: int, seed: int) -> tuple[GlossEngine, list[str], dict]:
+    """GlossEngine over a synthetic dictionary of one-, two- and three-word phrases."""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(entries // 2)]
+    dictionary = {}
+    while len(dictionary) < entries:
+        phrase = " ".join(rng.choice(words) for _ in range(rng.choice((1, 1, 2, 3))))
+        dictionary[phrase] = f"{phrase.replace(' ', '_')}.mp4"
+    dictionary["UNKNOWN"] = "unknown.webm"
+    # clips_dir=None: don't stat 50k files that don't exist
+    index = ClipIndex(dictionary, version=f"synthetic-{entries}", clips_dir=None, fuzzy_edits=1)
+    return GlossEngine.from_index(index), words, dictionary
+
+
+def load_cases(dictionary: dict, iterations: int) -> dict:
+    """ClipIndex.from_file (plus the gloss engine) from JSON vs from the compiled file."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "dictionary.json"
+        manifest = Path(tmp) / "clip_manifest.json"
+        compiled_path = Path(tmp) / "dictionary.idx"
+        source.write_text(json.dumps(dictionary))
+        build(source, compiled_path, manifest, FUZZY_MAX_EDITS, FUZZY_MIN_LENGTH)
+
+        def load(path):
+            index = ClipIndex.from_file(source, manifest, compiled_path=path)
+            return GlossEngine.from_index(index)
+
+        results["synthetic_dict/load_json"] = timeit(load, [None], iterations)
+        results["synthetic_dict/load_compiled"] = timeit(load, [compiled_path], iterations)
+    return results
+
+
+async def http_cases(iterations: int, long_text: str) -> dict:
+    main.s3_service = S3Service(client=StubS3Client(0.0))
+    main.transcribe_service = StubTranscribeService(client=StubTranscribeClient(0.0))
+    transcribe.POLL_INITIAL_DELAY = 0.0
+
+    results = {}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def measure(name: str, make_request, count: int):
+            latencies = []
+            start = time.perf_counter()
+            for i in range(count):
+                t = time.perf_counter()
+                r = await make_request(i)
+                r.raise_for_status()
+                latencies.append((time.perf_counter() - t) * 1000)
+            results[name] = summarize(latencies, time.perf_counter() - start)
+
+        # Warm up routing, validation and lazy imports before timing anything
+        for i in range(20):
+            await client.post("/api/text-to-isl", json={"text": f"warm up {i}"})
+
+        gloss_cache.clear()
+        await measure("http/text_to_isl_cached",
+                      lambda i: client.post("/api/text-to-isl", json={"text": "good morning teacher"}),
+                      iterations * 20)
+        await measure("http/text_to_isl_uncached",
+                      lambda i: client.post("/api/text-to-isl", json={"text": f"good morning teacher {i}"}),
+                      iterations * 20)
+        await measure("http/text_to_isl_long",
+                      lambda i: client.post("/api/text-to-isl", json={"text": f"{long_text} {i}"}),
+                      iterations)
+        await measure("http/batch_100",
+                      lambda i: client.post("/api/text-to-isl/batch",
+                                            json={"texts": [f"I am absent today {i} {j}" for j in range(100)]}),
+                      iterations)
+        await measure("http/clip",
+                      lambda i: client.get("/clips/hello.webm"),
+                      iterations * 5)
+        await measure("http/transcribe_stub",
+                      lambda i: client.post("/api/transcribe",
+                                            files={"audio": ("a.mp3", b"\0" * 4096, "audio/mpeg")},
+                                            data={"language_code": "en-IN"}),
+                      iterations)
+    return results
+
+
+def run(args) -> dict:
+    with open(PROMPTS_PATH) as f:
+        categories = json.load(f)["test_categories"]
+
+    def selected(group: str) -> bool:
+        return any(group.startswith(p) or p.startswith(group) for p in args.only)
+
+    vocabulary = list(get_clip_index().entries)
+    long_text = synthetic_text(vocabulary, 2000, args.seed)
+    results = {}
+
+    if selected("gloss/") or selected("lookup/"):
+        for name, prompts in categories.items():
+            results[f"gloss/{name}"] = timeit(convert_to_isl_gloss, prompts, args.iterations * 20)
+            glosses = [convert_to_isl_gloss(p) for p in prompts]
+            results[f"lookup/{name}"] = timeit(resolve_clips, glosses, args.iterations * 20)
+
+        results["gloss/long_text"] = timeit(convert_to_isl_gloss, [long_text], args.iterations)
+        results["lookup/long_text"] = timeit(resolve_clips, [convert_to_isl_gloss(long_text)], args.iterations)
+
+    if selected("synthetic_dict/"):
+        start = time.perf_counter()
+        engine, words, dictionary = synthetic_engine(args.dict_size, args.seed)
+        elapsed = time.perf_counter() - start
+        results["synthetic_dict/build"] = summarize([elapsed * 1000], elapsed)
+        synthetic_long = synthetic_text(words[:5000], 2000, args.seed)
+        results["synthetic_dict/gloss_long_text"] = timeit(engine.convert, [synthetic_long], args.iterations)
+        synthetic_gloss = engine.convert(synthetic_long)
+        results["synthetic_dict/lookup_long_text"] = timeit(
+            lambda g: resolve_clips(g, "local", engine.index), [synthetic_gloss], args.iterations
+        )
+
+        rng = random.Random(args.seed)
+        sample = [w for w in rng.sample(words, 500) if len(w) >= 4]
+        tokens = {
+            "exact": sample,
+            "lemma": [w + "s" for w in sample],
+            "fuzzy": [typo(w, rng) for w in sample],
+            "miss": ["q" * len(w) for w in sample],
+        }
+        for kind, items in tokens.items():
+            match = engine.index.fuzzy_match if kind == "fuzzy" else engine.index.match
+            results[f"synthetic_dict/match_{kind}"] = timeit(match, items, args.iterations)
+        results.update(load_cases(dictionary, args.iterations))
+
+    if selected("http/"):
+        results.update(asyncio.run(http_cases(args.iterations, long_text)))
+    return {k: v for k, v in results.items() if k.startswith(tuple(args.only))}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Cases whose p50 (or p99, given MIN_P99_OPS samples) got slower than baseline * (1 + tolerance)."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        metrics = ("p50_ms", "p99_ms") if min(current["ops"], base["ops"]) >= MIN_P99_OPS else ("p50_ms",)
+        for metric in metrics:
+            limit = base[metric] * (1 + tolerance)
+            if current[metric] > limit and current[metric] - base[metric] > NOISE_FLOOR_MS:
+                regressions.append(
+                    f"{name} {metric}: {current[metric]:.4f} ms vs baseline {base[metric]:.4f} ms"
+                )
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Gloss / lookup / HTTP benchmark suite")
+    parser.add_argument("--iterations", type=int, default=20, help="Scales how many times each case runs")
+    parser.add_argument("--dict-size", type=int, default=50_000, help="Synthetic dictionary entries")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--only", nargs="*", default=[""], help="Case-name prefixes to run")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--save", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed slowdown (0.5 = +50%%)")
+    args = parser.parse_args()
+
+    results = run(args)
+
+    print(f"{'case':<40} {'ops/s':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<40} {r['ops_per_sec']:>10.1f} {r['p50_ms']:>10.4f} {r['p99_ms']:>10.4f}")
+
+    baseline_path = Path(args.baseline)
+    if args.save:
+        # Merge so a subset run (--only) doesn't drop the other cases
+        baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        baseline.update(results)
+        baseline_path.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"\nSaved baseline to {baseline_path}")
+        return
+
+    if not baseline_path.exists():
+        print(f"\nFAIL: no baseline at {baseline_path}; run with --save first.")
+        sys.exit(2)
+
+    regressions = compare(results, json.loads(baseline_path.read_text()), args.tolerance)
+    if regressions:
+        print(f"\nFAIL: {len(regressions)} regression(s) beyond +{args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"\nOK: no regressions beyond +{args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main_cli()
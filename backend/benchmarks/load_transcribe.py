@@ -0,0 +1,138 @@
+"""
+Load test: text-to-ISL latency while transcriptions are in flight.
+Runs the FastAPI app in-process with stub S3 / Transcribe clients
+(no AWS account or network needed).
+python benchmarks/load_transcribe.py --transcriptions 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.chdir(BACKEND_DIR)
+
+import httpx
+
+import main
+from services import transcribe
+from services.s3 import S3Service
+from services.transcribe import TranscribeService
+
+
+class StubS3Client:
+    """Blocking uploads with a fixed latency, like a slow real upload."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def put_object(self, **kwargs):
+        time.sleep(self.latency)
+
+    def upload_fileobj(self, fileobj, bucket, key, **kwargs):
+        while fileobj.read(1024 * 1024):
+            pass
+        time.sleep(self.latency)
+
+
+class StubTranscribeClient:
+    """Jobs complete a fixed number of seconds after they are started."""
+
+    def __init__(self, job_seconds: float):
+        self.job_seconds = job_seconds
+        self.ready_at = {}
+
+    def start_transcription_job(self, TranscriptionJobName, **kwargs):
+        self.ready_at[TranscriptionJobName] = time.monotonic() + self.job_seconds
+
+    def get_transcription_job(self, TranscriptionJobName):
+        time.sleep(0.02)  # API round trip
+        done = time.monotonic() >= self.ready_at[TranscriptionJobName]
+        return {"TranscriptionJob": {
+            "TranscriptionJobStatus": "COMPLETED" if done else "IN_PROGRESS",
+            "Transcript": {"TranscriptFileUri": f"stub://{TranscriptionJobName}"},
+        }}
+
+    def delete_transcription_job(self, **kwargs):
+        pass
+
+
+class StubTranscribeService(TranscribeService):
+    def _get_transcript_text(self, transcript_uri: str) -> str:
+        return "good morning teacher"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+async def measure_text_to_isl(client: httpx.AsyncClient, requests: int, phase: str) -> list[float]:
+    latencies = []
+    for i in range(requests):
+        start = time.perf_counter()
+        # Distinct texts per phase so the gloss cache doesn't hide the work
+        r = await client.post("/api/text-to-isl", json={"text": f"good morning teacher {phase} {i}"})
+        r.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def transcribe_once(client: httpx.AsyncClient):
+    r = await client.post(
+        "/api/transcribe",
+        files={"audio": ("lecture.mp3", b"\0" * 1024, "audio/mpeg")},
+        data={"language_code": "en-IN"},
+        timeout=None,
+    )
+    r.raise_for_status()
+
+
+def report(label: str, latencies: list[float]):
+    print(
+        f"{label:>22}: p50 {statistics.median(latencies):6.2f} ms   "
+        f"p99 {percentile(latencies, 99):6.2f} ms   max {max(latencies):6.2f} ms"
+    )
+
+
+async def run(args):
+    main.s3_service = S3Service(client=StubS3Client(args.upload_latency))
+    main.transcribe_service = StubTranscribeService(client=StubTranscribeClient(args.job_seconds))
+    transcribe.POLL_INITIAL_DELAY = 0.1
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        baseline = await measure_text_to_isl(client, args.requests, "idle")
+
+        jobs = [asyncio.create_task(transcribe_once(client)) for _ in range(args.transcriptions)]
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        loaded = await measure_text_to_isl(client, args.requests, "loaded")
+        await asyncio.gather(*jobs)
+        total = time.perf_counter() - start
+
+    report("idle", baseline)
+    report(f"{args.transcriptions} transcriptions", loaded)
+    print(f"{'transcriptions done in':>22}: {total:.2f} s")
+
+    # Blocking the loop would push every text-to-ISL call behind an upload/poll
+    if percentile(loaded, 99) > percentile(baseline, 99) * 5 + 50:
+        print("FAIL: text-to-ISL latency degraded while transcriptions were running")
+        sys.exit(1)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Transcription load test with stub AWS clients")
+    parser.add_argument("--transcriptions", type=int, default=20, help="Concurrent transcription requests")
+    parser.add_argument("--requests", type=int, default=200, help="text-to-ISL requests per phase")
+    parser.add_argument("--upload-latency", type=float, default=0.5, help="Stub S3 put_object seconds")
+    parser.add_argument("--job-seconds", type=float, default=2.0, help="Stub Transcribe job duration")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
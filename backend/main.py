@@ -1,14 +1,26 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import PlainTextResponse
+from starlette.routing import Mount
 from dotenv import load_dotenv
 import os
+import time
 import logging
 
 from services.s3 import S3Service
 from services.transcribe import TranscribeService
+from services.aws_executor import shutdown_executor
+from services.media import detect_audio_format
+from services.jobs import TranscriptionJobManager, create_job_store
+from services.clip_server import ClipStaticFiles
+from services.metrics import HTTP_REQUESTS, HTTP_SECONDS, REGISTRY
 from models.schemas import TranscribeResponse, ErrorResponse
-from routes.text_to_isl import router as text_to_isl_router
+from routes.text_to_isl import router as text_to_isl_router, gloss_cache
+from routes.transcribe_jobs import router as transcribe_jobs_router
+from routes.stream_isl import router as stream_isl_router, stream_metrics
+from services.isl_grammar import get_gloss_engine
+from services.streaming_asr import asr_backend_available, asr_backend_name
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,10 +33,30 @@ load_dotenv()
 s3_service = S3Service()
 transcribe_service = TranscribeService()
 
+# Compile the gloss engine once so the first request doesn't pay for it
+get_gloss_engine()
+
+# An unknown STREAM_ASR_BACKEND fails startup; a missing optional package only disables /ws/stream-isl
+if not asr_backend_available(asr_backend_name()):
+    logger.warning("STREAM_ASR_BACKEND=aws but amazon-transcribe is not installed; /ws/stream-isl will refuse connections")
+
+job_manager = TranscriptionJobManager(create_job_store(), s3_service, transcribe_service)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.job_manager = job_manager
+    job_manager.start()
+    yield
+    await job_manager.stop()
+    shutdown_executor()
+
+
 app = FastAPI(
     title="Samvad AI Backend",
     description="Sign language interpretation API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -40,9 +72,43 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Cache counters are read at scrape time
+REGISTRY.gauge_func("samvad_gloss_cache_hits_total", "Gloss cache hits", lambda: gloss_cache.hits, "counter")
+REGISTRY.gauge_func("samvad_gloss_cache_misses_total", "Gloss cache misses", lambda: gloss_cache.misses, "counter")
+REGISTRY.gauge_func("samvad_gloss_cache_hit_ratio", "Gloss cache hit ratio", lambda: gloss_cache.stats()["hit_rate"])
+REGISTRY.gauge_func("samvad_gloss_cache_entries", "Gloss cache size", lambda: len(gloss_cache))
+REGISTRY.gauge_func("samvad_stream_isl_active", "Open /ws/stream-isl connections", lambda: stream_metrics.active)
+
+
+def _route_label(request: Request) -> str:
+    """Route template (or mount path), never the raw URL, to keep label cardinality fixed"""
+    route = request.scope.get("route")
+    if route is not None:
+        return route.path
+    for mount in app.routes:
+        if isinstance(mount, Mount) and request.url.path.startswith(mount.path + "/"):
+            return mount.path
+    return "unmatched"
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = _route_label(request)
+        HTTP_REQUESTS.inc(method=request.method, route=route, status=status)
+        HTTP_SECONDS.observe(time.perf_counter() - start, method=request.method, route=route)
+
 # Mount ISL clips static files and register text-to-isl route
-app.mount("/clips", StaticFiles(directory="isl_clips"), name="clips")
+app.mount("/clips", ClipStaticFiles(directory="isl_clips"), name="clips")
 app.include_router(text_to_isl_router)
+app.include_router(transcribe_jobs_router)
+app.include_router(stream_isl_router)
 
 @app.get("/")
 def root():
@@ -62,6 +128,11 @@ def health_check():
         "timestamp": "2026-02-25"
     }
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Prometheus text exposition of request, stage, cache and coverage metrics"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/api/status")
 def get_status():
     """Get detailed system status"""
@@ -72,7 +143,9 @@ def get_status():
             "transcribe": "ready",
             "polly": "ready",
             "bedrock": "ready"
-        }
+        },
+        "gloss_cache": gloss_cache.stats(),
+        "stream_isl": stream_metrics.stats()
     }
 
 @app.post("/api/transcribe", response_model=TranscribeResponse)
@@ -95,16 +168,15 @@ async def transcribe_audio(
         if not audio.content_type.startswith('audio/'):
             raise HTTPException(status_code=400, detail="File must be an audio file")
         
-        # Read file content
-        file_content = await audio.read()
+        content_type, media_format = detect_audio_format(audio.file, audio.filename, audio.content_type)
         
-        # Upload to S3
-        logger.info(f"Uploading audio file to S3: {audio.filename}")
-        s3_uri = s3_service.upload_audio_file(file_content, audio.filename)
+        # Stream to S3 in multipart chunks instead of reading the whole file
+        logger.info(f"Uploading audio file to S3: {audio.filename} ({media_format})")
+        s3_uri = await s3_service.upload_audio_stream_async(audio.file, audio.filename, content_type)
         
         # Transcribe audio
         logger.info(f"Starting transcription for: {s3_uri}")
-        result = transcribe_service.transcribe_audio(s3_uri, language_code)
+        result = await transcribe_service.transcribe_audio_async(s3_uri, language_code, media_format)
         
         # Return response
         return TranscribeResponse(
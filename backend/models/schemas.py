@@ -19,3 +19,20 @@ class ErrorResponse(BaseModel):
     """Error response model"""
     error: str = Field(description='Error message')
     detail: Optional[str] = Field(default=None, description='Detailed error information')
+
+class TranscriptionJobResponse(BaseModel):
+    """Status of an asynchronous transcription job"""
+    job_id: str = Field(description='Job ID to poll')
+    status: str = Field(description='queued, uploading, transcribing, completed or failed')
+    language_code: str = Field(description='Language code used')
+    transcript: Optional[str] = Field(default=None, description='Transcribed text once completed')
+    error: Optional[str] = Field(default=None, description='Failure reason if failed')
+    s3_uri: Optional[str] = Field(default=None, description='S3 URI of uploaded audio')
+    created_at: float = Field(description='Unix time the job was submitted')
+    updated_at: float = Field(description='Unix time of the last status change')
+
+    @classmethod
+    def from_job(cls, job: dict) -> "TranscriptionJobResponse":
+        return cls(job_id=job["id"], **{k: job.get(k) for k in (
+            "status", "language_code", "transcript", "error", "s3_uri", "created_at", "updated_at"
+        )})
@@ -0,0 +1,237 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from starlette.websockets import WebSocketState
+from collections import deque
+from services.isl_grammar import get_gloss_engine
+from services.isl_lookup import resolve_clips
+from services.streaming_asr import ASRBackendUnavailable, create_asr_backend
+import asyncio
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Per-connection audio buffering: at most QUEUE_CHUNKS chunks of MAX_CHUNK_BYTES.
+# When the queue is full we stop reading the socket, which pushes back on the client.
+QUEUE_CHUNKS = int(os.getenv("STREAM_QUEUE_CHUNKS", "32"))
+MAX_CHUNK_BYTES = int(os.getenv("STREAM_MAX_CHUNK_BYTES", str(64 * 1024)))
+
+
+class StreamMetrics:
+    """Audio-chunk → clip-URL latency over the most recent emissions."""
+
+    def __init__(self, window: int = 1000):
+        self._latencies = deque(maxlen=window)
+        self.connections = 0
+        self.active = 0
+        self.emitted = 0
+        self.rejected_chunks = 0
+
+    def record(self, latency_ms: float):
+        self._latencies.append(latency_ms)
+        self.emitted += 1
+
+    def stats(self) -> dict:
+        values = sorted(self._latencies)
+        if not values:
+            return {"connections": self.connections, "active": self.active, "emitted": self.emitted,
+                    "rejected_chunks": self.rejected_chunks, "latency_ms": None}
+        return {
+            "connections": self.connections,
+            "active": self.active,
+            "emitted": self.emitted,
+            "rejected_chunks": self.rejected_chunks,
+            "latency_ms": {
+                "p50": round(values[len(values) // 2], 2),
+                "p95": round(values[min(len(values) - 1, int(len(values) * 0.95))], 2),
+                "max": round(values[-1], 2),
+            },
+        }
+
+
+stream_metrics = StreamMetrics()
+
+
+def _stable_prefix(previous: list[str], current: list[str]) -> list[str]:
+    """Words that are unchanged between two consecutive partial transcripts."""
+    stable = []
+    for a, b in zip(previous, current):
+        if a != b:
+            break
+        stable.append(a)
+    return stable
+
+
+def _new_tokens(sent: list[str], gloss: list[str]) -> list[str] | None:
+    """
+    The tokens `gloss` adds after the already-sent ones, or None when it
+    doesn't extend them (a phrase merged or a time word moved to the front).
+    """
+    if gloss[:len(sent)] != sent:
+        return None
+    return gloss[len(sent):]
+
+
+def _open(websocket: WebSocket) -> bool:
+    """Neither side has closed the socket (the receiver task may have, e.g. for an oversized chunk)."""
+    return (websocket.application_state == WebSocketState.CONNECTED
+            and websocket.client_state == WebSocketState.CONNECTED)
+
+
+async def _send(websocket: WebSocket, message: dict) -> bool:
+    """Send a JSON message if the socket is still open; False instead of a send-after-close error."""
+    if not _open(websocket):
+        return False
+    await websocket.send_json(message)
+    return True
+
+
+def _is_end_message(text: str) -> bool:
+    """Accept either a bare "end" or {"type": "end"}."""
+    text = text.strip()
+    if text.lower() == "end":
+        return True
+    try:
+        control = json.loads(text)
+    except ValueError:
+        return False
+    return isinstance(control, dict) and control.get("type") == "end"
+
+
+async def _receive_audio(websocket: WebSocket, queue: asyncio.Queue):
+    """Move client audio into the queue; None marks the end of the stream."""
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            data = message.get("bytes")
+            if data is None:
+                # Text frames are control messages; "end" finishes the stream
+                if _is_end_message(message.get("text") or ""):
+                    break
+                continue
+            if len(data) > MAX_CHUNK_BYTES:
+                stream_metrics.rejected_chunks += 1
+                await websocket.close(code=1009, reason=f"Audio chunk exceeds {MAX_CHUNK_BYTES} bytes")
+                break
+            await queue.put((data, time.monotonic()))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await queue.put(None)
+
+
+@router.websocket("/ws/stream-isl")
+async def stream_isl(websocket: WebSocket, language_code: str = "en-IN"):
+    """
+    Live speech → ISL.
+    Client sends binary frames of 16kHz 16-bit mono PCM and a text "end"
+    frame when done. Server sends JSON messages:
+      { type: "partial" | "final", text, gloss, clips, replace, latency_ms }
+    and a closing { type: "summary", ... } with per-connection latency stats.
+    Messages are incremental per utterance: `gloss` / `clips` hold only the
+    signs not sent yet, so a client plays them in order. When a longer
+    transcript re-orders the gloss (a phrase merges, a time word moves to the
+    front), the message has replace: true and carries the utterance's whole
+    gloss; the client drops what it queued for the utterance. `text` is
+    always the utterance so far. A final ends the utterance (its clips may
+    be empty if the partials already covered it).
+    If the ASR backend can't run, sends { type: "error", detail } and
+    closes with code 1011.
+    """
+    await websocket.accept()
+    try:
+        backend = create_asr_backend(language_code)
+    except ASRBackendUnavailable as e:
+        logger.error(f"stream-isl unavailable: {e}")
+        await websocket.send_json({"type": "error", "detail": "Live transcription is not available on this server"})
+        await websocket.close(code=1011, reason="ASR backend unavailable")
+        return
+
+    stream_metrics.connections += 1
+    stream_metrics.active += 1
+
+    queue = asyncio.Queue(maxsize=QUEUE_CHUNKS)
+    receiver = asyncio.create_task(_receive_audio(websocket, queue))
+    clip_mode = os.getenv("ISL_CLIPS_MODE", "local")
+    latencies = []
+
+    # Gloss tokens of the current utterance the client already has
+    sent_gloss = []
+
+    async def emit(kind: str, text: str, chunk_time: float) -> bool:
+        """Send the utterance's new signs; False once the socket is closed."""
+        nonlocal sent_gloss
+        engine = get_gloss_engine()
+        gloss = engine.convert(text)
+        if not gloss:
+            return True
+        new = _new_tokens(sent_gloss, gloss)
+        replace = new is None
+        if replace:
+            new = gloss
+        elif not new and kind == "partial":
+            return True
+        clips = resolve_clips(new, clip_mode, engine.index)
+        latency_ms = (time.monotonic() - chunk_time) * 1000
+        if clips:
+            latencies.append(latency_ms)
+            stream_metrics.record(latency_ms)
+        sent_gloss = gloss
+        return await _send(websocket, {
+            "type": kind,
+            "text": text,
+            "gloss": new,
+            "clips": clips,
+            "replace": replace,
+            "latency_ms": round(latency_ms, 2),
+        })
+
+    try:
+        previous_words = []
+        emitted_words = 0
+
+        async for event in backend.stream(queue):
+            words = event.text.split()
+            if event.is_final:
+                connected = await emit("final", event.text, event.chunk_time)
+                previous_words = []
+                emitted_words = 0
+                sent_gloss = []
+            else:
+                # Only send partials once their words have settled, and only if they grew
+                stable = _stable_prefix(previous_words, words)
+                previous_words = words
+                connected = True
+                if len(stable) > emitted_words:
+                    emitted_words = len(stable)
+                    connected = await emit("partial", " ".join(stable), event.chunk_time)
+            if not connected:
+                break
+
+        if latencies:
+            ordered = sorted(latencies)
+            await _send(websocket, {
+                "type": "summary",
+                "messages": len(ordered),
+                "latency_ms": {
+                    "p50": round(ordered[len(ordered) // 2], 2),
+                    "max": round(ordered[-1], 2),
+                },
+            })
+        if _open(websocket):
+            await websocket.close()
+    except WebSocketDisconnect:
+        # Client went away mid-stream
+        pass
+    except Exception:
+        logger.exception("Error in stream-isl websocket")
+        if _open(websocket):
+            await websocket.close(code=1011, reason="Streaming error")
+    finally:
+        receiver.cancel()
+        stream_metrics.active -= 1
@@ -1,49 +1,300 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from services.isl_grammar import convert_to_isl_gloss
-from services.isl_lookup import resolve_clips
+from fastapi import APIRouter, HTTPException, Query, Response
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
+from services.isl_grammar import NLPUnavailable, get_gloss_engine
+from services.cache import LRUCache
+from services.isl_lookup import clip_filenames, renders_available, resolve_tokens
+from services.metrics import CLIP_LOOKUPS, GLOSS_COVERAGE, timed
+from services.render import RenderError, render_sequence
+from services.subtitles import parse_subtitles
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+MAX_BATCH_ITEMS = int(os.getenv("ISL_MAX_BATCH_ITEMS", "5000"))
+# Clips announced in the Link: rel=preload header of /api/text-to-isl
+PRELOAD_CLIPS = int(os.getenv("ISL_PRELOAD_CLIPS", "3"))
+# nlp.pipe worker processes for linguistic batches; server config, never per request
+NLP_PROCESSES = max(1, int(os.getenv("ISL_NLP_PROCESSES", "1")))
+
+# (normalized text, gloss mode, clip mode, fingerspell mode, dictionary version) → (gloss, clips, breakdown)
+gloss_cache = LRUCache(
+    maxsize=int(os.getenv("ISL_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("ISL_CACHE_TTL", "3600")) or None,
+)
+
 
 class TextToISLRequest(BaseModel):
     text: str
-    speed: float = 1.0
+    speed: float = Field(default=1.0, gt=0, le=4)
     persona: str = "maya"
+    gloss_mode: Literal["rule", "linguistic"] = "rule"
+    # Unknown tokens: placeholder clip, per-letter clips, or one stitched clip per word
+    fingerspell: Literal["off", "letters", "word"] = "off"
+    render: bool = False
 
 
 class ClipItem(BaseModel):
     word: str
     url: str
     found: bool
+    duration: Optional[float] = None
+    bytes: Optional[int] = None
+    # 'signed', 'lemma' (sign of the base word), 'fingerspelled', 'fuzzy' (typo match) or 'unknown'
+    kind: str = "signed"
+    # The letter/digit shown, for per-letter fingerspelling clips
+    letter: Optional[str] = None
+
+
+class CoverageBreakdown(BaseModel):
+    # Gloss tokens by how they are shown
+    signed: int = 0
+    lemma: int = 0
+    fingerspelled: int = 0
+    fuzzy: int = 0
+    unknown: int = 0
+
+
+class PlaybackItem(BaseModel):
+    url: str
+    # Seconds at the requested speed; None once a clip's duration is unknown
+    start: Optional[float] = None
+    duration: Optional[float] = None
+    bytes: Optional[int] = None
+
+
+class PlaybackManifest(BaseModel):
+    speed: float
+    # Total playing time at `speed`, None if any clip's duration is unknown
+    duration: Optional[float] = None
+    items: list[PlaybackItem]
 
 
 class TextToISLResponse(BaseModel):
     gloss: list[str]
     clips: list[ClipItem]
     coverage: float
+    breakdown: CoverageBreakdown = CoverageBreakdown()
     mode: str
+    # Single stitched video of all clips, set when render=true succeeds
+    render_url: Optional[str] = None
+    playback: Optional[PlaybackManifest] = None
+
+
+class TextToISLBatchRequest(BaseModel):
+    texts: list[str] = []
+    subtitles: Optional[str] = Field(default=None, description="Raw SRT or WebVTT content")
+    gloss_mode: Literal["rule", "linguistic"] = "rule"
+    fingerspell: Literal["off", "letters", "word"] = "off"
+    batch_size: int = Field(default=64, ge=1, le=1000, description="nlp.pipe batch size (linguistic mode)")
+
+
+class BatchItem(BaseModel):
+    text: str
+    start: Optional[float] = None
+    end: Optional[float] = None
+    gloss: list[str]
+    clips: list[ClipItem]
+    coverage: float
+    breakdown: CoverageBreakdown
+
+
+class TextToISLBatchResponse(BaseModel):
+    items: list[BatchItem]
+    coverage: float
+    breakdown: CoverageBreakdown
+    mode: str
+
+
+def _breakdown(groups) -> dict:
+    """Count gloss tokens by kind; each group holds one token's clips."""
+    counts = dict.fromkeys(CoverageBreakdown.model_fields, 0)
+    for group in groups:
+        counts[group[0]["kind"]] += 1
+    return counts
+
+
+def _coverage(breakdown: dict) -> float:
+    """Share of gloss tokens with their own signed clip (lemma, fuzzy and fingerspelling don't count)."""
+    tokens = sum(breakdown.values())
+    return round(breakdown["signed"] / tokens, 2) if tokens else 0.0
+
+
+def _record(breakdown: dict) -> float:
+    """Count tokens by kind and observe coverage (cache hits included). Returns coverage."""
+    for kind, count in breakdown.items():
+        CLIP_LOOKUPS.inc(count, result="found" if kind == "signed" else kind)
+    coverage = _coverage(breakdown)
+    GLOSS_COVERAGE.observe(coverage)
+    return coverage
+
+
+def _translate(text: str, gloss_mode: str, mode: str, engine, fingerspell: str = "off") -> tuple[tuple, tuple, dict]:
+    """(gloss, clips, breakdown) for text, through the gloss cache."""
+    # Gloss only depends on case-folded words, so normalize before keying
+    key = (" ".join(text.lower().split()), gloss_mode, mode, fingerspell, engine.index.version)
+
+    with timed("gloss_cache_lookup"):
+        cached = gloss_cache.get(key)
+    # Stitched fingerspelling points at render-cache files that may have been evicted since
+    if cached is not None and fingerspell == "word" and not renders_available(cached[1], engine.index):
+        cached = None
+    if cached is None:
+        try:
+            # Numbers are only glossed when they can be fingerspelled
+            gloss = engine.convert(text, gloss_mode, digits=fingerspell != "off")
+        except NLPUnavailable as e:
+            raise HTTPException(503, str(e))
+        groups = resolve_tokens(gloss, mode, engine.index, fingerspell) if gloss else []
+        clips_raw = tuple(c for group in groups for c in group)
+        cached = (tuple(gloss), clips_raw, _breakdown(groups))
+        gloss_cache.set(key, cached)
+    return cached
+
+
+def _playback(clips_raw: tuple, speed: float) -> PlaybackManifest:
+    """Start offsets and durations of the clip sequence at playback `speed`."""
+    items = []
+    offset = 0.0
+    for c in clips_raw:
+        duration = round(c["duration"] / speed, 3) if c["duration"] is not None else None
+        start = round(offset, 3) if offset is not None else None
+        items.append(PlaybackItem(url=c["url"], start=start, duration=duration, bytes=c["bytes"]))
+        offset = offset + duration if offset is not None and duration is not None else None
+    return PlaybackManifest(
+        speed=speed,
+        duration=round(offset, 3) if offset is not None else None,
+        items=items,
+    )
+
+
+def _preload_header(clips_raw: tuple) -> str:
+    """Link header value asking the client to fetch the first few distinct clips now."""
+    urls = list(dict.fromkeys(c["url"] for c in clips_raw))[:PRELOAD_CLIPS]
+    return ", ".join(f"<{url}>; rel=preload; as=video" for url in urls)
 
 
 @router.post("/api/text-to-isl", response_model=TextToISLResponse)
-def text_to_isl(req: TextToISLRequest):
+def text_to_isl(req: TextToISLRequest, response: Response):
     if not req.text.strip():
         raise HTTPException(400, "Text cannot be empty")
 
     mode = os.getenv("ISL_CLIPS_MODE", "local")
-    gloss = convert_to_isl_gloss(req.text)
+    # One snapshot for gloss + clips so a reload can't split the request
+    engine = get_gloss_engine()
+    gloss, clips_raw, breakdown = _translate(req.text, req.gloss_mode, mode, engine, req.fingerspell)
 
     if not gloss:
         return TextToISLResponse(gloss=[], clips=[], coverage=0.0, mode=mode)
 
-    clips_raw = resolve_clips(gloss, mode)
-    found_count = sum(1 for c in clips_raw if c["found"])
-    coverage = round(found_count / len(clips_raw), 2) if clips_raw else 0.0
+    if PRELOAD_CLIPS > 0:
+        response.headers["Link"] = _preload_header(clips_raw)
+
+    render_url = None
+    if req.render:
+        try:
+            with timed("render"):
+                rendered = render_sequence(clip_filenames(gloss, engine.index, req.fingerspell))
+            render_url = f"{engine.index.local_base}/{rendered}"
+        except RenderError as e:
+            # Clients fall back to playing the clip list
+            logger.warning(f"Sentence render failed: {e}")
 
     return TextToISLResponse(
-        gloss=gloss,
+        gloss=list(gloss),
         clips=[ClipItem(**c) for c in clips_raw],
-        coverage=coverage,
+        coverage=_record(breakdown),
+        breakdown=CoverageBreakdown(**breakdown),
         mode=mode,
+        render_url=render_url,
+        playback=_playback(clips_raw, req.speed),
+    )
+
+
+@router.get("/api/text-to-isl/playlist.m3u")
+def text_to_isl_playlist(
+    text: str = Query(..., min_length=1),
+    gloss_mode: Literal["rule", "linguistic"] = "rule",
+    fingerspell: Literal["off", "letters", "word"] = "off",
+):
+    """
+    The clip sequence for `text` as a plain extended M3U playlist of the
+    progressive clip files, so players can buffer ahead through the whole
+    sentence. Not HLS: the clips aren't segmented, so no EXT-X tags.
+    EXTINF durations come from clip_manifest.json (-1 when unknown).
+    """
+    if not text.strip():
+        raise HTTPException(400, "Text cannot be empty")
+
+    mode = os.getenv("ISL_CLIPS_MODE", "local")
+    gloss, clips_raw, _ = _translate(text, gloss_mode, mode, get_gloss_engine(), fingerspell)
+    if not gloss:
+        raise HTTPException(400, "Text produced no signs")
+
+    lines = ["#EXTM3U"]
+    for c in clips_raw:
+        duration = c["duration"] if c["duration"] is not None else -1
+        lines.append(f"#EXTINF:{duration},{c['word']}")
+        lines.append(c["url"])
+
+    return Response("\n".join(lines) + "\n", media_type="audio/x-mpegurl")
+
+
+@router.post("/api/text-to-isl/batch", response_model=TextToISLBatchResponse)
+def text_to_isl_batch(req: TextToISLBatchRequest):
+    """
+    Convert many sentences (or SRT/VTT cues) in one request.
+    Glosses are computed in one pass and every distinct gloss token
+    is resolved against the dictionary once for the whole batch.
+    """
+    cues = [{"start": None, "end": None, "text": t} for t in req.texts]
+    if req.subtitles:
+        cues.extend(parse_subtitles(req.subtitles))
+
+    cues = [c for c in cues if c["text"].strip()]
+    if not cues:
+        raise HTTPException(400, "Provide non-empty texts or subtitles")
+    if len(cues) > MAX_BATCH_ITEMS:
+        raise HTTPException(400, f"Batch too large: {len(cues)} items (max {MAX_BATCH_ITEMS})")
+
+    mode = os.getenv("ISL_CLIPS_MODE", "local")
+    engine = get_gloss_engine()
+    try:
+        glosses = engine.convert_many(
+            [c["text"] for c in cues],
+            req.gloss_mode,
+            batch_size=req.batch_size,
+            n_process=NLP_PROCESSES,
+            digits=req.fingerspell != "off",
+        )
+    except NLPUnavailable as e:
+        raise HTTPException(503, str(e))
+
+    # One dictionary pass over the distinct tokens of the whole batch
+    unique_tokens = list(dict.fromkeys(token for gloss in glosses for token in gloss))
+    resolved = dict(zip(unique_tokens, resolve_tokens(unique_tokens, mode, engine.index, req.fingerspell)))
+
+    items = []
+    total = dict.fromkeys(CoverageBreakdown.model_fields, 0)
+    for cue, gloss in zip(cues, glosses):
+        groups = [resolved[token] for token in gloss]
+        breakdown = _breakdown(groups)
+        for kind, count in breakdown.items():
+            total[kind] += count
+        items.append(BatchItem(
+            text=cue["text"],
+            start=cue["start"],
+            end=cue["end"],
+            gloss=gloss,
+            clips=[ClipItem(**c) for group in groups for c in group],
+            coverage=_coverage(breakdown),
+            breakdown=CoverageBreakdown(**breakdown),
+        ))
+
+    coverage = _record(total)
+    return TextToISLBatchResponse(
+        items=items, coverage=coverage, breakdown=CoverageBreakdown(**total), mode=mode
     )
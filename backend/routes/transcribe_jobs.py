@@ -0,0 +1,37 @@
+from fastapi import APIRouter, File, Form, HTTPException, Query, Request, UploadFile
+from models.schemas import TranscriptionJobResponse
+
+router = APIRouter()
+
+
+@router.post("/api/transcribe/jobs", response_model=TranscriptionJobResponse, status_code=202)
+async def create_transcription_job(
+    request: Request,
+    audio: UploadFile = File(..., description="Audio file (WAV/MP3)"),
+    language_code: str = Form(default='en-US', description="Language code (e.g., en-US, hi-IN, ta-IN)")
+):
+    """
+    Submit audio for transcription. Returns a job ID as soon as the audio
+    is in S3, without waiting for Transcribe. Poll GET /api/transcribe/jobs/{job_id} for the result.
+    """
+    if not audio.content_type or not audio.content_type.startswith('audio/'):
+        raise HTTPException(status_code=400, detail="File must be an audio file")
+
+    job = await request.app.state.job_manager.submit(
+        audio.file, audio.filename, language_code, audio.content_type
+    )
+    return TranscriptionJobResponse.from_job(job)
+
+
+@router.get("/api/transcribe/jobs/{job_id}", response_model=TranscriptionJobResponse)
+async def get_transcription_job(
+    request: Request,
+    job_id: str,
+    wait: float = Query(default=0, ge=0, le=60, description="Long-poll up to this many seconds for completion"),
+):
+    """Get job status, optionally waiting for it to complete."""
+    manager = request.app.state.job_manager
+    job = await manager.wait(job_id, wait) if wait else manager.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Transcription job not found")
+    return TranscriptionJobResponse.from_job(job)
@@ -0,0 +1,50 @@
+"""
+Compile isl_dictionary.json (with isl_clips/clip_manifest.json) into
+isl_dictionary.idx, the memory-mapped form the backend looks words up in
+instead of parsing the JSON (see services/compiled_dictionary.py).
+
+The JSON stays the file you edit. The .idx records which versions of the JSON
+and manifest and which ISL_FUZZY_* settings it was built with; when any of
+them change the backend falls back to the JSON until this script is run again.
+
+python scripts/build_dictionary_index.py
+python scripts/build_dictionary_index.py --check   # exit 1 if the .idx is missing or stale
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from services.clip_index import (
+    COMPILED_PATH, DICT_PATH, FUZZY_MAX_EDITS, FUZZY_MIN_LENGTH, MANIFEST_PATH, _open_compiled, _stamp,
+)
+from services.compiled_dictionary import build
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile isl_dictionary.json for memory-mapped loading")
+    parser.add_argument("--source", default=str(DICT_PATH), help="Dictionary JSON")
+    parser.add_argument("--manifest", default=str(MANIFEST_PATH), help="Clip manifest (optional)")
+    parser.add_argument("--output", default=str(COMPILED_PATH), help="Compiled dictionary file")
+    parser.add_argument("--check", action="store_true", help="Only report whether the output is current")
+    args = parser.parse_args()
+
+    source, manifest, output = Path(args.source), Path(args.manifest), Path(args.output)
+
+    if args.check:
+        current = _open_compiled(output, _stamp(source, manifest)) is not None
+        print(f"{output}: {'current' if current else 'missing or stale'}")
+        sys.exit(0 if current else 1)
+
+    start = time.perf_counter()
+    compiled = build(source, output, manifest, FUZZY_MAX_EDITS, FUZZY_MIN_LENGTH)
+    elapsed = time.perf_counter() - start
+    print(f"Compiled {len(compiled)} entries → {output} "
+          f"({output.stat().st_size / 1024:.1f} KB vs {source.stat().st_size / 1024:.1f} KB JSON) in {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
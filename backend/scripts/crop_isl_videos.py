@@ -2,13 +2,119 @@ import cv2
 import mediapipe as mp
 import numpy as np
 import os
+import time
 import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 # Initialize MediaPipe
 mp_pose = mp.solutions.pose
 
-def crop_video(input_path, output_path):
+# The crop is decided from the first SAMPLE_FRAMES frames, every SAMPLE_STEP-th one
+# (--track samples every SAMPLE_STEP-th frame of the whole clip instead)
+SAMPLE_FRAMES = 60
+SAMPLE_STEP = 5
+
+# One Pose instance per process (each pool worker gets its own)
+_pose = None
+
+def _get_pose():
+    global _pose
+    if _pose is None:
+        # Samples are several frames apart and the instance is reused across
+        # videos, so treat every sample as an independent image
+        _pose = mp_pose.Pose(static_image_mode=True, min_detection_confidence=0.5)
+    return _pose
+
+# Head, shoulders, arms and hands; hips/legs (23+) only widen the box
+UPPER_BODY = 23
+# Percentiles used for the box so a single bad landmark can't blow it up
+BOX_PERCENTILES = (2, 98)
+# Track mode: seconds of samples per window, and moving-average width in samples
+TRACK_WINDOW = 1.0
+TRACK_SMOOTH = 5
+# Track mode keeps the decoded clip for the write pass up to this size; longer clips are decoded again
+TRACK_BUFFER_MB = 1024
+
+def _detect(pose, frame, landmarks, row):
+    """Write the upper-body landmarks of one frame into landmarks[row]."""
+    results = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    if results.pose_landmarks:
+        for j, lm in enumerate(results.pose_landmarks.landmark[:UPPER_BODY]):
+            landmarks[row, j] = (lm.x, lm.y)
+
+def _bounds(points):
+    """Robust (min_x, max_x, min_y, max_y) of an (N, 2) array that may contain NaN rows."""
+    lo, hi = np.nanpercentile(points, BOX_PERCENTILES, axis=0)
+    return lo[0], hi[0], lo[1], hi[1]
+
+def _crop_side(bounds, width, height):
+    """Square crop side in pixels for normalized landmark bounds."""
+    min_x, max_x, min_y, max_y = bounds
+    px_w = int((max_x - min_x) * width)
+    px_h = int((max_y - min_y) * height)
+
+    # Target a fixed aspect ratio or size
+    # For Signer PiP, a square or 4:5 is good.
+    # Add small padding, but keep the full frame if the signer already fills most of it
+    target_side = min(width, height)
+    if px_w < target_side * 0.8:
+        target_side = int(max(px_w * 1.2, px_h * 1.2))
+    return max(2, min(target_side, width, height))
+
+def _crop_origin(cx, cy, side, width, height):
+    """Top-left corner of a side x side crop centred on (cx, cy), clamped to the frame."""
+    x1 = int(np.clip(cx - side // 2, 0, width - side))
+    y1 = int(np.clip(cy - side // 2, 0, height - side))
+    return x1, y1
+
+def _track(landmarks, fps, width, height):
+    """
+    Per-sample crop origins for a signer who moves during the clip.
+    Each sample's centre comes from the robust bounds of the samples within
+    TRACK_WINDOW seconds of it; centres are then smoothed with a moving average.
+    Returns (cx, cy) arrays in pixels, one entry per sample.
+    """
+    n = len(landmarks)
+    half = max(1, int(fps * TRACK_WINDOW / SAMPLE_STEP / 2))
+    centres = np.full((n, 2), np.nan, dtype=np.float32)
+    for i in range(n):
+        window = landmarks[max(0, i - half):i + half + 1].reshape(-1, 2)
+        if np.isnan(window).all():
+            continue
+        min_x, max_x, min_y, max_y = _bounds(window)
+        centres[i] = ((min_x + max_x) / 2 * width, (min_y + max_y) / 2 * height)
+
+    # Fill windows without a detection from their neighbours
+    valid = ~np.isnan(centres[:, 0])
+    idx = np.arange(n)
+    for axis in (0, 1):
+        centres[:, axis] = np.interp(idx, idx[valid], centres[valid, axis])
+
+    k = min(TRACK_SMOOTH, n)
+    kernel = np.ones(k) / k
+    padded = np.pad(centres, ((k // 2, k - 1 - k // 2), (0, 0)), mode="edge")
+    cx = np.convolve(padded[:, 0], kernel, mode="valid")
+    cy = np.convolve(padded[:, 1], kernel, mode="valid")
+    return cx, cy
+
+def crop_video(input_path, output_path, track=False):
+    """
+    Crop a video around the signer.
+
+    Default: a single decode pass. The first SAMPLE_FRAMES frames are buffered
+    while pose runs on the sampled ones; once the crop is decided they are
+    written out and the rest of the video streams straight through.
+
+    track=True: samples pose across the whole clip, then writes it with a
+    fixed-size crop whose centre follows the signer, smoothed over time.
+    Also a single decode pass: the decoded frames are kept for the write,
+    unless they outgrow TRACK_BUFFER_MB, in which case they are dropped and
+    the clip is decoded a second time.
+
+    Returns { file, frames, seconds } or None if the file was skipped.
+    """
+    start = time.perf_counter()
     print(f"Processing: {input_path}")
     cap = cv2.VideoCapture(str(input_path))
     if not cap.isOpened():
@@ -20,100 +126,115 @@ def crop_video(input_path, output_path):
     fps = cap.get(cv2.CAP_PROP_FPS)
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
-    # Detect bounding box based on sample frames
-    all_landmarks = []
-    with mp_pose.Pose(static_image_mode=False, min_detection_confidence=0.5) as pose:
-        # Sample every 5th frame to speed up
-        for i in range(0, min(60, total_frames), 5):
-            cap.set(cv2.CAP_PROP_POS_FRAMES, i)
+    pose = _get_pose()
+    buffered = []
+    if track:
+        # CAP_PROP_FRAME_COUNT can be short for some containers; keep a spare row
+        landmarks = np.full((total_frames // SAMPLE_STEP + 2, UPPER_BODY, 2), np.nan, dtype=np.float32)
+        index = 0
+        keep = True
+        while True:
+            if keep or index % SAMPLE_STEP == 0:
+                ret, frame = cap.read()
+                if not ret: break
+                if keep:
+                    buffered.append(frame)
+                    if len(buffered) * frame.nbytes > TRACK_BUFFER_MB * 1024 * 1024:
+                        buffered.clear()
+                        keep = False
+                if index % SAMPLE_STEP == 0:
+                    row = index // SAMPLE_STEP
+                    if row >= len(landmarks):
+                        landmarks = np.concatenate([landmarks, np.full_like(landmarks, np.nan)])
+                    _detect(pose, frame, landmarks, row)
+            # grab() still decodes the frame (FFmpeg backend); it only skips the copy out as a BGR array
+            elif not cap.grab():
+                break
+            index += 1
+        landmarks = landmarks[:(index + SAMPLE_STEP - 1) // SAMPLE_STEP]
+        if not keep:
+            # Too long to hold decoded: read it again for the write pass
+            cap.release()
+            cap = cv2.VideoCapture(str(input_path))
+    else:
+        # Detect bounding box based on sample frames, keeping every decoded frame
+        landmarks = np.full((-(-SAMPLE_FRAMES // SAMPLE_STEP), UPPER_BODY, 2), np.nan, dtype=np.float32)
+        while len(buffered) < SAMPLE_FRAMES:
             ret, frame = cap.read()
             if not ret: break
-            
-            results = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-            
-            if results.pose_landmarks:
-                for lm in results.pose_landmarks.landmark:
-                    # Filter out lower body landmarks (23+)
-                    # Focus on shoulders (11, 12), elbows (13, 14), wrists (15, 16), and head (0-10)
-                    # We'll use 0-22 which covers head, shoulders, arms, wrists
-                    # Let's just use all for now and see the range
-                    all_landmarks.append((lm.x, lm.y))
-
-    if not all_landmarks:
+            if len(buffered) % SAMPLE_STEP == 0:
+                _detect(pose, frame, landmarks, len(buffered) // SAMPLE_STEP)
+            buffered.append(frame)
+
+    if np.isnan(landmarks).all():
         print(f"Warning: No signer detected in {input_path}. Skipping.")
         cap.release()
         return
 
-    # Calculate bounding box
-    xs = [pt[0] for pt in all_landmarks]
-    ys = [pt[1] for pt in all_landmarks]
-    
-    print(f"DEBUG: Found {len(all_landmarks)} landmarks across sampled frames.")
-    print(f"DEBUG: Raw normalized X range: {min(xs):.4f} to {max(xs):.4f}")
-    print(f"DEBUG: Raw normalized Y range: {min(ys):.4f} to {max(ys):.4f}")
-
-    min_x, max_x = min(xs), max(xs)
-    min_y, max_y = min(ys), max(ys)
+    points = landmarks.reshape(-1, 2)
+    bounds = _bounds(points)
+    detected = int((~np.isnan(landmarks[:, 0, 0])).sum())
+    print(f"DEBUG: Signer detected in {detected}/{len(landmarks)} sampled frames.")
+    print(f"DEBUG: Robust normalized X range: {bounds[0]:.4f} to {bounds[1]:.4f}")
+    print(f"DEBUG: Robust normalized Y range: {bounds[2]:.4f} to {bounds[3]:.4f}")
 
-    # Convert normalized to pixel coords
-    px_min_x, px_max_x = int(min_x * width), int(max_x * width)
-    px_min_y, px_max_y = int(min_y * height), int(max_y * height)
-
-    # Add small padding
-    pad_w = int((px_max_x - px_min_x) * 0.1)
-    pad_h = int((px_max_y - px_min_y) * 0.1)
-    
-    # Target a fixed aspect ratio or size
-    # For Signer PiP, a square or 4:5 is good.
-    # Let's try to constrain it to ~70% of the smaller dimension if it's too large
-    target_side = min(width, height)
-    if (px_max_x - px_min_x) < target_side * 0.8:
-        target_side = int(max(px_max_x - px_min_x + 2*pad_w, px_max_y - px_min_y + 2*pad_h))
-
-    # Center point
-    cx = (px_min_x + px_max_x) // 2
-    cy = (px_min_y + px_max_y) // 2
-    
-    # Calculate crop coordinates
-    x1 = max(0, cx - target_side // 2)
-    y1 = max(0, cy - target_side // 2)
-    x2 = min(width, x1 + target_side)
-    y2 = min(height, y1 + target_side)
-    
-    # Re-adjust if we hit boundaries
-    if x2 - x1 < target_side: x1 = max(0, x2 - target_side)
-    if y2 - y1 < target_side: y1 = max(0, y2 - target_side)
-    
-    crop_w = x2 - x1
-    crop_size = (x2 - x1, y2 - y1)
-    print(f"Crop decided: {x1, y1} to {x2, y2} (size: {crop_size})")
+    side = _crop_side(bounds, width, height)
+    if track:
+        cx, cy = _track(landmarks, fps, width, height)
+        # Interpolate the per-sample centres to every frame
+        sample_idx = np.arange(len(cx)) * SAMPLE_STEP
+        frame_idx = np.arange(max(total_frames, int(sample_idx[-1]) + 1))
+        origins = np.stack([np.interp(frame_idx, sample_idx, cx), np.interp(frame_idx, sample_idx, cy)], axis=1)
+        print(f"Crop decided: {side}x{side} tracking the signer over {len(cx)} samples")
+    else:
+        min_x, max_x, min_y, max_y = bounds
+        x1, y1 = _crop_origin((min_x + max_x) / 2 * width, (min_y + max_y) / 2 * height, side, width, height)
+        print(f"Crop decided: {x1, y1} to {x1 + side, y1 + side} (size: {(side, side)})")
 
-    # Re-open and process full video
-    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-    
     import imageio
     
     # We'll use imageio to write with libx264 which is browser-friendly
     writer = imageio.get_writer(str(output_path), fps=fps, codec='libx264', quality=8)
 
-    while True:
-        ret, frame = cap.read()
-        if not ret: break
-        
-        cropped_frame = frame[y1:y2, x1:x2]
+    frames = 0
+    def write(frame):
+        nonlocal frames
+        if track:
+            ox, oy = origins[min(frames, len(origins) - 1)]
+            left, top = _crop_origin(ox, oy, side, width, height)
+        else:
+            left, top = x1, y1
+        # Basic slicing is a view into the decoded frame, no copy
+        cropped_frame = frame[top:top + side, left:left + side]
         # Convert BGR (OpenCV) to RGB (imageio)
         rgb_frame = cv2.cvtColor(cropped_frame, cv2.COLOR_BGR2RGB)
         writer.append_data(rgb_frame)
+        frames += 1
+
+    # Flush the frames already decoded for sampling (all of them in track mode), then stream the rest
+    for frame in buffered:
+        write(frame)
+    buffered.clear()
+
+    while True:
+        ret, frame = cap.read()
+        if not ret: break
+        write(frame)
 
     cap.release()
     writer.close()
-    print(f"Saved (H.264): {output_path}")
+    seconds = time.perf_counter() - start
+    print(f"Saved (H.264): {output_path} [{frames} frames in {seconds:.2f}s, {frames / seconds:.1f} fps]")
+    return {"file": Path(input_path).name, "frames": frames, "seconds": seconds}
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--input_dir", default="isl_clips")
     parser.add_argument("--output_dir", default="isl_clips_cropped")
     parser.add_argument("--files", nargs="*", help="Specific files to process")
+    parser.add_argument("--workers", type=int, default=1, help="Parallel worker processes (one MediaPipe Pose each)")
+    parser.add_argument("--track", action="store_true",
+                        help="Sample the whole clip and let the crop follow the signer (smoothed)")
     args = parser.parse_args()
 
     input_dir = Path(args.input_dir)
@@ -127,6 +248,7 @@ def main():
         
     print(f"Found {len(files)} files to process.")
 
+    jobs = []
     for f in files:
         if not f.exists():
             f = input_dir / f.name
@@ -137,7 +259,32 @@ def main():
         if output_file.exists():
             print(f"Skipping {f.name} (already exists)")
             continue
-        crop_video(f, output_file)
+        jobs.append((f, output_file))
+
+    start = time.perf_counter()
+    stats = []
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_get_pose) as pool:
+            futures = {pool.submit(crop_video, f, out, args.track): f for f, out in jobs}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Error processing {futures[future]}: {e}")
+                    continue
+                if result:
+                    stats.append(result)
+    else:
+        for f, out in jobs:
+            result = crop_video(f, out, args.track)
+            if result:
+                stats.append(result)
+
+    elapsed = time.perf_counter() - start
+    frames = sum(s["frames"] for s in stats)
+    print(f"\nCropped {len(stats)}/{len(jobs)} files, {frames} frames in {elapsed:.1f}s "
+          f"({len(stats) / elapsed if elapsed else 0:.2f} files/s, {frames / elapsed if elapsed else 0:.1f} fps) "
+          f"with {args.workers} worker(s)")
 
 if __name__ == "__main__":
     main()
@@ -1,44 +1,104 @@
 import sys
 import os
-from pdf2image import convert_from_path
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from pdf2image import convert_from_path, pdfinfo_from_path
 from pyzbar.pyzbar import decode
 import argparse
 
-def extract_links_from_pdf(pdf_path: str):
-    """Converts PDF pages to images and decodes QR codes."""
-    print(f"Opening PDF: {pdf_path}")
-    try:
-        pages = convert_from_path(pdf_path)
-    except Exception as e:
-        print(f"Error converting PDF: {e}")
-        print("Note: You may need 'poppler-utils' installed (sudo apt install poppler-utils)")
-        return
-
-    print(f"Found {len(pages)} pages. Scanning for QR codes...")
-    
-    unique_links = set()
-    for i, page in enumerate(pages):
+# Pages rendered per task; each worker holds at most this many page images
+PAGES_PER_CHUNK = 8
+
+def scan_pages(pdf_path: str, first_page: int, last_page: int, dpi: int = 150, grayscale: bool = True):
+    """Renders pages first_page..last_page and returns [(page number, link)] for every QR code found."""
+    pages = convert_from_path(pdf_path, dpi=dpi, grayscale=grayscale,
+                              first_page=first_page, last_page=last_page)
+    found = []
+    for page_number, page in enumerate(pages, first_page):
         # Scan page for barcodes/QR codes
-        decoded_objects = decode(page)
-        for obj in decoded_objects:
+        for obj in decode(page):
             link = obj.data.decode('utf-8')
             if link.startswith('http'):
-                unique_links.add(link)
-        
-        if (i + 1) % 5 == 0:
-            print(f"Processed {i+1} pages...")
+                found.append((page_number, link))
+    return found
+
+def extract_links(pdf_paths: list, dpi: int = 150, grayscale: bool = True,
+                  chunk: int = PAGES_PER_CHUNK, workers: int = None) -> dict:
+    """
+    Scans PDFs in page-range chunks on a process pool.
+    Returns link → [{"pdf", "page"}, ...] in page order.
+    """
+    tasks = []
+    for pdf_path in pdf_paths:
+        try:
+            page_count = pdfinfo_from_path(pdf_path)["Pages"]
+        except Exception as e:
+            print(f"Error reading {pdf_path}: {e}")
+            print("Note: You may need 'poppler-utils' installed (sudo apt install poppler-utils)")
+            continue
+        print(f"Opening PDF: {pdf_path} ({page_count} pages)")
+        for first in range(1, page_count + 1, chunk):
+            tasks.append((pdf_path, first, min(first + chunk - 1, page_count)))
+
+    links = {}
+    done = 0
+    total = sum(last - first + 1 for _, first, last in tasks)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(scan_pages, pdf, first, last, dpi, grayscale): (pdf, first, last)
+                   for pdf, first, last in tasks}
+        for future in as_completed(futures):
+            pdf, first, last = futures[future]
+            try:
+                found = future.result()
+            except Exception as e:
+                print(f"Error scanning {pdf} pages {first}-{last}: {e}")
+                continue
+            for page_number, link in found:
+                links.setdefault(link, []).append({"pdf": os.path.basename(pdf), "page": page_number})
+            done += last - first + 1
+            print(f"Processed {done}/{total} pages...")
+
+    for sources in links.values():
+        sources.sort(key=lambda s: (s["pdf"], s["page"]))
+    return links
 
-    print(f"\nFound {len(unique_links)} unique links:")
-    for link in sorted(list(unique_links)):
-        print(link)
+def extract_links_from_pdf(pdf_path: str, dpi: int = 150, grayscale: bool = True, workers: int = None) -> dict:
+    """Decodes the QR codes of a single PDF."""
+    return extract_links([pdf_path], dpi=dpi, grayscale=grayscale, workers=workers)
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Extract QR code links from a PDF")
-    parser.add_argument("pdf", help="Path to the PDF file")
+    parser = argparse.ArgumentParser(description="Extract QR code links from PDFs")
+    parser.add_argument("pdf", nargs="+", help="PDF files, or directories of PDFs")
+    parser.add_argument("--dpi", type=int, default=150, help="Render resolution (QR codes decode fine at 100-200)")
+    parser.add_argument("--color", action="store_true", help="Render in color instead of grayscale")
+    parser.add_argument("--chunk", type=int, default=PAGES_PER_CHUNK, help="Pages rendered per task")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Decoding processes")
+    parser.add_argument("--output", help="Write deduplicated links as JSON (usable with ncert_downloader.py --links)")
     args = parser.parse_args()
-    
-    if not os.path.exists(args.pdf):
-        print(f"File not found: {args.pdf}")
+
+    pdf_paths = []
+    for p in map(Path, args.pdf):
+        if p.is_dir():
+            pdf_paths.extend(str(f) for f in sorted(p.glob("*.pdf")))
+        elif p.exists():
+            pdf_paths.append(str(p))
+        else:
+            print(f"File not found: {p}")
+    if not pdf_paths:
         sys.exit(1)
-        
-    extract_links_from_pdf(args.pdf)
+
+    start = time.perf_counter()
+    links = extract_links(pdf_paths, dpi=args.dpi, grayscale=not args.color,
+                          chunk=args.chunk, workers=args.workers)
+
+    print(f"\nFound {len(links)} unique links in {time.perf_counter() - start:.1f}s:")
+    for link in sorted(links):
+        pages = ", ".join(f"{s['pdf']} p{s['page']}" for s in links[link])
+        print(f"{link}  ({pages})")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump([{"url": link, "found_in": links[link]} for link in sorted(links)], f, indent=2)
+        print(f"Wrote {args.output}")
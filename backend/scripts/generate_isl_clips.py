@@ -1,37 +1,41 @@
 """
 One-time script. Generates ISL video clips for all dictionary words using Amazon Nova Reel.
 Run once: python scripts/generate_isl_clips.py
-Takes 60-90 minutes. Saves .mp4 files to backend/isl_clips/
+Keeps up to --concurrency async invocations in flight and polls them together,
+so a full run takes roughly (words / concurrency) x 1.5 minutes.
+Saves .mp4 files to backend/isl_clips/
+
+Invocation ARNs are saved to a state file as they are submitted; re-running
+after an interruption picks up the in-flight jobs instead of paying for them twice.
+
+python scripts/generate_isl_clips.py --concurrency 10
+python scripts/generate_isl_clips.py --words hello water --stub   # local dry run, no AWS
+python scripts/generate_isl_clips.py --alphabet   # fingerspelling clips → isl_clips/alphabet/a.mp4 … 9.mp4
+
+--stub writes its placeholder files to a temporary directory (or --output),
+never to isl_clips/.
 """
+import argparse
 import boto3
 import json
 import os
+import tempfile
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv(Path(__file__).parent.parent / ".env")
 
-# Nova Reel only available in us-east-1
-bedrock = boto3.client(
-    "bedrock-runtime",
-    region_name=os.getenv("AWS_BEDROCK_REGION", "us-east-1"),
-    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-)
-
-s3 = boto3.client(
-    "s3",
-    region_name=os.getenv("AWS_BEDROCK_REGION", "us-east-1"),
-    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-)
+MODEL_ID = "amazon.nova-reel-v1:0"
+JOB_TIMEOUT = 600  # seconds before an in-flight invocation is given up on
 
 OUTPUT_DIR = Path(__file__).parent.parent / "isl_clips"
-OUTPUT_DIR.mkdir(exist_ok=True)
 
 S3_OUTPUT_BUCKET = os.getenv("S3_BUCKET_NAME", "samvad-ai-isl-clips")
+# Kept in the output directory
+STATE_NAME = ".generate_state.json"
 
 WORDS = [
     "hello", "goodbye", "good", "morning", "evening", "night",
@@ -77,6 +81,10 @@ WORDS = [
     "art", "unknown"
 ]
 
+# Letters and digits for fingerspelling (services/isl_lookup.py reads isl_clips/alphabet/)
+ALPHABET = list("abcdefghijklmnopqrstuvwxyz0123456789")
+ALPHABET_DIR = "alphabet"
+
 ISL_PROMPT_TEMPLATE = """A photorealistic video of an Indian Sign Language (ISL) interpreter 
 signing the word "{word}". 
 Medium close-up shot from waist to head. 
@@ -88,20 +96,33 @@ Professional studio lighting.
 Smooth fluid motion. 24fps."""
 
 
-def generate_clip(word: str) -> bool:
-    output_path = OUTPUT_DIR / f"{word}.mp4"
-    if output_path.exists():
-        print(f"  ✓ {word}.mp4 already exists, skipping")
-        return True
+ISL_FINGERSPELL_PROMPT_TEMPLATE = """A photorealistic video of an Indian Sign Language (ISL) interpreter 
+fingerspelling the single character "{word}" in the ISL manual alphabet. 
+Medium close-up shot from waist to head. 
+The interpreter is Indian, wearing a solid dark teal top for hand contrast. 
+Neutral light grey background. 
+One clear, held handshape for "{word}", then hands return to rest. 
+Professional studio lighting. 
+Smooth fluid motion. 24fps."""
 
-    print(f"  Generating {word}...", end=" ", flush=True)
 
-    prompt = ISL_PROMPT_TEMPLATE.format(word=word.replace("_", " "))
-    s3_output_key = f"nova-reel-output/{word}.mp4"
+class NovaReelBackend:
+    """Nova Reel through Bedrock, with one client per service for the whole run."""
 
-    try:
-        response = bedrock.start_async_invoke(
-            modelId="amazon.nova-reel-v1:0",
+    def __init__(self):
+        # Nova Reel only available in us-east-1
+        session = boto3.session.Session(
+            region_name=os.getenv("AWS_BEDROCK_REGION", "us-east-1"),
+            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        )
+        self.runtime = session.client("bedrock-runtime")
+        self.jobs = session.client("bedrock")
+        self.s3 = session.client("s3")
+
+    def submit(self, word: str, prompt: str, s3_key: str) -> str:
+        response = self.runtime.start_async_invoke(
+            modelId=MODEL_ID,
             modelInput={
                 "taskType": "TEXT_VIDEO",
                 "textToVideoParams": {"text": prompt},
@@ -114,76 +135,219 @@ def generate_clip(word: str) -> bool:
             },
             outputDataConfig={
                 "s3OutputDataConfig": {
-                    "s3Uri": f"s3://{S3_OUTPUT_BUCKET}/{s3_output_key}"
+                    "s3Uri": f"s3://{S3_OUTPUT_BUCKET}/{s3_key}"
                 }
             }
         )
+        arn = response.get("invocationArn")
+        if not arn:
+            raise RuntimeError("no invocationArn returned")
+        return arn
 
-        invocation_arn = response.get("invocationArn")
+    def status(self, arn: str) -> tuple[str, str | None]:
+        """('InProgress' | 'Completed' | 'Failed', failure message)"""
+        response = self.jobs.get_async_invoke(invocationArn=arn)
+        return response["status"], response.get("failureMessage")
 
-        if not invocation_arn:
-            print(f"FAILED — no invocationArn returned")
-            return False
+    def download(self, s3_key: str, path: Path):
+        self.s3.download_file(S3_OUTPUT_BUCKET, s3_key, str(path))
 
-        # Poll for completion
-        bedrock_jobs = boto3.client(
-            "bedrock",
-            region_name=os.getenv("AWS_BEDROCK_REGION", "us-east-1"),
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-        )
 
-        for attempt in range(120):  # max 10 min wait
-            time.sleep(5)
-            job_response = bedrock_jobs.get_async_invoke(
-                invocationArn=invocation_arn
-            )
-            status = job_response["status"]
-
-            if status == "Completed":
-                # Download from S3
-                s3.download_file(S3_OUTPUT_BUCKET, s3_output_key, str(output_path))
-                print(f"done ✓")
-                return True
-            elif status == "Failed":
-                reason = job_response.get("failureMessage", "Unknown")
-                print(f"FAILED — {reason}")
-                return False
-            elif attempt % 6 == 0:
-                print(f"waiting...", end=" ", flush=True)
-
-        print(f"TIMEOUT")
-        return False
-
-    except Exception as e:
-        print(f"ERROR — {e}")
-        return False
+class StubBackend:
+    """
+    Local stand-in for Nova Reel: every job completes `delay` seconds after
+    submission and "downloads" a placeholder file. Words containing
+    "fail" fail, to exercise the error path.
+    """
 
+    def __init__(self, delay: float = 3.0):
+        self.delay = delay
 
-def main():
-    print(f"\nSamvad AI — Nova Reel ISL Clip Generator")
-    print(f"Generating {len(WORDS)} clips to {OUTPUT_DIR}")
-    print(f"Estimated time: {len(WORDS) * 1.5:.0f} minutes\n")
+    def submit(self, word: str, prompt: str, s3_key: str) -> str:
+        return f"stub:{time.time()}:{word}"
+
+    def status(self, arn: str) -> tuple[str, str | None]:
+        _, submitted, word = arn.split(":", 2)
+        if time.time() - float(submitted) < self.delay:
+            return "InProgress", None
+        if "fail" in word:
+            return "Failed", "stub failure"
+        return "Completed", None
 
-    success = 0
+    def download(self, s3_key: str, path: Path):
+        tmp = path.with_name(f".{path.name}.partial")
+        tmp.write_bytes(b"stub clip for " + s3_key.encode())
+        os.replace(tmp, path)
+
+
+def load_state(path: Path) -> dict:
+    """word → {"arn", "submitted_at"} for invocations started by a previous run."""
+    if not path.exists():
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(path: Path, state: dict):
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def generate_clips(words: list[str], backend, concurrency: int = 5, poll_interval: float = 5.0,
+                   download_workers: int = 4, state_path: Path | None = None,
+                   output_dir: Path = OUTPUT_DIR, prompt_template: str = ISL_PROMPT_TEMPLATE,
+                   s3_prefix: str = "nova-reel-output/") -> tuple[list, list]:
+    """
+    Generate clips for `words` into `output_dir`, keeping up to `concurrency` invocations in flight.
+    One loop polls every in-flight job per interval; finished outputs are
+    downloaded on a thread pool while generation continues.
+    Returns (succeeded words, failed words).
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    state_path = state_path or output_dir / STATE_NAME
+    state = load_state(state_path)
+    pending = []
+    in_flight = {}
+    succeeded = []
     failed = []
 
-    for i, word in enumerate(WORDS, 1):
-        print(f"[{i}/{len(WORDS)}] {word}")
-        if generate_clip(word):
-            success += 1
+    for word in words:
+        if (output_dir / f"{word}.mp4").exists():
+            print(f"  ✓ {word}.mp4 already exists, skipping")
+            succeeded.append(word)
+            state.pop(word, None)
+        elif word in state:
+            print(f"  ↻ {word}: resuming {state[word]['arn']}")
+            in_flight[word] = state[word]
         else:
-            failed.append(word)
-        time.sleep(2)  # Brief pause between jobs
+            pending.append(word)
+    save_state(state_path, state)
+
+    downloads = {}
+    with ThreadPoolExecutor(max_workers=download_workers) as pool:
+        while pending or in_flight:
+            # Top up to `concurrency` in-flight jobs
+            while pending and len(in_flight) < concurrency:
+                word = pending.pop(0)
+                prompt = prompt_template.format(word=word.replace("_", " "))
+                try:
+                    arn = backend.submit(word, prompt, f"{s3_prefix}{word}.mp4")
+                except Exception as e:
+                    if "Throttling" in type(e).__name__ or "Throttling" in str(e):
+                        # Over the account's concurrency quota: retry next round
+                        pending.insert(0, word)
+                        break
+                    print(f"  ✗ {word}: ERROR — {e}")
+                    failed.append(word)
+                    continue
+                in_flight[word] = {"arn": arn, "submitted_at": time.time()}
+                state[word] = in_flight[word]
+                save_state(state_path, state)
+                print(f"  → {word} submitted ({len(in_flight)} in flight)")
+
+            time.sleep(poll_interval)
+
+            for word, job in list(in_flight.items()):
+                try:
+                    status, reason = backend.status(job["arn"])
+                except Exception as e:
+                    print(f"  ! {word}: status check failed — {e}")
+                    continue
+
+                if status == "Completed":
+                    del in_flight[word]
+                    output_path = output_dir / f"{word}.mp4"
+                    downloads[word] = pool.submit(backend.download, f"{s3_prefix}{word}.mp4", output_path)
+                elif status == "Failed" or time.time() - job["submitted_at"] > JOB_TIMEOUT:
+                    del in_flight[word]
+                    state.pop(word, None)
+                    save_state(state_path, state)
+                    print(f"  ✗ {word}: FAILED — {reason or 'TIMEOUT'}")
+                    failed.append(word)
+
+            for word, future in list(downloads.items()):
+                if not future.done():
+                    continue
+                del downloads[word]
+                try:
+                    future.result()
+                except Exception as e:
+                    # Keep the ARN so a re-run retries the download only
+                    print(f"  ✗ {word}: download failed — {e}")
+                    failed.append(word)
+                    continue
+                state.pop(word, None)
+                save_state(state_path, state)
+                succeeded.append(word)
+                print(f"  ✓ {word} done ({len(succeeded)}/{len(words)})")
+
+        for word, future in downloads.items():
+            try:
+                future.result()
+            except Exception as e:
+                print(f"  ✗ {word}: download failed — {e}")
+                failed.append(word)
+                continue
+            state.pop(word, None)
+            succeeded.append(word)
+            print(f"  ✓ {word} done ({len(succeeded)}/{len(words)})")
+        save_state(state_path, state)
+
+    return succeeded, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate ISL clips with Amazon Nova Reel")
+    parser.add_argument("--words", nargs="*", help="Words to generate (default: the built-in list)")
+    parser.add_argument("--alphabet", action="store_true",
+                        help=f"Generate fingerspelling clips for a-z and 0-9 into <output>/{ALPHABET_DIR}/ instead")
+    parser.add_argument("--concurrency", type=int, default=5, help="Max invocations in flight")
+    parser.add_argument("--poll-interval", type=float, default=5.0, help="Seconds between status sweeps")
+    parser.add_argument("--download-workers", type=int, default=4)
+    parser.add_argument("--output", help=f"Clip directory (default: {OUTPUT_DIR}; a temporary directory with --stub)")
+    parser.add_argument("--state", help=f"Resumable state file of invocation ARNs (default: <output>/{STATE_NAME})")
+    parser.add_argument("--stub", action="store_true", help="Use a local stub instead of Bedrock")
+    parser.add_argument("--stub-delay", type=float, default=3.0, help="Seconds each stub job takes")
+    args = parser.parse_args()
+
+    words = args.words or (ALPHABET if args.alphabet else WORDS)
+    backend = StubBackend(args.stub_delay) if args.stub else NovaReelBackend()
+    poll_interval = min(args.poll_interval, 1.0) if args.stub else args.poll_interval
+    if args.output:
+        output_dir = Path(args.output)
+    elif args.stub:
+        # Placeholder files must never land in the real clip library
+        output_dir = Path(tempfile.mkdtemp(prefix="isl_stub_clips_"))
+    else:
+        output_dir = OUTPUT_DIR
+    prompt_template, s3_prefix = ISL_PROMPT_TEMPLATE, "nova-reel-output/"
+    if args.alphabet:
+        output_dir = output_dir / ALPHABET_DIR
+        prompt_template, s3_prefix = ISL_FINGERSPELL_PROMPT_TEMPLATE, f"nova-reel-output/{ALPHABET_DIR}/"
+
+    print(f"\nSamvad AI — Nova Reel ISL Clip Generator")
+    print(f"Generating {len(words)} clips to {output_dir} ({args.concurrency} in flight)")
+    print(f"Estimated time: {len(words) * 1.5 / args.concurrency:.0f} minutes\n")
+
+    start = time.perf_counter()
+    succeeded, failed = generate_clips(
+        words, backend, args.concurrency, poll_interval, args.download_workers,
+        Path(args.state) if args.state else None, output_dir, prompt_template, s3_prefix,
+    )
 
     print(f"\n{'='*40}")
-    print(f"Done. {success}/{len(WORDS)} clips generated.")
+    print(f"Done. {len(succeeded)}/{len(words)} clips generated in {(time.perf_counter() - start) / 60:.1f} minutes.")
     if failed:
         print(f"Failed words: {', '.join(failed)}")
         print("Re-run the script to retry failed words.")
     else:
         print("All clips generated successfully!")
-    print(f"Clips saved to: {OUTPUT_DIR}")
+    print(f"Clips saved to: {output_dir}")
 
 
 if __name__ == "__main__":
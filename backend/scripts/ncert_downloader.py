@@ -2,68 +2,241 @@ import requests
 import os
 import json
 import argparse
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # DIKSHA API Base
 BASE_URL = "https://diksha.gov.in/api/content/v1"
 
-def get_content_details(do_id: str, headers: Dict = None) -> Dict:
+COLLECTION_MIME = "application/vnd.ekstep.content-collection"
+CHUNK_SIZE = 1024 * 1024  # 1MB reads and write buffer
+MANIFEST_NAME = ".download_manifest.json"
+VALIDATOR_SUFFIX = ".validator"  # next to <file>.part: which remote object the partial belongs to
+
+def make_session(headers: Dict = None, pool_size: int = 8) -> requests.Session:
+    """Session with a connection pool sized for `pool_size` workers and retries on transient errors."""
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=("GET",))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+def get_content_details(do_id: str, headers: Dict = None, session: requests.Session = None) -> Dict:
     """Fetches metadata for a specific DIKSHA content ID."""
     url = f"{BASE_URL}/read/{do_id}"
-    params = {"fields": "name,artifactUrl,streamingUrl,contentType,mimeType"}
-    response = requests.get(url, params=params, headers=headers)
+    params = {"fields": "name,identifier,artifactUrl,streamingUrl,contentType,mimeType,children"}
+    response = (session or requests).get(url, params=params, headers=headers, timeout=30)
     if response.status_code == 200:
         return response.json().get("result", {}).get("content", {})
     else:
         print(f"Error fetching {do_id}: {response.status_code}")
         return {}
 
-def download_video(content: Dict, output_dir: str):
-    """Downloads the video file from artifactUrl."""
+def crawl_collection(collection_id: str, session: requests.Session) -> List[str]:
+    """
+    All leaf content IDs under a collection, at any depth.
+    Children that are collections themselves are expanded; when the API
+    returns a child without its own children inline, it's fetched.
+    """
+    leaves = []
+    seen = {collection_id}
+    stack = [get_content_details(collection_id, session=session)]
+    while stack:
+        node = stack.pop()
+        for child in node.get("children", []) or []:
+            child_id = child.get("identifier")
+            if not child_id or child_id in seen:
+                continue
+            seen.add(child_id)
+            if child.get("children"):
+                stack.append(child)
+            elif child.get("mimeType") == COLLECTION_MIME:
+                stack.append(get_content_details(child_id, session=session))
+            else:
+                leaves.append(child_id)
+    return leaves
+
+class Manifest:
+    """do_id → {file, bytes} of completed downloads, saved after every change."""
+
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def is_complete(self, do_id: str, output_dir: str) -> bool:
+        entry = self.entries.get(do_id)
+        if not entry:
+            return False
+        path = os.path.join(output_dir, entry["file"])
+        return os.path.exists(path) and os.path.getsize(path) == entry["bytes"]
+
+    def add(self, do_id: str, filename: str, size: int):
+        with self._lock:
+            self.entries[do_id] = {"file": filename, "bytes": size}
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp, self.path)
+
+def _range_total(response: requests.Response):
+    """Full size from a `Content-Range: bytes */<total>` header, or None."""
+    total = response.headers.get("Content-Range", "").rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+def _range_start(response: requests.Response):
+    """First byte from a `Content-Range: bytes <start>-<end>/<total>` header, or None."""
+    start = response.headers.get("Content-Range", "").removeprefix("bytes ").partition("-")[0]
+    return int(start) if start.isdigit() else None
+
+def _save_validator(partial: str, response: requests.Response):
+    """Record the ETag, Last-Modified and size of the object `partial` is being filled from."""
+    length = response.headers.get("Content-Length", "")
+    validator = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "size": int(length) if length.isdigit() and not response.headers.get("Content-Encoding") else None,
+    }
+    with open(partial + VALIDATOR_SUFFIX, "w") as f:
+        json.dump(validator, f)
+
+def _load_validator(partial: str) -> Dict:
+    try:
+        with open(partial + VALIDATOR_SUFFIX) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _same_object(validator: Dict, response: requests.Response) -> bool:
+    """False if the response's ETag or size shows it isn't the object the partial came from."""
+    etag = response.headers.get("ETag")
+    if validator.get("etag") and etag and etag != validator["etag"]:
+        return False
+    return validator.get("size") in (None, _range_total(response))
+
+def _fetch_to(partial: str, url: str, offset: int, session: requests.Session = None) -> bool:
+    """
+    Write `url` into `partial`, continuing from `offset` bytes.
+    The resumed request carries If-Range with the validator saved when the
+    partial was started, so a changed remote file comes back whole (200)
+    and overwrites it. False if the server answers with a range of a
+    different object anyway (other ETag or total size, wrong start), or says
+    the range starts past the end of a file that isn't `offset` bytes: the
+    partial file isn't a prefix of this file.
+    """
+    validator = _load_validator(partial) if offset else {}
+    headers = {}
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+        etag = validator.get("etag")
+        # If-Range needs a strong ETag; Last-Modified is the fallback
+        if_range = etag if etag and not etag.startswith("W/") else validator.get("last_modified")
+        if if_range:
+            headers["If-Range"] = if_range
+    with (session or requests).get(url, stream=True, headers=headers, timeout=60) as r:
+        if r.status_code == 416:
+            # Range not satisfiable: complete only if the partial file is exactly the remote size
+            return _range_total(r) == offset and _same_object(validator, r)
+        r.raise_for_status()
+        # A 200 means the server ignored Range or the file changed (If-Range); start over
+        resume = bool(offset) and r.status_code == 206
+        if resume and not (_range_start(r) == offset and _same_object(validator, r)):
+            return False
+        if not resume:
+            _save_validator(partial, r)
+        with open(partial, "ab" if resume else "wb", buffering=CHUNK_SIZE) as f:
+            for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+    return True
+
+def download_video(content: Dict, output_dir: str, session: requests.Session = None, manifest: Manifest = None) -> bool:
+    """
+    Downloads the video file from artifactUrl.
+    Data goes to `<file>.part` first, with the remote ETag/Last-Modified/size
+    in `<file>.part.validator`; if both exist from an interrupted run, the
+    download resumes from the partial's size with an HTTP Range request.
+    The content ID is part of the file name, so items with the same title
+    never share a file.
+    """
     name = content.get("name", content.get("identifier", "unknown"))
     url = content.get("artifactUrl")
-    
+
     if not url:
         print(f"No download URL for {name}")
-        return
+        return False
 
     # Clean filename
     clean_name = "".join(c for c in name if c.isalnum() or c in (" ", "_")).strip().replace(" ", "_").lower()
-    ext = os.path.splitext(url)[1] or ".mp4"
-    filename = f"{clean_name}{ext}"
+    ext = os.path.splitext(url.split("?")[0])[1] or ".mp4"
+    do_id = "".join(c for c in content.get("identifier", "") if c.isalnum() or c in ("_", "-"))
+    filename = f"{clean_name}_{do_id}{ext}" if do_id else f"{clean_name}{ext}"
     filepath = os.path.join(output_dir, filename)
+    partial = filepath + ".part"
+
+    # Without a validator there's no telling which remote object the partial came from
+    resumable = os.path.exists(partial) and os.path.exists(partial + VALIDATOR_SUFFIX)
+    offset = os.path.getsize(partial) if resumable else 0
 
-    print(f"Downloading {name} -> {filename}...")
+    print(f"Downloading {name} -> {filename}" + (f" (resuming at {offset} bytes)" if offset else "") + "...")
     try:
-        r = requests.get(url, stream=True)
-        r.raise_for_status()
-        with open(filepath, 'wb') as f:
-            for chunk in r.iter_content(chunk_size=8192):
-                f.write(chunk)
+        if not _fetch_to(partial, url, offset, session):
+            print(f"Partial file for {name} doesn't match the remote file; downloading again")
+            os.remove(partial)
+            _fetch_to(partial, url, 0, session)
+        os.replace(partial, filepath)
+        os.remove(partial + VALIDATOR_SUFFIX)
+        if manifest is not None and content.get("identifier"):
+            manifest.add(content["identifier"], filename, os.path.getsize(filepath))
         print(f"Success: {filepath}")
+        return True
     except Exception as e:
         print(f"Failed to download {name}: {e}")
+        return False
 
 def main():
+    global BASE_URL
     parser = argparse.ArgumentParser(description="Download NCERT ISL Videos from DIKSHA")
     parser.add_argument("--ids", nargs="+", help="List of 'do_ids' to download")
     parser.add_argument("--urls", nargs="+", help="List of DIKSHA URLs to extract IDs from and download")
+    parser.add_argument("--links", help="JSON written by extract_qr_links.py --output; its URLs are added to --urls")
     parser.add_argument("--output", default="isl_clips", help="Directory to save videos")
     parser.add_argument("--cookie", help="Browser session cookie if login is required")
-    parser.add_argument("--collection", help="Crawl a collection ID (do_...) for all children")
+    parser.add_argument("--collection", help="Crawl a collection ID (do_...) and all nested collections")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent downloads")
+    parser.add_argument("--base-url", default=BASE_URL, help="Content API base (e.g. a local stub server)")
 
     args = parser.parse_args()
-    
+
     os.makedirs(args.output, exist_ok=True)
-    
+
+    BASE_URL = args.base_url.rstrip("/")
+
     headers = {}
     if args.cookie:
         headers["Cookie"] = args.cookie
+    session = make_session(headers, pool_size=args.workers)
 
     do_ids = args.ids or []
-    
-    if args.urls:
-        for url in args.urls:
+
+    urls = list(args.urls or [])
+    if args.links:
+        with open(args.links) as f:
+            urls.extend(item["url"] for item in json.load(f))
+
+    if urls:
+        for url in urls:
             if "do_" in url:
                 do_id = url.split("/")[-1]
                 if "?" in do_id:
@@ -72,23 +245,44 @@ def main():
 
     if args.collection:
         print(f"Crawling collection {args.collection}...")
-        col_data = get_content_details(args.collection, headers)
-        children = col_data.get("children", [])
-        if not children:
-            # Try recursive fetch for hierarchical collections
-            print("No immediate children found. This might be a flattened collection or empty.")
-        for child in children:
-            do_ids.append(child.get("identifier"))
+        children = crawl_collection(args.collection, session)
+        print(f"Found {len(children)} content items in the collection hierarchy.")
+        do_ids.extend(children)
 
     if not do_ids:
-        print("No Content IDs found to download. Use --ids, --urls, or --collection.")
+        print("No Content IDs found to download. Use --ids, --urls, --links, or --collection.")
         return
 
-    print(f"Processing {len(set(do_ids))} unique IDs...")
-    for do_id in set(do_ids):
-        details = get_content_details(do_id, headers)
-        if details:
-            download_video(details, args.output)
+    manifest = Manifest(args.output)
+    unique_ids = list(dict.fromkeys(do_ids))
+    todo = [i for i in unique_ids if not manifest.is_complete(i, args.output)]
+    print(f"Processing {len(unique_ids)} unique IDs ({len(unique_ids) - len(todo)} already downloaded)...")
+
+    def fetch(do_id: str) -> bool:
+        details = get_content_details(do_id, session=session)
+        if not details:
+            return False
+        details.setdefault("identifier", do_id)
+        return download_video(details, args.output, session, manifest)
+
+    # One item's error (bad metadata, network) must not abort the others
+    failed = {}
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(fetch, i): i for i in todo}
+        for future in as_completed(futures):
+            do_id = futures[future]
+            try:
+                if not future.result():
+                    failed[do_id] = "download failed"
+            except Exception as e:
+                print(f"Error processing {do_id}: {e}")
+                failed[do_id] = str(e)
+    print(f"Done. {len(todo) - len(failed)}/{len(todo)} downloaded.")
+    if failed:
+        print("Failed:")
+        for do_id, error in failed.items():
+            print(f"  {do_id}: {error}")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
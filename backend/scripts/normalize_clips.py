@@ -0,0 +1,234 @@
+"""
+Normalize the ISL clip library to one encoding profile and write clip_manifest.json.
+
+Every clip referenced by isl_dictionary.json is transcoded to H.264 / yuv420p,
+fixed square resolution, constant frame rate, a keyframe every second, no
+audio and faststart, so clips can be stream-copied together and preloaded
+predictably. The manifest records duration, fps, size, keyframe offsets and
+a content hash per clip; the backend uses it to return durations and byte
+sizes from resolve_clips.
+
+python scripts/normalize_clips.py --output_dir isl_clips_normalized --update-dictionary
+python scripts/normalize_clips.py --manifest-only          # just (re)build isl_clips/clip_manifest.json
+python scripts/normalize_clips.py --crop --files absent.mp4  # run crop_isl_videos first
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+DICT_PATH = BACKEND_DIR / "isl_dictionary.json"
+CLIPS_DIR = BACKEND_DIR / "isl_clips"
+MANIFEST_NAME = "clip_manifest.json"
+
+FFMPEG = os.getenv("FFMPEG_BIN", "ffmpeg")
+FFPROBE = os.getenv("FFPROBE_BIN", "ffprobe")
+
+
+def transcode(src: Path, dst: Path, size: int, fps: int, crf: int):
+    vf = (
+        f"scale={size}:{size}:force_original_aspect_ratio=decrease,"
+        f"pad={size}:{size}:(ow-iw)/2:(oh-ih)/2:color=white,setsar=1,fps={fps},format=yuv420p"
+    )
+    tmp = dst.with_name(f".{dst.stem}.partial{dst.suffix}")
+    subprocess.run(
+        [FFMPEG, "-y", "-v", "error", "-i", str(src), "-vf", vf, "-an",
+         "-c:v", "libx264", "-profile:v", "main", "-preset", "slow", "-crf", str(crf),
+         # Fixed GOP: one keyframe per second, no scene-cut keyframes
+         "-g", str(fps), "-keyint_min", str(fps), "-sc_threshold", "0",
+         "-movflags", "+faststart", str(tmp)],
+        check=True, capture_output=True,
+    )
+    os.replace(tmp, dst)
+
+
+def probe(path: Path) -> dict:
+    """Duration, fps, dimensions, codec and keyframe offsets of a clip."""
+    info = json.loads(subprocess.run(
+        [FFPROBE, "-v", "error", "-select_streams", "v:0",
+         "-show_entries", "stream=codec_name,width,height,pix_fmt,r_frame_rate:format=duration",
+         "-of", "json", str(path)],
+        check=True, capture_output=True, text=True,
+    ).stdout)
+    keyframes = subprocess.run(
+        [FFPROBE, "-v", "error", "-select_streams", "v:0", "-skip_frame", "nokey",
+         "-show_entries", "frame=pts_time", "-of", "csv=p=0", str(path)],
+        check=True, capture_output=True, text=True,
+    ).stdout.split()
+
+    stream = (info.get("streams") or [{}])[0]
+    num, _, den = (stream.get("r_frame_rate") or "0/1").partition("/")
+    fps = float(num) / float(den or 1) if float(den or 1) else 0.0
+    return {
+        "duration": round(float(info.get("format", {}).get("duration") or 0), 3),
+        "fps": round(fps, 3),
+        "width": stream.get("width"),
+        "height": stream.get("height"),
+        "codec": stream.get("codec_name"),
+        "pix_fmt": stream.get("pix_fmt"),
+        "keyframes": [round(float(t), 3) for t in keyframes if t not in ("", "N/A")],
+    }
+
+
+def sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def build_manifest(clips_dir: Path, workers: int) -> dict:
+    """Probe every clip in clips_dir and write clips_dir/clip_manifest.json."""
+    files = sorted(p for p in clips_dir.iterdir() if p.suffix.lower() in (".mp4", ".webm"))
+    manifest = {}
+
+    def entry(p: Path) -> tuple[str, dict]:
+        return p.name, {**probe(p), "bytes": p.stat().st_size, "sha256": sha256(p)}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for future in as_completed([pool.submit(entry, p) for p in files]):
+            try:
+                name, data = future.result()
+                manifest[name] = data
+            except subprocess.CalledProcessError as e:
+                print(f"  ✗ probe failed: {e.cmd[-1]}")
+
+    manifest = dict(sorted(manifest.items()))
+    out = clips_dir / MANIFEST_NAME
+    with open(out, "w") as f:
+        json.dump({"version": 1, "clips": manifest}, f, indent=2)
+    print(f"Wrote {out} ({len(manifest)} clips)")
+    return manifest
+
+
+def find_collisions(jobs: list[tuple[Path, Path]], referenced: set[str]) -> dict[str, list[str]]:
+    """
+    Output names claimed by more than one source: sources with the same stem
+    (hello.webm and hello.mp4 both → hello.mp4), or a source whose output
+    would overwrite a different clip the dictionary still references.
+    """
+    claims: dict[str, list[str]] = {}
+    for src, dst in jobs:
+        claims.setdefault(dst.name, []).append(src.name)
+    for name, srcs in claims.items():
+        if name in referenced and name not in srcs:
+            srcs.append(name)
+    return {name: srcs for name, srcs in claims.items() if len(srcs) > 1}
+
+
+def publish(normalized: dict[str, str], output_dir: Path, clips_dir: Path, workers: int):
+    """
+    Copy the normalized files into the live clips directory, one atomic
+    rename each, and rebuild its manifest. Run before the dictionary points
+    at them, so the hot-reloading backend never references a missing file.
+    """
+    if output_dir.resolve() != clips_dir.resolve():
+        for name in sorted(set(normalized.values())):
+            tmp = clips_dir / f".{name}.partial"
+            shutil.copyfile(output_dir / name, tmp)
+            os.replace(tmp, clips_dir / name)
+        print(f"Copied {len(set(normalized.values()))} clips into {clips_dir}")
+    build_manifest(clips_dir, workers)
+
+
+def write_dictionary(dictionary: dict):
+    tmp = DICT_PATH.with_name(f".{DICT_PATH.name}.partial")
+    with open(tmp, "w") as f:
+        json.dump(dictionary, f, indent=4)
+    os.replace(tmp, DICT_PATH)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Normalize ISL clips and build clip_manifest.json")
+    parser.add_argument("--input_dir", default=str(BACKEND_DIR / "isl_clips"))
+    parser.add_argument("--output_dir", default=str(BACKEND_DIR / "isl_clips_normalized"))
+    parser.add_argument("--files", nargs="*", help="Specific files to process (default: all dictionary clips)")
+    parser.add_argument("--size", type=int, default=512, help="Output width and height in pixels")
+    parser.add_argument("--fps", type=int, default=25)
+    parser.add_argument("--crf", type=int, default=23, help="x264 quality (lower is better)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Parallel ffmpeg processes")
+    parser.add_argument("--crop", action="store_true", help="Run crop_isl_videos on .mp4 sources first")
+    parser.add_argument("--update-dictionary", action="store_true",
+                        help="Copy the normalized .mp4 files into isl_clips/ and point isl_dictionary.json at them")
+    parser.add_argument("--manifest-only", action="store_true", help="Only build the manifest for --input_dir")
+    args = parser.parse_args()
+
+    input_dir = Path(args.input_dir)
+    if args.manifest_only:
+        build_manifest(input_dir, args.workers)
+        return
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    with open(DICT_PATH) as f:
+        dictionary = json.load(f)
+
+    sources = args.files or sorted(set(dictionary.values()))
+    jobs = []
+    for name in sources:
+        src = input_dir / Path(name).name
+        if not src.exists():
+            print(f"File not found: {src}")
+            continue
+        jobs.append((src, output_dir / f"{src.stem}.mp4"))
+
+    collisions = find_collisions(jobs, set(dictionary.values()))
+    if collisions:
+        for name, srcs in sorted(collisions.items()):
+            print(f"  ✗ {name} would be written from {', '.join(sorted(srcs))}")
+        sys.exit(f"Refusing to normalize: {len(collisions)} output name collision(s). Rename the sources first.")
+
+    if args.crop:
+        sys.path.insert(0, str(Path(__file__).parent))
+        from crop_isl_videos import crop_video
+
+        crop_dir = output_dir / "_cropped"
+        crop_dir.mkdir(exist_ok=True)
+        cropped = []
+        for src, dst in jobs:
+            if src.suffix.lower() == ".mp4":
+                crop_video(src, crop_dir / src.name)
+                if (crop_dir / src.name).exists():
+                    src = crop_dir / src.name
+            cropped.append((src, dst))
+        jobs = cropped
+
+    print(f"Normalizing {len(jobs)} clips → {output_dir} "
+          f"({args.size}x{args.size}, {args.fps}fps, H.264) with {args.workers} workers")
+    start = time.perf_counter()
+    normalized = {}
+
+    def run(src: Path, dst: Path):
+        transcode(src, dst, args.size, args.fps, args.crf)
+        return src, dst
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(run, src, dst) for src, dst in jobs]
+        for future in as_completed(futures):
+            try:
+                src, dst = future.result()
+                normalized[src.name] = dst.name
+                print(f"  ✓ {src.name} → {dst.name}")
+            except subprocess.CalledProcessError as e:
+                print(f"  ✗ {e.cmd[e.cmd.index('-i') + 1]}: {e.stderr.decode(errors='replace').strip()}")
+
+    print(f"Transcoded {len(normalized)}/{len(jobs)} clips in {time.perf_counter() - start:.1f}s")
+    build_manifest(output_dir, args.workers)
+
+    if args.update_dictionary and normalized:
+        publish(normalized, output_dir, CLIPS_DIR, args.workers)
+        write_dictionary({k: normalized.get(Path(v).name, v) for k, v in dictionary.items()})
+        print(f"Updated {DICT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
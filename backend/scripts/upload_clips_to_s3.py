@@ -1,26 +1,181 @@
 """
-Run after generate_isl_clips.py to upload local clips to S3.
+Run after generate_isl_clips.py to sync local clips to S3.
 python scripts/upload_clips_to_s3.py
+python scripts/upload_clips_to_s3.py --dry-run     # show what would be uploaded
+
+Uploads every .mp4 and .webm in isl_clips/ and its subdirectories (e.g.
+alphabet/; not the _rendered/ cache) with the right ContentType and
+Cache-Control, in parallel, keyed by their path relative to isl_clips/. A clip is skipped when the ETag S3 already has
+for it matches the ETag its local bytes would produce, so re-running on an
+unchanged library only costs a bucket listing. Local ETags are cached in
+isl_clips/.s3_sync_cache.json by size + mtime, so unchanged files aren't re-read.
 """
-import boto3, os
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+
+import boto3
+from boto3.s3.transfer import TransferConfig
 from dotenv import load_dotenv
 
 load_dotenv(Path(__file__).parent.parent / ".env")
 
-s3 = boto3.client("s3", region_name=os.getenv("AWS_REGION"))
-bucket = os.getenv("S3_BUCKET_NAME")
-clips_dir = Path(__file__).parent.parent / "isl_clips"
+CLIPS_DIR = Path(__file__).parent.parent / "isl_clips"
+CACHE_PATH = CLIPS_DIR / ".s3_sync_cache.json"
+PREFIX = "isl-clips/"
+
+CONTENT_TYPES = {".mp4": "video/mp4", ".webm": "video/webm"}
+# Server-side sentence render cache (services/render.py); not part of the library
+SKIP_DIRS = {"_rendered"}
+CACHE_CONTROL = os.getenv("S3_CLIP_CACHE_CONTROL", "public, max-age=86400")
+
+# Multipart settings; local ETags are computed with the same part size
+PART_SIZE = max(5, int(os.getenv("S3_UPLOAD_PART_SIZE_MB", "8"))) * 1024 * 1024
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=PART_SIZE,
+    multipart_chunksize=PART_SIZE,
+    max_concurrency=4,
+)
+
+
+def s3_etag(path: Path, part_size: int = PART_SIZE) -> str:
+    """
+    The ETag S3 assigns to `path` when uploaded with `part_size` parts:
+    the MD5 for single-part uploads, md5(part md5s)-N for multipart.
+    """
+    digests = []
+    with open(path, "rb") as f:
+        for part in iter(lambda: f.read(part_size), b""):
+            digests.append(hashlib.md5(part).digest())
+    if path.stat().st_size < part_size:
+        return (digests[0] if digests else hashlib.md5(b"").digest()).hex()
+    return f"{hashlib.md5(b''.join(digests)).hexdigest()}-{len(digests)}"
+
+
+def clip_name(path: Path) -> str:
+    """Path relative to isl_clips/, as used in S3 keys and clip URLs (alphabet/a.mp4)."""
+    return path.relative_to(CLIPS_DIR).as_posix()
+
+
+def list_clips() -> list[Path]:
+    """Every clip under isl_clips/, skipping hidden files and directories and SKIP_DIRS."""
+    files = []
+    for p in CLIPS_DIR.rglob("*"):
+        parts = p.relative_to(CLIPS_DIR).parts
+        if any(part.startswith(".") for part in parts) or parts[0] in SKIP_DIRS:
+            continue
+        if p.is_file() and p.suffix.lower() in CONTENT_TYPES:
+            files.append(p)
+    return sorted(files)
+
+
+def load_cache() -> dict:
+    try:
+        with open(CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache: dict):
+    tmp = CACHE_PATH.with_name(f".{CACHE_PATH.name}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp, CACHE_PATH)
+
+
+def local_etags(files: list[Path], workers: int) -> dict:
+    """name → expected ETag, reusing cached values for files whose size and mtime are unchanged."""
+    cache = load_cache()
+    result = {}
+    stale = []
+    for p in files:
+        stat = p.stat()
+        entry = cache.get(clip_name(p))
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns \
+                and entry.get("part_size") == PART_SIZE:
+            result[clip_name(p)] = entry["etag"]
+        else:
+            stale.append(p)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for p, etag in zip(stale, pool.map(s3_etag, stale)):
+            stat = p.stat()
+            cache[clip_name(p)] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                             "part_size": PART_SIZE, "etag": etag}
+            result[clip_name(p)] = etag
+
+    cache = {name: cache[name] for name in result}
+    if stale or len(cache) != len(load_cache()):
+        save_cache(cache)
+    return result
+
+
+def remote_etags(s3, bucket: str) -> dict:
+    """name → ETag of every object under PREFIX, from list_objects_v2 (no per-object requests)."""
+    etags = {}
+    for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=PREFIX):
+        for obj in page.get("Contents", []):
+            etags[obj["Key"][len(PREFIX):]] = obj["ETag"].strip('"')
+    return etags
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync ISL clips to S3")
+    parser.add_argument("--workers", type=int, default=8, help="Files uploaded in parallel")
+    parser.add_argument("--force", action="store_true", help="Upload every clip even if unchanged")
+    parser.add_argument("--dry-run", action="store_true", help="List changed clips without uploading")
+    args = parser.parse_args()
+
+    s3 = boto3.client("s3", region_name=os.getenv("AWS_REGION"))
+    bucket = os.getenv("S3_BUCKET_NAME")
+
+    start = time.perf_counter()
+    files = list_clips()
+    local = local_etags(files, args.workers)
+    remote = {} if args.force else remote_etags(s3, bucket)
+    changed = [p for p in files if remote.get(clip_name(p)) != local[clip_name(p)]]
+
+    print(f"{len(files)} clips, {len(files) - len(changed)} unchanged, "
+          f"{len(changed)} to upload to s3://{bucket}/{PREFIX}")
+    if args.dry_run:
+        for p in changed:
+            print(f"  {clip_name(p)}")
+        return
+
+    def upload(clip: Path):
+        s3.upload_file(
+            str(clip), bucket, f"{PREFIX}{clip_name(clip)}",
+            ExtraArgs={
+                "ContentType": CONTENT_TYPES[clip.suffix.lower()],
+                "CacheControl": CACHE_CONTROL,
+            },
+            Config=TRANSFER_CONFIG,
+        )
+        return clip
+
+    failed = []
+    uploaded = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(upload, p): p for p in changed}
+        for future in as_completed(futures):
+            clip = futures[future]
+            try:
+                future.result()
+                uploaded += 1
+                print(f"  ✓ {clip_name(clip)}")
+            except Exception as e:
+                failed.append(clip_name(clip))
+                print(f"  ✗ {clip_name(clip)}: {e}")
 
-files = list(clips_dir.glob("*.mp4"))
-print(f"Uploading {len(files)} clips to s3://{bucket}/isl-clips/")
+    print(f"Done. Uploaded {uploaded}/{len(changed)} in {time.perf_counter() - start:.1f}s.")
+    if failed:
+        print(f"Failed: {', '.join(failed)}. Re-run to retry.")
 
-for clip in files:
-    print(f"  {clip.name}...", end=" ")
-    s3.upload_file(
-        str(clip), bucket, f"isl-clips/{clip.name}",
-        ExtraArgs={"ContentType": "video/mp4"}
-    )
-    print("✓")
 
-print("Done.")
+if __name__ == "__main__":
+    main()
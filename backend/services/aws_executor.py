@@ -0,0 +1,24 @@
+"""
+Bounded thread pool for blocking boto3 / HTTP calls made from async routes
+"""
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+AWS_EXECUTOR_WORKERS = int(os.getenv("AWS_EXECUTOR_WORKERS", "8"))
+
+_executor = ThreadPoolExecutor(max_workers=AWS_EXECUTOR_WORKERS, thread_name_prefix="aws")
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Run a blocking call on the AWS executor without blocking the event loop.
+    At most AWS_EXECUTOR_WORKERS calls run at once; the rest queue up.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+def shutdown_executor():
+    _executor.shutdown(wait=False, cancel_futures=True)
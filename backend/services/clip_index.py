@@ -0,0 +1,396 @@
+"""
+Shared, immutable snapshot of isl_dictionary.json with cached clip URLs
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from types import MappingProxyType
+from typing import NamedTuple
+
+from services.compiled_dictionary import CompiledDictionary, build, compile_dictionary
+from services.metrics import timed
+from services.word_matcher import FuzzyMatcher
+
+logger = logging.getLogger(__name__)
+
+DICT_PATH = Path(__file__).parent.parent / "isl_dictionary.json"
+# Built by scripts/build_dictionary_index.py; used instead of the JSON while it is current
+COMPILED_PATH = DICT_PATH.with_suffix(".idx")
+CLIPS_DIR = Path(__file__).parent.parent / "isl_clips"
+# Written by scripts/normalize_clips.py; optional
+MANIFEST_PATH = CLIPS_DIR / "clip_manifest.json"
+# One clip per letter/digit for fingerspelling, named by the character (a.webm, 7.mp4); optional
+ALPHABET_DIR = CLIPS_DIR / "alphabet"
+
+# How often (seconds) the dictionary file is stat'ed for changes
+RELOAD_INTERVAL = float(os.getenv("ISL_DICT_RELOAD_INTERVAL", "2"))
+# Typo tolerance of the fuzzy fallback (opt-in; 0 disables it) and the shortest word it applies to
+FUZZY_MAX_EDITS = int(os.getenv("ISL_FUZZY_MAX_EDITS", "0"))
+FUZZY_MIN_LENGTH = int(os.getenv("ISL_FUZZY_MIN_LENGTH", "4"))
+# Recent match() results kept per snapshot; the memo is dropped when it fills up
+MATCH_MEMO_SIZE = 50_000
+
+
+class ClipEntry(NamedTuple):
+    filename: str
+    local_url: str
+    s3_url: str
+    # From clip_manifest.json when available
+    duration: float | None = None
+    bytes: int | None = None
+    sha256: str | None = None
+    # Content version token, also carried as ?v= on both URLs
+    version: str | None = None
+
+
+def clip_version(stat_result: os.stat_result, meta: dict | None = None, manifest_mtime_ns: int | None = None) -> str:
+    """
+    Version token of a clip file: its manifest sha256 when the manifest entry
+    is current (same size, manifest written after the clip), else a hash of
+    mtime and size. Used for ?v= URLs and as the /clips ETag.
+    """
+    if (
+        meta
+        and meta.get("sha256")
+        and meta.get("bytes") == stat_result.st_size
+        and manifest_mtime_ns is not None
+        and stat_result.st_mtime_ns <= manifest_mtime_ns
+    ):
+        return meta["sha256"][:16]
+    stamp = f"{stat_result.st_mtime_ns}-{stat_result.st_size}"
+    return hashlib.sha1(stamp.encode()).hexdigest()[:16]
+
+
+def scan_alphabet(directory: Path = ALPHABET_DIR) -> dict:
+    """
+    Character → clip path relative to isl_clips/ for every single-character
+    clip in `directory`. .mp4 wins over .webm when both exist.
+    """
+    alphabet = {}
+    try:
+        files = sorted(directory.iterdir(), key=lambda p: p.suffix.lower() != ".mp4")
+    except OSError:
+        return alphabet
+    for p in files:
+        char = p.stem.lower()
+        if len(char) == 1 and char.isalnum() and p.suffix.lower() in (".mp4", ".webm"):
+            alphabet.setdefault(char, f"{directory.name}/{p.name}")
+    return alphabet
+
+
+class _Entries(Mapping):
+    """Lowercased dictionary key → ClipEntry, read from the compiled table on demand."""
+
+    def __init__(self, index: "ClipIndex"):
+        self._index = index
+        self._keys = index.compiled.keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys.strings())
+
+    def __getitem__(self, key: str) -> ClipEntry:
+        i = self._keys.find(key)
+        if i is None:
+            raise KeyError(key)
+        return self._index._entry(self._keys.values[i])
+
+
+class ClipIndex:
+    """
+    Read-only view of the ISL dictionary, backed by its compiled form
+    (services/compiled_dictionary.py): keys, inflections, phrases and the
+    fuzzy deletion index are binary-searched in place, not copied into
+    Python dicts, so a memory-mapped .idx costs each worker almost nothing.
+    Each clip's ClipEntry (local and S3 URL plus duration and size from the
+    clip manifest) is built the first time it is looked up and reused,
+    as are recent match() results.
+    URLs end in ?v=<content version> so a replaced clip gets a new URL:
+    the (mtime, size) each entry was built from is kept, and
+    get_clip_index() swaps in refreshed() when one of those files changes.
+    """
+
+    def __init__(
+        self,
+        dictionary: "dict | CompiledDictionary",
+        manifest: dict | None = None,
+        version: str = "empty",
+        stamp: tuple | None = None,
+        clips_dir: Path | None = CLIPS_DIR,
+        alphabet: dict | None = None,
+        fuzzy_edits: int = FUZZY_MAX_EDITS,
+    ):
+        if not isinstance(dictionary, CompiledDictionary):
+            dictionary = CompiledDictionary(
+                compile_dictionary(dictionary, manifest, fuzzy_edits, FUZZY_MIN_LENGTH)
+            )
+        self.compiled = dictionary
+        self.clips_dir = clips_dir
+
+        self.local_base = os.getenv("ISL_CLIPS_BASE_URL", "http://localhost:8000/clips").rstrip("/")
+        region = os.getenv("AWS_REGION", "ap-south-1")
+        bucket = os.getenv("S3_BUCKET_NAME", "samvad-ai-isl-clips")
+        self.s3_base = f"https://{bucket}.s3.{region}.amazonaws.com/isl-clips"
+
+        manifest_stamp = dictionary.manifest_stamp
+        if manifest_stamp is None and stamp and len(stamp) > 1:
+            manifest_stamp = stamp[1]
+        self.manifest_mtime_ns = manifest_stamp[0] if manifest_stamp else None
+
+        # clip number → ClipEntry; token → (clip number, match type)
+        self._clips = {}
+        self._matches = {}
+        # clip filename → _file_stamp() its entry's version was computed from
+        self._clip_stamps = {}
+        self.entries = _Entries(self)
+        self.phrases = dictionary.phrases.strings()
+        self.fuzzy = FuzzyMatcher(
+            dictionary.candidates, dictionary.fuzzy_edits, dictionary.fuzzy_min_length
+        )
+        self.unknown = self._entry(dictionary.unknown)
+        if alphabet is None:
+            alphabet = scan_alphabet(clips_dir / ALPHABET_DIR.name) if clips_dir is not None else {}
+        self._alphabet_files = alphabet
+        # Fingerspelling clips, keyed by lowercase letter or digit
+        self.alphabet = MappingProxyType({char: self._file_entry(f) for char, f in alphabet.items()})
+        self.version = version
+        self.stamp = stamp
+
+    def __len__(self) -> int:
+        return len(self.compiled)
+
+    def _make_entry(self, filename: str, duration, size, sha256) -> ClipEntry:
+        clip_v = None
+        if self.clips_dir is not None:
+            try:
+                stat = os.stat(self.clips_dir / filename)
+            except OSError:
+                self._clip_stamps[filename] = None
+            else:
+                self._clip_stamps[filename] = (stat.st_mtime_ns, stat.st_size)
+                clip_v = clip_version(stat, {"sha256": sha256, "bytes": size}, self.manifest_mtime_ns)
+        query = f"?v={clip_v}" if clip_v else ""
+        return ClipEntry(
+            filename,
+            f"{self.local_base}/{filename}{query}",
+            f"{self.s3_base}/{filename}{query}",
+            duration,
+            size,
+            sha256,
+            clip_v,
+        )
+
+    def _entry(self, n: int) -> ClipEntry:
+        entry = self._clips.get(n)
+        if entry is None:
+            entry = self._clips[n] = self._make_entry(*self.compiled.clip(n))
+        return entry
+
+    def _file_entry(self, filename: str) -> ClipEntry:
+        n = self.compiled.clips.find(filename)
+        if n is not None:
+            return self._entry(n)
+        return self._make_entry(filename, None, None, None)
+
+    def clip_meta(self, filename: str) -> dict | None:
+        """Manifest metadata ({sha256, bytes, duration}) of a clip file, if any."""
+        n = self.compiled.clips.find(filename)
+        if n is None:
+            return None
+        _, duration, size, sha256 = self.compiled.clip(n)
+        return {"sha256": sha256, "bytes": size, "duration": duration}
+
+    def changed_clips(self) -> list[str]:
+        """Clips whose file was replaced, added or removed since their entry was built."""
+        return [
+            filename for filename, stamp in list(self._clip_stamps.items())
+            if _file_stamp(self.clips_dir / filename) != stamp
+        ]
+
+    def refreshed(self) -> "ClipIndex":
+        """
+        A new snapshot of the same dictionary with every clip re-stat'ed,
+        under a new version (so gloss_cache entries holding the old URLs
+        are not reused).
+        """
+        digest = hashlib.sha1(self.version.encode())
+        for filename in sorted(self._clip_stamps):
+            digest.update(f"\0{filename}:{_file_stamp(self.clips_dir / filename)}".encode())
+        return ClipIndex(
+            self.compiled,
+            version=digest.hexdigest()[:12],
+            stamp=self.stamp,
+            clips_dir=self.clips_dir,
+            alphabet=self._alphabet_files,
+        )
+
+    def lookup(self, token: str) -> ClipEntry | None:
+        return self.entries.get(token.lower())
+
+    def match(self, token: str) -> tuple[ClipEntry | None, str | None]:
+        """
+        (entry, match type) for a token: an exact hit ("exact"), else the
+        word it is a regular inflection of ("lemma": "birds" → bird).
+        (None, None) if neither matches.
+        """
+        word = token.lower()
+        hit = self._matches.get(word)
+        if hit is None:
+            i = self.compiled.keys.find(word)
+            if i is not None:
+                hit = (self.compiled.keys.values[i], "exact")
+            else:
+                i = self.compiled.forms.find(word)
+                hit = (self.compiled.forms.values[i], "lemma") if i is not None else (None, None)
+            if len(self._matches) >= MATCH_MEMO_SIZE:
+                self._matches = {}
+            self._matches[word] = hit
+        n, kind = hit
+        return (self._entry(n), kind) if n is not None else (None, None)
+
+    def fuzzy_match(self, token: str) -> ClipEntry | None:
+        """The entry within FUZZY_MAX_EDITS typos of `token` (off by default), or None."""
+        key = self.fuzzy.lookup(token.lower())
+        return self.entries[key] if key is not None else None
+
+    @classmethod
+    def from_file(
+        cls,
+        path: Path = DICT_PATH,
+        manifest_path: Path = MANIFEST_PATH,
+        compiled_path: Path | None = COMPILED_PATH,
+    ) -> "ClipIndex":
+        """
+        Load the dictionary and, if present, the clip manifest and the
+        fingerspelling alphabet.
+        The compiled dictionary at `compiled_path` is memory-mapped when it
+        was built from the current JSON and manifest with the current fuzzy
+        settings. When it is missing or stale (edited JSON, or a bind mount
+        hiding the one built into the image) it is rebuilt first; only if
+        it can't be written is the JSON compiled in memory.
+        Raises on unreadable/invalid JSON.
+        """
+        stamp = _stamp(path, manifest_path)
+        compiled = _open_compiled(compiled_path, stamp)
+        if compiled is None and compiled_path is not None and stamp[0] is not None:
+            try:
+                build(path, compiled_path, manifest_path if stamp[1] else None, FUZZY_MAX_EDITS, FUZZY_MIN_LENGTH)
+                logger.info(f"Rebuilt compiled dictionary {compiled_path}")
+                # None if the JSON or manifest changed while it was built
+                compiled = _open_compiled(compiled_path, stamp)
+            except OSError as e:
+                logger.warning(f"Could not write compiled dictionary {compiled_path}: {e}")
+        if compiled is None:
+            with open(path, "rb") as f:
+                raw = f.read()
+            manifest = None
+            manifest_source = (None, b"")
+            if stamp[1] is not None:
+                with open(manifest_path, "rb") as f:
+                    raw_manifest = f.read()
+                manifest = json.loads(raw_manifest)
+                manifest_source = (stamp[1], hashlib.sha1(raw_manifest).digest())
+            compiled = CompiledDictionary(compile_dictionary(
+                json.loads(raw), manifest, FUZZY_MAX_EDITS, FUZZY_MIN_LENGTH,
+                source=(stamp[0], hashlib.sha1(raw).digest()), manifest_source=manifest_source,
+            ))
+
+        alphabet = scan_alphabet(Path(manifest_path).parent / ALPHABET_DIR.name)
+        # Same version whichever form was loaded
+        digest = hashlib.sha1(compiled.source_sha1 + compiled.manifest_sha1)
+        digest.update(json.dumps(alphabet, sort_keys=True).encode())
+
+        return cls(
+            compiled,
+            version=digest.hexdigest()[:12],
+            stamp=stamp,
+            alphabet=alphabet,
+        )
+
+
+_index = None
+_last_check = 0.0
+_lock = threading.Lock()
+
+
+def _file_stamp(path: Path) -> tuple | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _open_compiled(path: Path | None, stamp: tuple) -> CompiledDictionary | None:
+    """The compiled dictionary at `path` if it matches the dictionary / manifest `stamp` and fuzzy settings."""
+    if path is None or stamp[0] is None or not os.path.exists(path):
+        return None
+    try:
+        compiled = CompiledDictionary.open(path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring compiled dictionary {path}: {e}")
+        return None
+    if (
+        compiled.source_stamp != stamp[0]
+        or compiled.manifest_stamp != stamp[1]
+        or compiled.fuzzy_edits != FUZZY_MAX_EDITS
+        or compiled.fuzzy_min_length != FUZZY_MIN_LENGTH
+    ):
+        logger.info(f"Compiled dictionary {path} is stale")
+        return None
+    return compiled
+
+
+def _stamp(path: Path = DICT_PATH, manifest_path: Path = MANIFEST_PATH) -> tuple:
+    """Change stamp of the dictionary, manifest and alphabet directory."""
+    return (
+        _file_stamp(path),
+        _file_stamp(manifest_path),
+        _file_stamp(Path(manifest_path).parent / ALPHABET_DIR.name),
+    )
+
+
+def get_clip_index() -> ClipIndex:
+    """
+    Return the current ClipIndex snapshot.
+    The dictionary, manifest and alphabet directory are stat'ed at most every RELOAD_INTERVAL seconds; when one has
+    changed a new index is built and swapped in as a single reference
+    assignment, so callers holding the old snapshot are unaffected.
+    On the same tick the clips already handed out are re-stat'ed, and a
+    clip replaced in place swaps in a refreshed snapshot with new ?v= URLs.
+    A dictionary that fails to load keeps the previous snapshot.
+    """
+    global _index, _last_check
+    now = time.monotonic()
+    if _index is not None and now - _last_check < RELOAD_INTERVAL:
+        return _index
+
+    with _lock:
+        if _index is not None and now - _last_check < RELOAD_INTERVAL:
+            return _index
+        _last_check = now
+
+        stamp = _stamp(DICT_PATH, MANIFEST_PATH)
+        if _index is not None and stamp == _index.stamp:
+            changed = _index.changed_clips()
+            if changed:
+                _index = _index.refreshed()
+                logger.info(f"Clips changed on disk ({', '.join(changed[:5])}); version {_index.version}")
+            return _index
+
+        try:
+            with timed("dictionary_load"):
+                index = ClipIndex.from_file(DICT_PATH, MANIFEST_PATH)
+            logger.info(f"Loaded ISL dictionary: {len(index)} entries (version {index.version})")
+        except (OSError, ValueError) as e:
+            logger.error(f"Error loading dictionary: {e}")
+            index = _index if _index is not None else ClipIndex({}, stamp=stamp)
+        _index = index
+        return _index
@@ -0,0 +1,45 @@
+"""
+Static file serving for /clips with content-hash ETags and long-lived caching
+"""
+import os
+
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from services.clip_index import clip_version, get_clip_index
+
+# Versioned URLs never change content, so browsers may keep them for a year
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Unversioned (or stale ?v=) requests are cached but revalidated every time
+REVALIDATE = "public, no-cache"
+
+
+class ClipStaticFiles(StaticFiles):
+    """
+    StaticFiles for isl_clips/.
+
+    - ETag is the clip's version token (manifest sha256, else mtime + size),
+      so If-None-Match gets a 304 until the file actually changes.
+    - A request whose ?v= matches the current token is served as immutable;
+      anything else must revalidate.
+    - Range requests (seeking) are answered with 206 by FileResponse.
+    """
+
+    def file_response(self, full_path, stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+
+        index = get_clip_index()
+        # Manifest keys are paths relative to isl_clips/ (e.g. alphabet/a.mp4)
+        name = self.get_path(scope).replace(os.sep, "/")
+        version = clip_version(stat_result, index.clip_meta(name), index.manifest_mtime_ns)
+
+        response.headers["etag"] = f'"{version}"'
+        requested = QueryParams(scope.get("query_string", b"")).get("v")
+        response.headers["cache-control"] = IMMUTABLE if requested == version else REVALIDATE
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
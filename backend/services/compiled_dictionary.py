@@ -0,0 +1,285 @@
+"""
+Compact, memory-mapped binary form of isl_dictionary.json
+
+isl_dictionary.json (plus clip_manifest.json) stays the editable source;
+scripts/build_dictionary_index.py compiles it into isl_dictionary.idx.
+ClipIndex answers lookups by binary-searching the file in place: it is
+mmap'ed read-only, so the workers on a host share one copy through the OS
+page cache, and loading it reads the header and section offsets only.
+Without a current .idx the same layout is compiled in memory from the JSON.
+
+Layout (little-endian, sections 8-byte aligned):
+    header     magic "ISLD", format version, fuzzy edits / min length,
+               unknown clip, JSON and manifest (mtime_ns, size, sha1),
+               section offsets
+    keys       lowercased dictionary key → clip number      (sorted table)
+    forms      regular inflection ("birds") → clip number   (sorted table)
+    phrases    multi-word keys                              (table)
+    deletes    fuzzy deletion string → postings offset      (sorted table)
+    postings   per deletion string: count, then key numbers
+    clips      clip filename → record number                (sorted table)
+    durations  per clip: f64 seconds, NaN if unknown
+    sizes      per clip: i64 bytes, -1 if unknown
+    sha256     per clip: manifest hash, "" if unknown       (table)
+
+A table is: u32 count, (count + 1) u32 string offsets, count u32 values,
+then the NUL-terminated UTF-8 strings. Sorted tables are ordered bytewise.
+"""
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+
+from services.word_matcher import deletion_index, inflections
+
+MAGIC = b"ISLD"
+FORMAT_VERSION = 2
+_SEP = b"\0"
+_HEADER = struct.Struct("<4sIIII" + "QQ20s" * 2 + "9Q")
+_U32 = struct.Struct("<I")
+
+
+def _pad(data: bytes) -> bytes:
+    return data + _SEP * (-len(data) % 8)
+
+
+def _table(strings: list[str], values: list[int] | None = None) -> bytes:
+    encoded = [s.encode() + _SEP for s in strings]
+    if any(e.count(_SEP) > 1 for e in encoded):
+        raise ValueError("Dictionary keys and filenames cannot contain NUL characters")
+    offsets = [0]
+    for e in encoded:
+        offsets.append(offsets[-1] + len(e))
+    if values is None:
+        values = [0] * len(strings)
+    return _pad(b"".join([
+        _U32.pack(len(strings)),
+        struct.pack(f"<{len(offsets)}I", *offsets),
+        struct.pack(f"<{len(values)}I", *values),
+        *encoded,
+    ]))
+
+
+class _Table:
+    """A table section, read in place."""
+
+    def __init__(self, buf, view: memoryview, pos: int):
+        (count,) = _U32.unpack_from(buf, pos)
+        pos += 4
+        self._offsets = view[pos:pos + 4 * (count + 1)].cast("I")
+        pos += 4 * (count + 1)
+        self.values = view[pos:pos + 4 * count].cast("I")
+        pos += 4 * count
+        self._buf = buf
+        self._blob = pos
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _raw(self, i: int) -> bytes:
+        return self._buf[self._blob + self._offsets[i]:self._blob + self._offsets[i + 1] - 1]
+
+    def string(self, i: int) -> str:
+        return self._raw(i).decode()
+
+    def strings(self) -> list[str]:
+        """Every string, decoded in one pass."""
+        return self._buf[self._blob:self._blob + self._offsets[self._count]].decode().split("\0")[:-1]
+
+    def find(self, key: str) -> int | None:
+        """Position of `key` in a sorted table, or None."""
+        target = key.encode()
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._raw(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._raw(lo) == target:
+            return lo
+        return None
+
+
+class CompiledDictionary:
+    """
+    Read-only view over a compiled dictionary, either mmap'ed from a file
+    (see open()) or held in memory. Nothing is decoded up front.
+    """
+
+    def __init__(self, buf):
+        if sys.byteorder != "little":
+            raise ValueError("Compiled dictionaries are only readable on little-endian hosts")
+        if len(buf) < _HEADER.size:
+            raise ValueError("Not a compiled dictionary")
+        (
+            magic, version, self.fuzzy_edits, self.fuzzy_min_length, self.unknown,
+            mtime_ns, size, self.source_sha1,
+            manifest_mtime_ns, manifest_size, self.manifest_sha1,
+            *sections,
+        ) = _HEADER.unpack_from(buf)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Not a compiled dictionary (format {FORMAT_VERSION})")
+        # (mtime_ns, size) of the files it was built from, as in clip_index._file_stamp
+        self.source_stamp = (mtime_ns, size) if size else None
+        self.manifest_stamp = (manifest_mtime_ns, manifest_size) if manifest_size else None
+
+        view = memoryview(buf)
+        keys, forms, phrases, deletes, postings, clips, durations, sizes, sha256 = sections
+        self.keys = _Table(buf, view, keys)
+        self.forms = _Table(buf, view, forms)
+        self.phrases = _Table(buf, view, phrases)
+        self.deletes = _Table(buf, view, deletes)
+        self.clips = _Table(buf, view, clips)
+        self._postings = view[postings:clips].cast("I")
+        self._durations = view[durations:durations + 8 * len(self.clips)].cast("d")
+        self._sizes = view[sizes:sizes + 8 * len(self.clips)].cast("q")
+        self._sha256 = _Table(buf, view, sha256)
+        self._buf = buf
+
+    @classmethod
+    def open(cls, path: Path) -> "CompiledDictionary":
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def clip(self, n: int) -> tuple[str, float | None, int | None, str | None]:
+        """(filename, duration, bytes, sha256) of clip number n."""
+        duration = self._durations[n]
+        size = self._sizes[n]
+        return (
+            self.clips.string(n),
+            None if math.isnan(duration) else duration,
+            None if size < 0 else size,
+            self._sha256.string(n) or None,
+        )
+
+    def candidates(self, deletion: str) -> list[str]:
+        """Keys indexed under a fuzzy deletion string."""
+        i = self.deletes.find(deletion)
+        if i is None:
+            return []
+        start = self.deletes.values[i]
+        count = self._postings[start]
+        return [self.keys.string(k) for k in self._postings[start + 1:start + 1 + count]]
+
+
+def compile_dictionary(
+    dictionary: dict,
+    manifest: dict | None = None,
+    fuzzy_edits: int = 0,
+    fuzzy_min_length: int = 4,
+    source: tuple = (None, b""),
+    manifest_source: tuple = (None, b""),
+) -> bytes:
+    """
+    Serialize a dictionary (key → clip filename) and optional clip manifest.
+    `source` / `manifest_source` are ((mtime_ns, size) or None, sha1 digest)
+    of the files they came from, recorded so stale builds can be detected.
+    """
+    entries = {k.lower(): v for k, v in dictionary.items() if k != "UNKNOWN"}
+    unknown = dictionary.get("UNKNOWN", "unknown.webm")
+    meta = (manifest or {}).get("clips", {})
+
+    filenames = sorted({*entries.values(), unknown, *meta}, key=str.encode)
+    clip_number = {f: i for i, f in enumerate(filenames)}
+    keys = sorted(entries, key=str.encode)
+    key_number = {k: i for i, k in enumerate(keys)}
+
+    # A form two different clips claim is ambiguous and left out
+    forms = {}
+    for key in keys:
+        if " " in key:
+            continue
+        for form in inflections(key):
+            if form not in entries:
+                previous = forms.get(form, entries[key])
+                forms[form] = entries[key] if previous == entries[key] else None
+    forms = {f: c for f, c in forms.items() if c is not None}
+    form_keys = sorted(forms, key=str.encode)
+
+    deletes = deletion_index((k for k in keys if " " not in k), fuzzy_edits, fuzzy_min_length)
+    delete_keys = sorted(deletes, key=str.encode)
+    postings = []
+    delete_offsets = []
+    for d in delete_keys:
+        delete_offsets.append(len(postings))
+        postings.append(len(deletes[d]))
+        postings.extend(key_number[k] for k in deletes[d])
+
+    durations = [meta.get(f, {}).get("duration") for f in filenames]
+    sizes = [meta.get(f, {}).get("bytes") for f in filenames]
+
+    sections = [
+        _table(keys, [clip_number[entries[k]] for k in keys]),
+        _table(form_keys, [clip_number[forms[f]] for f in form_keys]),
+        _table([k for k in keys if " " in k]),
+        _table(delete_keys, delete_offsets),
+        _pad(struct.pack(f"<{len(postings)}I", *postings)),
+        _table(filenames, list(range(len(filenames)))),
+        struct.pack(f"<{len(filenames)}d", *(float("nan") if d is None else d for d in durations)),
+        struct.pack(f"<{len(filenames)}q", *(-1 if b is None else b for b in sizes)),
+        _table([meta.get(f, {}).get("sha256") or "" for f in filenames]),
+    ]
+    offsets = []
+    pos = _HEADER.size + (-_HEADER.size % 8)
+    for section in sections:
+        offsets.append(pos)
+        pos += len(section)
+
+    stamp, sha1 = source
+    manifest_stamp, manifest_sha1 = manifest_source
+    header = _pad(_HEADER.pack(
+        MAGIC, FORMAT_VERSION, fuzzy_edits, fuzzy_min_length, clip_number[unknown],
+        *(stamp or (0, 0)), sha1,
+        *(manifest_stamp or (0, 0)), manifest_sha1,
+        *offsets,
+    ))
+    return header + b"".join(sections)
+
+
+def _read(path: Path) -> tuple[tuple, bytes, bytes]:
+    # Stat first: if the file changes while we read it, the stamp is stale and the build unused
+    stat = os.stat(path)
+    with open(path, "rb") as f:
+        raw = f.read()
+    return (stat.st_mtime_ns, stat.st_size), raw, hashlib.sha1(raw).digest()
+
+
+def build(
+    source: Path,
+    output: Path,
+    manifest_path: Path | None = None,
+    fuzzy_edits: int = 0,
+    fuzzy_min_length: int = 4,
+) -> CompiledDictionary:
+    """Compile the JSON dictionary (and manifest, if it exists) into `output`, atomically."""
+    stamp, raw, sha1 = _read(source)
+    manifest = None
+    manifest_source = (None, b"")
+    if manifest_path is not None and os.path.exists(manifest_path):
+        manifest_stamp, raw_manifest, manifest_sha1 = _read(manifest_path)
+        manifest = json.loads(raw_manifest)
+        manifest_source = (manifest_stamp, manifest_sha1)
+
+    data = compile_dictionary(
+        json.loads(raw), manifest, fuzzy_edits, fuzzy_min_length,
+        source=(stamp, sha1), manifest_source=manifest_source,
+    )
+    # Per-process name: several workers may rebuild a stale file at once
+    partial = output.with_name(f".{output.name}.{os.getpid()}.partial")
+    try:
+        with open(partial, "wb") as f:
+            f.write(data)
+        os.replace(partial, output)
+    finally:
+        if partial.exists():
+            partial.unlink()
+    return CompiledDictionary.open(output)
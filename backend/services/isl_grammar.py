@@ -1,10 +1,27 @@
-import spacy
+import logging
+import os
 import re
 
-nlp = spacy.load("en_core_web_sm")
+from services.clip_index import ClipIndex, get_clip_index
+from services.metrics import timed
+from services.phrase_matcher import PhraseMatcher
+
+logger = logging.getLogger(__name__)
+
+# "rule" is the dependency-free default; "linguistic" lemmatizes with spaCy
+GLOSS_MODES = ("rule", "linguistic")
+
+SPACY_MODEL = os.getenv("ISL_SPACY_MODEL", "en_core_web_sm")
+# The linguistic mode only needs tokenizer + tagger + lemmatizer,
+# so the heavy components are never loaded
+SPACY_EXCLUDE = ["parser", "ner", "senter"]
+
+
+class NLPUnavailable(RuntimeError):
+    """The linguistic gloss mode was requested but spaCy or its model is not installed."""
 
 # Words to remove — ISL has no articles or linking verbs
-DROP_WORDS = {
+DROP_WORDS = frozenset({
     "a", "an", "the",
     "is", "am", "are", "was", "were", "be", "been", "being",
     "do", "does", "did",
@@ -13,13 +30,13 @@ DROP_WORDS = {
     "it", "its", "this", "that", "these", "those",
     "of", "in", "on", "at", "to", "for", "with", "by", "from",
     "and", "or", "but", "so", "yet",
-}
+})
 
-TIME_WORDS = {
+TIME_WORDS = frozenset({
     "today", "tomorrow", "yesterday", "now", "later", "soon",
     "morning", "evening", "night", "always", "never", "sometimes",
     "daily", "weekly", "yearly",
-}
+})
 
 CONTRACTION_MAP = {
     "don't": "not",
@@ -49,67 +66,232 @@ CONTRACTION_MAP = {
 }
 
 
-def convert_to_isl_gloss(text: str) -> list[str]:
+# Anything that is not a lowercase letter or whitespace is treated as a separator
+_NON_WORD_RE = re.compile(r"[^a-z\s]")
+# With fingerspelling on, digits are kept too so numbers can be spelled out
+_NON_WORD_DIGITS_RE = re.compile(r"[^a-z0-9\s]")
+
+
+def _tokenize(text: str, digits: bool = False) -> list[str]:
+    """Lowercase text and split it into bare word tokens."""
+    return (_NON_WORD_DIGITS_RE if digits else _NON_WORD_RE).sub(" ", text.lower()).split()
+
+
+def _clean(word: str, digits: bool = False) -> str:
+    return (_NON_WORD_DIGITS_RE if digits else _NON_WORD_RE).sub("", word.lower())
+
+
+def _resolve_contractions(contractions: dict) -> dict:
+    """
+    Follow chained expansions (e.g. "can't" → "cannot" → "can not")
+    so a single regex pass gives the same result as repeated replacement.
+    """
+    resolved = {}
+    for contraction, expansion in contractions.items():
+        seen = {contraction}
+        while expansion in contractions and expansion not in seen:
+            seen.add(expansion)
+            expansion = contractions[expansion]
+        resolved[contraction] = expansion
+    return resolved
+
+
+class GlossEngine:
     """
-    Converts English text to ISL gloss token list.
-    Rules:
-    1. Expand contractions
-    2. Check for multi-word phrases from dictionary
-    3. Remove articles, linking verbs, prepositions, conjunctions
-    4. Move time words to front
-    5. Uppercase all tokens
-    Returns ordered list of ISL gloss tokens.
+    Precompiled English → ISL gloss converter.
+
+    Everything that used to be rebuilt on every call (dictionary load,
+    phrase sort, one str.replace per contraction) is prepared once here:
+    contractions become a single word-boundary regex and multi-word
+    dictionary keys live in a token-level trie for longest-match lookup.
+    `vocabulary` is any iterable of dictionary keys.
     """
-    # Lowercase and expand contractions
-    text = text.lower().strip()
-    for contraction, expansion in CONTRACTION_MAP.items():
-        text = text.replace(contraction, expansion)
-
-    # Load dictionary for phrase matching
-    import json
-    from pathlib import Path
-    dict_path = Path(__file__).parent.parent / "isl_dictionary.json"
-    try:
-        with open(dict_path) as f:
-            dictionary = json.load(f)
-    except:
-        dictionary = {}
-
-    # Sort phrases by length (longest first) to match greedily
-    phrases = sorted([k for k in dictionary.keys() if " " in k], key=len, reverse=True)
-    
-    # Placeholder for matched phrases
-    gloss_tokens = []
-    
-    for phrase in phrases:
-        if phrase in text:
-            # We found a phrase! Replace it with a single token-like string
-            # to prevent it from being split later
-            text = text.replace(phrase, phrase.replace(" ", "_").upper())
-            # Note: This is a hacky way to find phrases, but for 200 words it's okay.
-            # Real production would use a proper phrase matcher or trie.
-
-    # Tokenize — remove punctuation but keep our underscores
-    text = re.sub(r"[^A-Z_a-z\s]", " ", text)
-    words = text.split()
-
-    time_tokens = []
-    other_tokens = []
-
-    for word in words:
-        if not word:
-            continue
-        
-        # If it was a phrase, it will be all uppercase and have an underscore
-        if "_" in word and word.isupper():
-            other_tokens.append(word.replace("_", " "))
-            continue
-
-        if word in DROP_WORDS:
-            continue
-        if word in TIME_WORDS:
-            time_tokens.append(word.upper())
+
+    def __init__(
+        self,
+        vocabulary,
+        contractions: dict = CONTRACTION_MAP,
+        drop_words=DROP_WORDS,
+        time_words=TIME_WORDS,
+    ):
+        self.drop_words = frozenset(drop_words)
+        self.time_words = frozenset(time_words)
+
+        self._contractions = _resolve_contractions(contractions)
+        # Longest alternatives first so "can't" wins over any shorter prefix
+        alternatives = sorted(self._contractions, key=len, reverse=True)
+        self._contraction_re = re.compile(
+            r"\b(?:" + "|".join(re.escape(c) for c in alternatives) + r")\b"
+        )
+
+        # Dictionary snapshot this engine was built from (see from_index)
+        self.index = None
+
+        self.phrases = PhraseMatcher()
+        for key in vocabulary:
+            if " " in key:
+                words = _tokenize(key)
+                if len(words) > 1:
+                    # Keep the original key so the gloss token resolves back to it exactly
+                    self.phrases.add(words, key)
+
+    @classmethod
+    def from_index(cls, index: ClipIndex) -> "GlossEngine":
+        """Build an engine over a ClipIndex snapshot and remember it."""
+        # Only multi-word keys feed the phrase trie; the index keeps them in their own table
+        engine = cls(index.phrases)
+        engine.index = index
+        return engine
+
+    def expand_contractions(self, text: str) -> str:
+        """Expand contractions in already-lowercased text in one pass."""
+        return self._contraction_re.sub(lambda m: self._contractions[m.group(0)], text)
+
+    def lemmatize(self, doc, digits: bool = False) -> tuple[list[str], list[str]]:
+        """
+        Split a spaCy Doc into parallel (surface words, lemmas) lists.
+        Phrases are matched on surface words, everything else on lemmas.
+        """
+        words = []
+        lemmas = []
+        for token in doc:
+            if token.is_punct or token.is_space:
+                continue
+            word = _clean(token.text, digits)
+            if not word:
+                continue
+            words.append(word)
+            lemmas.append(_clean(token.lemma_, digits) or word)
+        return words, lemmas
+
+    def gloss_words(self, words: list[str], lemmas: list[str] | None = None) -> list[str]:
+        """
+        Turn word tokens into ordered ISL gloss tokens.
+        Rules:
+        1. Check for multi-word phrases from dictionary
+        2. Remove articles, linking verbs, prepositions, conjunctions
+        3. Move time words to front
+        4. Uppercase all tokens
+        If `lemmas` is given, single words are looked up by their lemma.
+        """
+        time_tokens = []
+        other_tokens = []
+
+        i = 0
+        n = len(words)
+        while i < n:
+            match = self.phrases.longest_match(words, i)
+            # Phrases are kept whole, even if they contain drop words ("my name is")
+            if match is not None:
+                other_tokens.append(match[0].upper())
+                i = match[1]
+                continue
+
+            word = lemmas[i] if lemmas is not None else words[i]
+            i += 1
+            if word in self.drop_words:
+                continue
+            if word in self.time_words:
+                time_tokens.append(word.upper())
+            else:
+                other_tokens.append(word.upper())
+
+        return time_tokens + other_tokens
+
+    def convert(self, text: str, mode: str = "rule", digits: bool = False) -> list[str]:
+        """
+        Converts English text to ISL gloss token list.
+        mode: 'rule'       → regex tokenizer, no NLP model
+              'linguistic' → spaCy tokenizer + lemmatizer (loaded on first use)
+        digits: keep numbers as tokens (only useful when they will be fingerspelled)
+        Returns ordered list of ISL gloss tokens.
+        """
+        if mode not in GLOSS_MODES:
+            raise ValueError(f"Unknown gloss mode: {mode}")
+
+        with timed("contractions"):
+            text = self.expand_contractions(text.lower().strip())
+        if mode == "linguistic":
+            with timed("lemmatize"):
+                words, lemmas = self.lemmatize(get_nlp()(text), digits)
         else:
-            other_tokens.append(word.upper())
+            with timed("tokenize"):
+                words, lemmas = _tokenize(text, digits), None
+        with timed("phrase_match"):
+            return self.gloss_words(words, lemmas)
+
+    def convert_many(
+        self,
+        texts: list[str],
+        mode: str = "rule",
+        batch_size: int = 64,
+        n_process: int = 1,
+        digits: bool = False,
+    ) -> list[list[str]]:
+        """
+        Convert many texts at once, preserving order.
+        In linguistic mode the texts are streamed through nlp.pipe
+        with the given batch_size / n_process.
+        """
+        if mode not in GLOSS_MODES:
+            raise ValueError(f"Unknown gloss mode: {mode}")
+
+        with timed("gloss_batch"):
+            expanded = [self.expand_contractions(t.lower().strip()) for t in texts]
+            if mode == "linguistic":
+                docs = get_nlp().pipe(expanded, batch_size=batch_size, n_process=n_process)
+                return [self.gloss_words(*self.lemmatize(doc, digits)) for doc in docs]
+            return [self.gloss_words(_tokenize(t, digits)) for t in expanded]
+
+
+_nlp = None
+# Why the pipeline could not be loaded; not retried until restart
+_nlp_error = None
+
+
+def get_nlp():
+    """
+    Load the trimmed spaCy pipeline on first use.
+    spaCy is only imported here so the default rule path never pays for it.
+    Raises NLPUnavailable if spaCy or the model is missing.
+    """
+    global _nlp, _nlp_error
+    if _nlp is None:
+        if _nlp_error is not None:
+            raise NLPUnavailable(_nlp_error)
+        try:
+            import spacy
+
+            logger.info(f"Loading spaCy model {SPACY_MODEL} (excluding {', '.join(SPACY_EXCLUDE)})")
+            _nlp = spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+        except (ImportError, OSError) as e:
+            _nlp_error = (
+                f"gloss_mode 'linguistic' needs spaCy and its {SPACY_MODEL} model "
+                f"(pip install spacy && python -m spacy download {SPACY_MODEL}): {e}"
+            )
+            logger.warning(_nlp_error)
+            raise NLPUnavailable(_nlp_error) from e
+    return _nlp
+
+
+_engine = None
+
+
+def get_gloss_engine() -> GlossEngine:
+    """
+    Return the shared GlossEngine, building it on first use and rebuilding
+    it whenever the shared ClipIndex snapshot is swapped. Use engine.index
+    to resolve clips against the same vocabulary the gloss was built from.
+    """
+    global _engine
+    index = get_clip_index()
+    engine = _engine
+    if engine is None or engine.index is not index:
+        engine = GlossEngine.from_index(index)
+        _engine = engine
+    return engine
+
 
-    return time_tokens + other_tokens
+def convert_to_isl_gloss(text: str, mode: str = "rule") -> list[str]:
+    """Converts English text to ISL gloss tokens using the shared GlossEngine."""
+    return get_gloss_engine().convert(text, mode)
@@ -1,42 +1,155 @@
-import json
 import os
-from pathlib import Path
 
-DICT_PATH = Path(__file__).parent.parent / "isl_dictionary.json"
+from services.clip_index import ClipEntry, ClipIndex, get_clip_index
+from services.metrics import timed
+from services.render import RENDER_DIR, RenderError, render_sequence
 
-# Vocabulary dictionary loaded dynamically inside resolve_clips
+# What to do with tokens that have no signed clip:
+#   off     → the UNKNOWN placeholder clip
+#   letters → one clip per letter/digit from isl_clips/alphabet/
+#   word    → the letters stitched into one cached clip (local mode; falls back to letters)
+FINGERSPELL_MODES = ("off", "letters", "word")
+# Longer unknown tokens are not spelled out; they get the placeholder
+FINGERSPELL_MAX_LETTERS = int(os.getenv("ISL_FINGERSPELL_MAX_LETTERS", "12"))
 
 
-def resolve_clips(gloss_tokens: list[str], mode: str = "local") -> list[dict]:
+def dictionary_version() -> str:
+    """Content hash of the dictionary snapshot currently in use."""
+    return get_clip_index().version
+
+
+def _clip(token: str, entry: ClipEntry, mode: str, kind: str, letter: str | None = None) -> dict:
+    return {
+        "word": token,
+        "url": entry.s3_url if mode == "s3" else entry.local_url,
+        "found": kind == "signed",
+        "duration": entry.duration,
+        "bytes": entry.bytes,
+        "kind": kind,
+        "letter": letter,
+    }
+
+
+def spell(token: str, index: ClipIndex) -> list[tuple[str, ClipEntry]] | None:
+    """(character, clip) pairs spelling `token`, or None if it can't be fingerspelled."""
+    chars = token.lower()
+    if not chars or len(chars) > FINGERSPELL_MAX_LETTERS:
+        return None
+    letters = []
+    for char in chars:
+        entry = index.alphabet.get(char)
+        if entry is None:
+            return None
+        letters.append((char, entry))
+    return letters
+
+
+def _stitched(token: str, letters: list, index: ClipIndex) -> dict | None:
+    """One pre-rendered clip for the whole spelled word (cached on disk by render_sequence)."""
+    try:
+        rendered = render_sequence([entry.filename for _, entry in letters])
+    except RenderError:
+        return None
+    durations = [entry.duration for _, entry in letters]
+    return {
+        "word": token,
+        "url": f"{index.local_base}/{rendered}",
+        "found": False,
+        "duration": sum(durations) if None not in durations else None,
+        "bytes": None,
+        "kind": "fingerspelled",
+        "letter": None,
+    }
+
+
+def renders_available(clips, index: ClipIndex) -> bool:
+    """
+    Whether every stitched clip among `clips` still has its render on disk
+    (render-cache eviction may have deleted it). Touches the ones found so
+    eviction keeps treating them as recently used.
+    """
+    prefix = f"{index.local_base}/{RENDER_DIR.name}/"
+    for clip in clips:
+        if clip["url"].startswith(prefix):
+            try:
+                os.utime(RENDER_DIR / clip["url"][len(prefix):])
+            except OSError:
+                return False
+    return True
+
+
+def resolve_token(token: str, mode: str, index: ClipIndex, fingerspell: str = "off") -> list[dict]:
+    """
+    Clips for one gloss token, trying in order: its own sign ("signed"),
+    the sign of the word it inflects ("lemma"), its fingerspelling,
+    a sign within ISL_FUZZY_MAX_EDITS typos ("fuzzy"), the placeholder.
+    """
+    entry, match = index.match(token)
+    if entry is not None:
+        return [_clip(token, entry, mode, "signed" if match == "exact" else "lemma")]
+
+    if fingerspell != "off":
+        letters = spell(token, index)
+        if letters:
+            if fingerspell == "word" and mode != "s3":
+                stitched = _stitched(token, letters, index)
+                if stitched is not None:
+                    return [stitched]
+            return [_clip(token, e, mode, "fingerspelled", char.upper()) for char, e in letters]
+
+    entry = index.fuzzy_match(token)
+    if entry is not None:
+        return [_clip(token, entry, mode, "fuzzy")]
+    return [_clip(token, index.unknown, mode, "unknown")]
+
+
+def resolve_tokens(
+    gloss_tokens: list[str],
+    mode: str = "local",
+    index: ClipIndex | None = None,
+    fingerspell: str = "off",
+) -> list[list[dict]]:
+    """resolve_clips, grouped per gloss token (a fingerspelled token has one clip per letter)."""
+    if index is None:
+        index = get_clip_index()
+
+    with timed("resolve_clips"):
+        return [resolve_token(token, mode, index, fingerspell) for token in gloss_tokens]
+
+
+def resolve_clips(
+    gloss_tokens: list[str],
+    mode: str = "local",
+    index: ClipIndex | None = None,
+    fingerspell: str = "off",
+) -> list[dict]:
     """
     Maps ISL gloss tokens to video clip URLs.
     mode: 'local' → serves from /clips/ static mount
           's3'    → serves from S3 public bucket
-    Returns list of { word, url, found }
+    index: dictionary snapshot to use (defaults to the current one);
+           pass the GlossEngine's index to keep gloss and clips consistent
+    fingerspell: 'off' | 'letters' | 'word' (see FINGERSPELL_MODES)
+    Returns list of { word, url, found, duration, bytes, kind, letter }
+    (duration in seconds and bytes come from clip_manifest.json, else None;
+    kind is 'signed', 'lemma', 'fingerspelled', 'fuzzy' or 'unknown';
+    found is true for 'signed' only)
     """
-    try:
-        with open(DICT_PATH) as f:
-            dictionary = json.load(f)
-    except Exception as e:
-        print(f"Error loading dictionary: {e}")
-        dictionary = {}
+    return [clip for group in resolve_tokens(gloss_tokens, mode, index, fingerspell) for clip in group]
 
-    region = os.getenv("AWS_REGION", "ap-south-1")
-    bucket = os.getenv("S3_BUCKET_NAME", "samvad-ai-isl-clips")
 
-    results = []
+def clip_filenames(gloss_tokens: list[str], index: ClipIndex | None = None, fingerspell: str = "off") -> list[str]:
+    """Clip file names (relative to isl_clips/) for gloss tokens, unknowns included."""
+    if index is None:
+        index = get_clip_index()
+    filenames = []
     for token in gloss_tokens:
-        key = token.lower()
-        filename = dictionary.get(key)
-        found = filename is not None
-        if not found:
-            filename = dictionary.get("UNKNOWN", "unknown.webm")
-
-        if mode == "s3":
-            url = f"https://{bucket}.s3.{region}.amazonaws.com/isl-clips/{filename}"
-        else:
-            url = f"http://localhost:8000/clips/{filename}"
-
-        results.append({"word": token, "url": url, "found": found})
-
-    return results
+        entry, _ = index.match(token)
+        letters = spell(token, index) if entry is None and fingerspell != "off" else None
+        if letters:
+            filenames.extend(e.filename for _, e in letters)
+            continue
+        if entry is None:
+            entry = index.fuzzy_match(token) or index.unknown
+        filenames.append(entry.filename)
+    return filenames
@@ -0,0 +1,432 @@
+"""
+Asynchronous transcription jobs: pluggable job stores and a shared poller
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from services.aws_executor import run_blocking
+from services.media import detect_audio_format
+from services.metrics import STAGE_SECONDS
+from services.transcribe import JOB_TIMEOUT, TranscribeTransientError
+
+logger = logging.getLogger(__name__)
+
+FINAL_STATUSES = ("completed", "failed")
+# Finished jobs are kept this long (seconds) by InMemoryJobStore
+JOB_TTL = float(os.getenv("TRANSCRIBE_JOB_TTL", "3600"))
+# Jobs still 'uploading' or 'queued' after this long (seconds) were abandoned and are failed
+STUCK_TIMEOUT = float(os.getenv("TRANSCRIBE_STUCK_TIMEOUT", "900"))
+
+
+class JobStore:
+    """
+    Interface for transcription job storage.
+    Jobs are plain dicts keyed by job["id"].
+    update() never moves a job out of a final status, nor changes a job
+    no longer in `if_status` when that is given: it returns the job
+    unchanged instead.
+    """
+
+    def create(self, job: dict):
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> dict | None:
+        raise NotImplementedError
+
+    def update(self, job_id: str, if_status: str | None = None, **fields) -> dict | None:
+        raise NotImplementedError
+
+    def list_by_status(self, status: str) -> list[dict]:
+        raise NotImplementedError
+
+    def claim(self, job_id: str, owner: str, lease: float) -> bool:
+        """
+        Atomically take (or renew) the right to poll a job for `lease`
+        seconds. False while another owner's lease is live, so only one
+        worker sharing the store polls each job.
+        """
+        raise NotImplementedError
+
+
+class InMemoryJobStore(JobStore):
+    """
+    Process-local store. Only suitable for a single uvicorn worker.
+    Finished jobs are dropped `ttl` seconds after they finish.
+    """
+
+    def __init__(self, ttl: float = JOB_TTL):
+        self._jobs = {}
+        # Finished job id → finish time, oldest first
+        self._finished = OrderedDict()
+        self._ttl = ttl
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float):
+        while self._finished:
+            job_id, finished_at = next(iter(self._finished.items()))
+            if now - finished_at < self._ttl:
+                break
+            del self._finished[job_id]
+            self._jobs.pop(job_id, None)
+
+    def create(self, job: dict):
+        with self._lock:
+            self._expire(time.time())
+            self._jobs[job["id"]] = dict(job)
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def update(self, job_id: str, if_status: str | None = None, **fields) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job["status"] in FINAL_STATUSES or if_status not in (None, job["status"]):
+                return dict(job)
+            now = time.time()
+            job.update(fields, updated_at=now)
+            if job["status"] in FINAL_STATUSES:
+                self._finished[job_id] = now
+            return dict(job)
+
+    def list_by_status(self, status: str) -> list[dict]:
+        with self._lock:
+            self._expire(time.time())
+            return [dict(j) for j in self._jobs.values() if j["status"] == status]
+
+    def claim(self, job_id: str, owner: str, lease: float) -> bool:
+        return job_id in self._jobs
+
+
+class SQLiteJobStore(JobStore):
+    """Store shared by all workers on one host through a SQLite file."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS transcription_jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, data TEXT NOT NULL, "
+            "owner TEXT, lease_until REAL)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(transcription_jobs)")}
+        if "owner" not in columns:
+            # Tables created before polling was leased
+            self._conn.execute("ALTER TABLE transcription_jobs ADD COLUMN owner TEXT")
+            self._conn.execute("ALTER TABLE transcription_jobs ADD COLUMN lease_until REAL")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS transcription_jobs_status ON transcription_jobs (status)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def create(self, job: dict):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO transcription_jobs (id, status, data) VALUES (?, ?, ?)",
+                (job["id"], job["status"], json.dumps(job)),
+            )
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM transcription_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, job_id: str, if_status: str | None = None, **fields) -> dict | None:
+        with self._lock, self._conn:
+            # Write-lock before reading so another worker can't update the job in between
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute(
+                "SELECT data FROM transcription_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            job = json.loads(row[0])
+            if job["status"] in FINAL_STATUSES or if_status not in (None, job["status"]):
+                return job
+            job.update(fields, updated_at=time.time())
+            self._conn.execute(
+                "UPDATE transcription_jobs SET status = ?, data = ? WHERE id = ?",
+                (job["status"], json.dumps(job), job_id),
+            )
+            return job
+
+    def list_by_status(self, status: str) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM transcription_jobs WHERE status = ?", (status,)
+            ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def claim(self, job_id: str, owner: str, lease: float) -> bool:
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE transcription_jobs SET owner = ?, lease_until = ? "
+                "WHERE id = ? AND (owner IS NULL OR owner = ? OR lease_until < ?)",
+                (owner, now + lease, job_id, owner, now),
+            )
+        return cursor.rowcount == 1
+
+
+class RedisJobStore(JobStore):
+    """
+    Store for multi-host deployments on any Redis-compatible server.
+    Requires the optional `redis` package.
+    """
+
+    # SET NX the lease, or extend it if this owner already holds it
+    _CLAIM = """
+    if redis.call('set', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then return 1 end
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        redis.call('pexpire', KEYS[1], ARGV[2])
+        return 1
+    end
+    return 0
+    """
+
+    def __init__(self, url: str, prefix: str = "samvad:transcribe"):
+        import redis
+
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._watch_error = redis.WatchError
+        self._claim = self._redis.register_script(self._CLAIM)
+        self._prefix = prefix
+
+    def _key(self, job_id: str) -> str:
+        return f"{self._prefix}:job:{job_id}"
+
+    def _status_key(self, status: str) -> str:
+        return f"{self._prefix}:status:{status}"
+
+    def create(self, job: dict):
+        pipe = self._redis.pipeline()
+        pipe.set(self._key(job["id"]), json.dumps(job))
+        pipe.sadd(self._status_key(job["status"]), job["id"])
+        pipe.execute()
+
+    def get(self, job_id: str) -> dict | None:
+        data = self._redis.get(self._key(job_id))
+        return json.loads(data) if data else None
+
+    def update(self, job_id: str, if_status: str | None = None, **fields) -> dict | None:
+        key = self._key(job_id)
+        with self._redis.pipeline() as pipe:
+            while True:
+                try:
+                    # Retried if another worker writes the job between the read and the write
+                    pipe.watch(key)
+                    data = pipe.get(key)
+                    if not data:
+                        return None
+                    job = json.loads(data)
+                    if job["status"] in FINAL_STATUSES or if_status not in (None, job["status"]):
+                        pipe.reset()
+                        return job
+                    old_status = job["status"]
+                    job.update(fields, updated_at=time.time())
+                    pipe.multi()
+                    pipe.set(key, json.dumps(job))
+                    if job["status"] != old_status:
+                        pipe.srem(self._status_key(old_status), job_id)
+                        pipe.sadd(self._status_key(job["status"]), job_id)
+                    pipe.execute()
+                    return job
+                except self._watch_error:
+                    continue
+
+    def list_by_status(self, status: str) -> list[dict]:
+        ids = self._redis.smembers(self._status_key(status))
+        jobs = (self.get(job_id) for job_id in ids)
+        return [j for j in jobs if j is not None]
+
+    def claim(self, job_id: str, owner: str, lease: float) -> bool:
+        lease_key = f"{self._prefix}:lease:{job_id}"
+        return bool(self._claim(keys=[lease_key], args=[owner, int(lease * 1000)]))
+
+
+def create_job_store(url: str | None = None) -> JobStore:
+    """
+    Build a job store from a URL (default: TRANSCRIBE_JOB_STORE env var).
+    'memory'             → InMemoryJobStore
+    'sqlite:///path.db'  → SQLiteJobStore
+    'redis://host:6379'  → RedisJobStore
+    """
+    url = url or os.getenv("TRANSCRIBE_JOB_STORE", "memory")
+    if url == "memory":
+        return InMemoryJobStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteJobStore(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://")):
+        return RedisJobStore(url)
+    raise ValueError(f"Unsupported TRANSCRIBE_JOB_STORE: {url}")
+
+
+class TranscriptionJobManager:
+    """
+    Runs transcription jobs in the background.
+
+    Job starts happen in per-job tasks; a single poller task
+    then checks every job in 'transcribing' state once per interval, instead
+    of each request sleeping in its own loop. Workers sharing a store
+    claim a lease on each job before checking it, so one worker polls
+    (and finally deletes) each Transcribe job; the poller also fails jobs
+    left 'uploading' or 'queued' for STUCK_TIMEOUT by a worker that died.
+    """
+
+    def __init__(self, store: JobStore, s3_service, transcribe_service, poll_interval: float | None = None):
+        self.store = store
+        self.s3_service = s3_service
+        self.transcribe_service = transcribe_service
+        self.poll_interval = poll_interval or float(os.getenv("TRANSCRIBE_POLL_INTERVAL", "2"))
+        # Held across polls and renewed each one; a dead worker's jobs are taken over when it lapses
+        self.lease = max(30.0, 5 * self.poll_interval)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._poller = None
+        self._tasks = set()
+
+    def start(self):
+        if self._poller is None:
+            self._poller = asyncio.create_task(self._poll_loop())
+
+    async def stop(self):
+        tasks = list(self._tasks)
+        if self._poller is not None:
+            tasks.append(self._poller)
+            self._poller = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def submit(self, fileobj, file_name: str, language_code: str, content_type: str | None = None) -> dict:
+        """
+        Create a job, stream the audio to S3 and start transcription in the
+        background. Returns once the upload is done, without waiting for
+        Transcribe. The upload happens here because the request's file is
+        closed as soon as the response is sent.
+        """
+        content_type, media_format = detect_audio_format(fileobj, file_name, content_type)
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": "uploading",
+            "language_code": language_code,
+            "file_name": file_name,
+            "media_format": media_format,
+            "s3_uri": None,
+            "transcribe_job": None,
+            "transcript": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        self.store.create(job)
+
+        try:
+            s3_uri = await self.s3_service.upload_audio_stream_async(fileobj, file_name, content_type)
+        except asyncio.CancelledError:
+            self.store.update(job["id"], status="failed", error="Upload interrupted")
+            raise
+        except Exception as e:
+            logger.error(f"Transcription job {job['id']} upload failed: {e}")
+            return self.store.update(job["id"], status="failed", error=str(e))
+
+        job = self.store.update(job["id"], status="queued", s3_uri=s3_uri)
+        if job is None or job["status"] != "queued":
+            # Expired or failed as stuck while the upload ran
+            return job
+        task = asyncio.create_task(self._start(job["id"], s3_uri, language_code, media_format))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _start(self, job_id: str, s3_uri: str, language_code: str, media_format: str):
+        try:
+            transcribe_job = await run_blocking(
+                self.transcribe_service.start_job, s3_uri, language_code, media_format
+            )
+            job = self.store.update(
+                job_id, status="transcribing",
+                transcribe_job=transcribe_job, started_at=time.time(),
+            )
+            if job is None or job["status"] != "transcribing":
+                # Nobody will poll it
+                await run_blocking(self.transcribe_service.delete_job, transcribe_job)
+        except asyncio.CancelledError:
+            # Server shutting down: don't leave the job 'queued' forever
+            self.store.update(job_id, status="failed", error="Server stopped before transcription started")
+            raise
+        except Exception as e:
+            logger.error(f"Transcription job {job_id} failed to start: {e}")
+            self.store.update(job_id, status="failed", error=str(e))
+
+    async def _poll_loop(self):
+        while True:
+            try:
+                for job in self.store.list_by_status("transcribing"):
+                    if self.store.claim(job["id"], self.worker_id, self.lease):
+                        await self._check(job)
+                self._fail_stuck()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Transcription poller error: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def _fail_stuck(self):
+        """Fail jobs whose uploading/starting worker went away without updating them."""
+        cutoff = time.time() - STUCK_TIMEOUT
+        for status in ("uploading", "queued"):
+            for job in self.store.list_by_status(status):
+                if job["updated_at"] < cutoff:
+                    logger.error(f"Transcription job {job['id']} stuck in '{status}'; marking failed")
+                    self.store.update(job["id"], if_status=status, status="failed", error=f"Job abandoned while {status}")
+
+    async def _check(self, job: dict):
+        try:
+            result = await run_blocking(
+                self.transcribe_service.check_job, job["transcribe_job"], job["language_code"]
+            )
+        except TranscribeTransientError as e:
+            # Throttled or a network blip: keep the lease and ask again next poll, up to JOB_TIMEOUT
+            logger.warning(f"Transcription job {job['id']} not checked, retrying: {e}")
+            result = None
+        except Exception as e:
+            self.store.update(job["id"], status="failed", error=str(e))
+            return
+
+        if result is not None:
+            self.store.update(job["id"], status="completed", transcript=result["transcript"])
+            STAGE_SECONDS.observe(time.time() - job.get("started_at", job["created_at"]), stage="transcribe_job")
+        elif time.time() - job.get("started_at", job["created_at"]) > JOB_TIMEOUT:
+            logger.error(f"Transcription job timed out: {job['transcribe_job']}")
+            await run_blocking(self.transcribe_service.delete_job, job["transcribe_job"])
+            self.store.update(job["id"], status="failed", error="Transcription job timed out")
+
+    async def wait(self, job_id: str, timeout: float) -> dict | None:
+        """
+        Long-poll: return the job once it reaches a final status
+        or `timeout` seconds have passed, whichever comes first.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.store.get(job_id)
+            if job is None or job["status"] in FINAL_STATUSES:
+                return job
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return job
+            await asyncio.sleep(min(0.5, remaining))
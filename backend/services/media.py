@@ -0,0 +1,71 @@
+"""
+Audio format detection for S3 ContentType and Transcribe MediaFormat
+"""
+import os
+
+# Transcribe MediaFormat → S3 ContentType
+CONTENT_TYPES = {
+    "mp3": "audio/mpeg",
+    "mp4": "audio/mp4",
+    "m4a": "audio/mp4",
+    "wav": "audio/wav",
+    "flac": "audio/flac",
+    "ogg": "audio/ogg",
+    "amr": "audio/amr",
+    "webm": "audio/webm",
+}
+
+_EXTENSIONS = {
+    ".mp3": "mp3", ".mp4": "mp4", ".m4a": "m4a", ".wav": "wav", ".wave": "wav",
+    ".flac": "flac", ".ogg": "ogg", ".oga": "ogg", ".opus": "ogg",
+    ".amr": "amr", ".webm": "webm",
+}
+
+_MIME_TYPES = {
+    "audio/mpeg": "mp3", "audio/mp3": "mp3",
+    "audio/mp4": "mp4", "audio/x-m4a": "m4a", "audio/m4a": "m4a",
+    "audio/wav": "wav", "audio/x-wav": "wav", "audio/wave": "wav", "audio/vnd.wave": "wav",
+    "audio/flac": "flac", "audio/x-flac": "flac",
+    "audio/ogg": "ogg", "audio/opus": "ogg",
+    "audio/amr": "amr", "audio/webm": "webm",
+}
+
+
+def _sniff(header: bytes) -> str | None:
+    """Identify the container from its first bytes."""
+    if header.startswith(b"ID3") or (len(header) > 1 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return "mp3"
+    if header.startswith(b"RIFF") and header[8:12] == b"WAVE":
+        return "wav"
+    if header.startswith(b"fLaC"):
+        return "flac"
+    if header.startswith(b"OggS"):
+        return "ogg"
+    if header.startswith(b"#!AMR"):
+        return "amr"
+    if header.startswith(b"\x1a\x45\xdf\xa3"):
+        return "webm"
+    if header[4:8] == b"ftyp":
+        return "m4a" if header[8:11] == b"M4A" else "mp4"
+    return None
+
+
+def detect_audio_format(fileobj, file_name: str | None = None, content_type: str | None = None) -> tuple[str, str]:
+    """
+    Work out (ContentType, MediaFormat) for an uploaded audio file.
+    Checks the file's magic bytes first, then its extension, then the
+    client-supplied content type; falls back to mp3.
+    The file position is restored afterwards.
+    """
+    position = fileobj.tell()
+    fileobj.seek(0)
+    header = fileobj.read(16)
+    fileobj.seek(position)
+
+    media_format = (
+        _sniff(header)
+        or _EXTENSIONS.get(os.path.splitext(file_name or "")[1].lower())
+        or _MIME_TYPES.get((content_type or "").split(";")[0].strip().lower())
+        or "mp3"
+    )
+    return CONTENT_TYPES[media_format], media_format
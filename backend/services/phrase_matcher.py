@@ -0,0 +1,77 @@
+"""
+Token-level phrase trie for multi-word ISL signs
+"""
+
+# Marks the end of a phrase inside a trie node; maps to the phrase's value
+_END = None
+
+
+class PhraseMatcher:
+    """
+    Word-token trie with greedy longest-match segmentation.
+
+    Phrases are matched on whole tokens only, so "pen" can never match
+    inside "open". Segmenting N tokens walks at most `max_length` trie
+    nodes per position, which makes the cost O(N · max_length) and
+    independent of how many phrases are loaded.
+    """
+
+    def __init__(self):
+        self._root = {}
+        self._size = 0
+        self.max_length = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, words: list[str], value: str):
+        """
+        Register a phrase given as its word tokens.
+        `value` is what segment() emits when the phrase matches.
+        """
+        if not words:
+            return
+        node = self._root
+        for word in words:
+            node = node.setdefault(word, {})
+        if _END not in node:
+            self._size += 1
+        node[_END] = value
+        self.max_length = max(self.max_length, len(words))
+
+    def longest_match(self, words: list[str], start: int) -> tuple[str, int] | None:
+        """
+        Return (value, end) for the longest phrase starting at `start`,
+        or None if no phrase starts there.
+        """
+        node = self._root.get(words[start])
+        match = None
+        end = start + 1
+        n = len(words)
+        while node is not None:
+            if _END in node:
+                match = (node[_END], end)
+            if end == n:
+                break
+            node = node.get(words[end])
+            end += 1
+        return match
+
+    def segment(self, words: list[str]) -> list[tuple[str, bool]]:
+        """
+        Split a token list into the longest non-overlapping phrases in a
+        single left-to-right pass.
+        Returns (token, is_phrase) pairs; phrase tokens are their values.
+        """
+        result = []
+        i = 0
+        n = len(words)
+        while i < n:
+            match = self.longest_match(words, i)
+            if match is not None:
+                result.append((match[0], True))
+                i = match[1]
+            else:
+                result.append((words[i], False))
+                i += 1
+        return result
@@ -0,0 +1,178 @@
+"""
+Server-side sentence rendering: stitch ISL clips into one video with ffmpeg
+"""
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import tempfile
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from services.clip_index import clip_version
+
+logger = logging.getLogger(__name__)
+
+CLIPS_DIR = Path(__file__).parent.parent / "isl_clips"
+# Lives under the /clips static mount so rendered files are served like clips
+RENDER_DIR = CLIPS_DIR / "_rendered"
+RENDER_CACHE_MAX_BYTES = int(os.getenv("ISL_RENDER_CACHE_MB", "500")) * 1024 * 1024
+
+FFMPEG = os.getenv("FFMPEG_BIN", "ffmpeg")
+FFPROBE = os.getenv("FFPROBE_BIN", "ffprobe")
+
+# Re-encode target when clips can't be stream-copied together
+TARGET_SIZE = os.getenv("ISL_RENDER_SIZE", "512x512")
+TARGET_FPS = int(os.getenv("ISL_RENDER_FPS", "25"))
+
+# Bump when the encode settings change so old renders aren't reused
+RENDER_PROFILE = f"v1:{TARGET_SIZE}:{TARGET_FPS}"
+
+# Striped locks: the same sequence is never rendered twice concurrently
+_locks = [threading.Lock() for _ in range(64)]
+
+
+class RenderError(Exception):
+    pass
+
+
+@lru_cache(maxsize=4096)
+def _probe(path: str, mtime_ns: int) -> tuple:
+    """(codec, width, height, pix_fmt, frame rate) of a clip's first video stream."""
+    out = subprocess.run(
+        [FFPROBE, "-v", "error", "-select_streams", "v:0",
+         "-show_entries", "stream=codec_name,width,height,pix_fmt,r_frame_rate",
+         "-of", "json", path],
+        capture_output=True, text=True, check=True,
+    )
+    streams = json.loads(out.stdout).get("streams") or [{}]
+    s = streams[0]
+    return (s.get("codec_name"), s.get("width"), s.get("height"), s.get("pix_fmt"), s.get("r_frame_rate"))
+
+
+def probe_clip(path: Path) -> tuple:
+    return _probe(str(path), path.stat().st_mtime_ns)
+
+
+def render_key(clips: list[tuple[str, str]]) -> str:
+    """
+    Content address of a clip sequence: (path relative to isl_clips/,
+    content version) pairs, so a replaced clip never reuses an old render.
+    """
+    payload = RENDER_PROFILE + "\n" + "\n".join(f"{name}:{version}" for name, version in clips)
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+def _lock_for(key: str) -> threading.Lock:
+    return _locks[int(key[:8], 16) % len(_locks)]
+
+
+def _can_stream_copy(paths: list[Path]) -> bool:
+    if len({p.suffix.lower() for p in paths}) != 1:
+        return False
+    return len({probe_clip(p) for p in paths}) == 1
+
+
+def _concat_copy(paths: list[Path], output: Path):
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as listing:
+        for p in paths:
+            listing.write(f"file '{p.resolve().as_posix()}'\n")
+    faststart = ["-movflags", "+faststart"] if output.suffix == ".mp4" else []
+    try:
+        subprocess.run(
+            [FFMPEG, "-y", "-v", "error", "-f", "concat", "-safe", "0",
+             "-i", listing.name, "-c", "copy", "-an", *faststart, str(output)],
+            capture_output=True, check=True,
+        )
+    finally:
+        os.unlink(listing.name)
+
+
+def _concat_reencode(paths: list[Path], output: Path):
+    width, height = TARGET_SIZE.split("x")
+    inputs = []
+    filters = []
+    for i, p in enumerate(paths):
+        inputs += ["-i", str(p)]
+        filters.append(
+            f"[{i}:v]scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,fps={TARGET_FPS},format=yuv420p[v{i}]"
+        )
+    graph = ";".join(filters) + ";" + "".join(f"[v{i}]" for i in range(len(paths)))
+    graph += f"concat=n={len(paths)}:v=1:a=0[out]"
+    subprocess.run(
+        [FFMPEG, "-y", "-v", "error", *inputs, "-filter_complex", graph, "-map", "[out]",
+         "-c:v", "libx264", "-preset", "veryfast", "-crf", "23",
+         "-movflags", "+faststart", str(output)],
+        capture_output=True, check=True,
+    )
+
+
+def evict(max_bytes: int = RENDER_CACHE_MAX_BYTES):
+    """Delete least recently used renders until the cache fits in max_bytes."""
+    files = []
+    for p in RENDER_DIR.glob("*"):
+        if p.is_file() and not p.name.startswith("."):
+            stat = p.stat()
+            files.append((stat.st_mtime, stat.st_size, p))
+    total = sum(size for _, size, _ in files)
+    for _, size, p in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            p.unlink()
+            total -= size
+        except OSError:
+            pass
+
+
+def render_sequence(filenames: list[str]) -> str:
+    """
+    Stitch clips (filenames relative to isl_clips/) into one video.
+    Clips with identical codec parameters are stream-copied; anything else
+    is re-encoded to H.264 at TARGET_SIZE / TARGET_FPS.
+    Returns the rendered file's path relative to isl_clips/.
+    Raises RenderError if any clip is missing, rather than render a
+    sentence with signs left out.
+    Renders are cached by the hash of the sequence and each clip's version;
+    hits are touched so size-based eviction drops the least recently used
+    files first.
+    """
+    paths = [CLIPS_DIR / f for f in filenames]
+    clips = []
+    missing = []
+    for f, p in zip(filenames, paths):
+        try:
+            clips.append((Path(f).as_posix(), clip_version(p.stat())))
+        except OSError:
+            missing.append(f)
+    if missing or not paths:
+        raise RenderError(f"Clips missing locally: {', '.join(dict.fromkeys(missing)) or 'none given'}")
+
+    key = render_key(clips)
+    RENDER_DIR.mkdir(parents=True, exist_ok=True)
+
+    with _lock_for(key):
+        for existing in RENDER_DIR.glob(f"{key}.*"):
+            os.utime(existing)
+            return f"{RENDER_DIR.name}/{existing.name}"
+
+        try:
+            copy = _can_stream_copy(paths)
+            suffix = paths[0].suffix.lower() if copy else ".mp4"
+            output = RENDER_DIR / f"{key}{suffix}"
+            # Write to a dot-file first so a half-written render is never served
+            partial = RENDER_DIR / f".{key}.partial{suffix}"
+            if copy:
+                _concat_copy(paths, partial)
+            else:
+                _concat_reencode(paths, partial)
+            os.replace(partial, output)
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise RenderError(f"ffmpeg failed: {e}") from e
+
+    logger.info(f"Rendered {len(paths)} clips → {output.name} ({'copy' if copy else 're-encode'})")
+    evict()
+    return f"{RENDER_DIR.name}/{output.name}"
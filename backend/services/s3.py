@@ -4,14 +4,22 @@ S3 service for audio file uploads
 import boto3
 import os
 from datetime import datetime
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 import logging
 
+from services.aws_executor import run_blocking
+from services.metrics import timed
+
 logger = logging.getLogger(__name__)
 
+# Multipart settings for streamed uploads (S3 minimum part size is 5MB)
+UPLOAD_PART_SIZE = max(5, int(os.getenv('S3_UPLOAD_PART_SIZE_MB', '8'))) * 1024 * 1024
+UPLOAD_CONCURRENCY = int(os.getenv('S3_UPLOAD_CONCURRENCY', '4'))
+
 class S3Service:
-    def __init__(self):
-        self.s3_client = boto3.client(
+    def __init__(self, client=None):
+        self.s3_client = client or boto3.client(
             's3',
             aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
             aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
@@ -19,29 +27,34 @@ class S3Service:
         )
         self.bucket_name = os.getenv('S3_BUCKET_NAME', 'samvad-audio-uploads-dev')
     
-    def upload_audio_file(self, file_content: bytes, file_name: str) -> str:
+    def _upload_key(self, file_name: str) -> str:
+        # Generate unique file name with timestamp
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return f"uploads/{timestamp}_{file_name}"
+    
+    def upload_audio_file(self, file_content: bytes, file_name: str, content_type: str = 'audio/mpeg') -> str:
         """
         Upload audio file to S3 bucket
         
         Args:
             file_content: Audio file content as bytes
             file_name: Original file name
+            content_type: MIME type stored on the object
             
         Returns:
             S3 URI of uploaded file
         """
         try:
-            # Generate unique file name with timestamp
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            s3_key = f"uploads/{timestamp}_{file_name}"
+            s3_key = self._upload_key(file_name)
             
             # Upload to S3
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=s3_key,
-                Body=file_content,
-                ContentType='audio/mpeg'
-            )
+            with timed("s3_upload"):
+                self.s3_client.put_object(
+                    Bucket=self.bucket_name,
+                    Key=s3_key,
+                    Body=file_content,
+                    ContentType=content_type
+                )
             
             # Return S3 URI
             s3_uri = f"s3://{self.bucket_name}/{s3_key}"
@@ -52,6 +65,72 @@ class S3Service:
             logger.error(f"Error uploading to S3: {e}")
             raise Exception(f"Failed to upload audio file: {str(e)}")
     
+    async def upload_audio_file_async(self, file_content: bytes, file_name: str, content_type: str = 'audio/mpeg') -> str:
+        """
+        Upload audio file to S3 on the AWS executor (non-blocking)
+        
+        Args:
+            file_content: Audio file content as bytes
+            file_name: Original file name
+            content_type: MIME type stored on the object
+            
+        Returns:
+            S3 URI of uploaded file
+        """
+        return await run_blocking(self.upload_audio_file, file_content, file_name, content_type)
+    
+    def upload_audio_stream(
+        self,
+        fileobj,
+        file_name: str,
+        content_type: str = 'audio/mpeg',
+        part_size: int = UPLOAD_PART_SIZE,
+        concurrency: int = UPLOAD_CONCURRENCY
+    ) -> str:
+        """
+        Stream a file-like object to S3 using multipart upload
+        
+        The file is read part by part, so memory use is bounded by
+        part_size * concurrency no matter how long the recording is.
+        
+        Args:
+            fileobj: Readable binary file object (e.g. UploadFile.file)
+            file_name: Original file name
+            content_type: MIME type stored on the object
+            part_size: Multipart chunk size in bytes
+            concurrency: Parts uploaded in parallel
+            
+        Returns:
+            S3 URI of uploaded file
+        """
+        try:
+            s3_key = self._upload_key(file_name)
+            with timed("s3_upload"):
+                self.s3_client.upload_fileobj(
+                    fileobj,
+                    self.bucket_name,
+                    s3_key,
+                    ExtraArgs={'ContentType': content_type},
+                    Config=TransferConfig(
+                        multipart_threshold=part_size,
+                        multipart_chunksize=part_size,
+                        max_concurrency=concurrency,
+                        use_threads=concurrency > 1
+                    )
+                )
+            
+            s3_uri = f"s3://{self.bucket_name}/{s3_key}"
+            logger.info(f"Streamed file to S3: {s3_uri}")
+            return s3_uri
+            
+        except ClientError as e:
+            logger.error(f"Error uploading to S3: {e}")
+            raise Exception(f"Failed to upload audio file: {str(e)}")
+    
+    async def upload_audio_stream_async(self, fileobj, file_name: str, content_type: str = 'audio/mpeg') -> str:
+        """Stream a file-like object to S3 on the AWS executor (non-blocking)"""
+        return await run_blocking(self.upload_audio_stream, fileobj, file_name, content_type)
+    
     def get_presigned_url(self, s3_uri: str, expiration: int = 3600) -> str:
         """
         Generate presigned URL for S3 object
@@ -0,0 +1,159 @@
+"""
+Streaming speech recognition backends for the live speech-to-ISL WebSocket
+"""
+import asyncio
+import importlib.util
+import os
+import re
+from typing import AsyncIterator, NamedTuple
+
+SAMPLE_RATE = 16000  # 16kHz, 16-bit little-endian mono PCM
+ASR_BACKENDS = ("aws", "fake")
+
+
+class ASRBackendUnavailable(Exception):
+    pass
+
+
+class TranscriptEvent(NamedTuple):
+    text: str
+    is_final: bool
+    # time.monotonic() at which the newest audio chunk behind this event arrived
+    chunk_time: float
+
+
+class StreamingASRBackend:
+    """
+    Interface for streaming ASR.
+
+    stream() consumes (pcm_bytes, received_at) items from `chunks` until it
+    gets None, yielding TranscriptEvents as partial/final text becomes
+    available. Partial events repeat the whole current utterance.
+    """
+
+    def stream(self, chunks: asyncio.Queue) -> AsyncIterator[TranscriptEvent]:
+        raise NotImplementedError
+
+
+class FakeStreamingASR(StreamingASRBackend):
+    """
+    Deterministic backend for tests and local development; only used when
+    STREAM_ASR_BACKEND=fake is set explicitly.
+    "Recognizes" a fixed script at `words_per_second` of received audio,
+    emitting a partial per word and a final per sentence.
+    """
+
+    def __init__(self, script: str | None = None, words_per_second: float = 3.0):
+        script = script or os.getenv(
+            "STREAM_ASR_FAKE_SCRIPT", "Good morning class. Today we read a new book."
+        )
+        self.sentences = [s.split() for s in re.split(r"[.!?]", script) if s.strip()]
+        self.bytes_per_word = int(SAMPLE_RATE * 2 / words_per_second)
+
+    async def stream(self, chunks: asyncio.Queue) -> AsyncIterator[TranscriptEvent]:
+        received = 0
+        sentence = 0
+        words = 0
+        chunk_time = 0.0
+
+        while True:
+            item = await chunks.get()
+            if item is None:
+                break
+            data, chunk_time = item
+            received += len(data)
+
+            while received >= self.bytes_per_word and sentence < len(self.sentences):
+                received -= self.bytes_per_word
+                words += 1
+                current = self.sentences[sentence]
+                text = " ".join(current[:words])
+                if words == len(current):
+                    yield TranscriptEvent(text, True, chunk_time)
+                    sentence += 1
+                    words = 0
+                else:
+                    yield TranscriptEvent(text, False, chunk_time)
+
+        # Flush a half-spoken sentence when the client stops sending audio
+        if words and sentence < len(self.sentences):
+            yield TranscriptEvent(" ".join(self.sentences[sentence][:words]), True, chunk_time)
+
+
+class AWSTranscribeStreamingASR(StreamingASRBackend):
+    """
+    Amazon Transcribe streaming backend.
+    Requires the optional `amazon-transcribe` package.
+    """
+
+    def __init__(self, language_code: str = "en-IN"):
+        from amazon_transcribe.client import TranscribeStreamingClient
+
+        self.language_code = language_code
+        self.client = TranscribeStreamingClient(region=os.getenv("AWS_REGION", "us-east-1"))
+
+    async def stream(self, chunks: asyncio.Queue) -> AsyncIterator[TranscriptEvent]:
+        stream = await self.client.start_stream_transcription(
+            language_code=self.language_code,
+            media_sample_rate_hz=SAMPLE_RATE,
+            media_encoding="pcm",
+        )
+        last_chunk_time = 0.0
+
+        async def send_audio():
+            nonlocal last_chunk_time
+            while True:
+                item = await chunks.get()
+                if item is None:
+                    break
+                data, last_chunk_time = item
+                await stream.input_stream.send_audio_event(audio_chunk=data)
+            await stream.input_stream.end_stream()
+
+        sender = asyncio.create_task(send_audio())
+        try:
+            async for event in stream.output_stream:
+                for result in getattr(event.transcript, "results", []):
+                    if not result.alternatives:
+                        continue
+                    yield TranscriptEvent(
+                        result.alternatives[0].transcript,
+                        not result.is_partial,
+                        last_chunk_time,
+                    )
+            await sender
+        finally:
+            sender.cancel()
+
+
+def asr_backend_name() -> str:
+    """
+    The configured STREAM_ASR_BACKEND: 'aws' (default) or 'fake'.
+    Raises ValueError for anything else, so a typo fails startup instead
+    of silently serving scripted transcripts.
+    """
+    name = os.getenv("STREAM_ASR_BACKEND", "aws")
+    if name not in ASR_BACKENDS:
+        raise ValueError(f"Unknown STREAM_ASR_BACKEND: {name} (expected one of {', '.join(ASR_BACKENDS)})")
+    return name
+
+
+def asr_backend_available(name: str | None = None) -> bool:
+    """Whether the backend's optional dependencies are installed."""
+    name = name or asr_backend_name()
+    return name != "aws" or importlib.util.find_spec("amazon_transcribe") is not None
+
+
+def create_asr_backend(language_code: str = "en-IN", name: str | None = None) -> StreamingASRBackend:
+    """
+    Build the backend named by STREAM_ASR_BACKEND (see asr_backend_name).
+    Raises ASRBackendUnavailable when the AWS backend's package is missing.
+    """
+    name = name or asr_backend_name()
+    if name == "fake":
+        return FakeStreamingASR()
+    if name == "aws":
+        if not asr_backend_available(name):
+            raise ASRBackendUnavailable("STREAM_ASR_BACKEND=aws needs the amazon-transcribe package")
+        return AWSTranscribeStreamingASR(language_code)
+    raise ValueError(f"Unknown STREAM_ASR_BACKEND: {name}")
@@ -0,0 +1,59 @@
+"""
+Minimal SRT / WebVTT cue parser for batch text-to-ISL conversion
+"""
+import re
+
+# 00:01:02,500 (SRT) or 00:01:02.500 / 01:02.500 (VTT)
+_TIMESTAMP_RE = re.compile(r"(?:(\d+):)?(\d{1,2}):(\d{2})[,.](\d{1,3})")
+_TIMING_LINE_RE = re.compile(r"^\s*(\S+)\s*-->\s*(\S+)")
+# <i>, </b>, <c.yellow>, <00:00:01.000> and SSA-style {\an8} markup
+_MARKUP_RE = re.compile(r"<[^>]*>|\{\\[^}]*\}")
+
+
+def _parse_timestamp(value: str) -> float | None:
+    match = _TIMESTAMP_RE.fullmatch(value.strip())
+    if not match:
+        return None
+    hours, minutes, seconds, millis = match.groups()
+    return (
+        int(hours or 0) * 3600
+        + int(minutes) * 60
+        + int(seconds)
+        + int(millis.ljust(3, "0")) / 1000
+    )
+
+
+def parse_subtitles(content: str) -> list[dict]:
+    """
+    Parse SRT or WebVTT content into cues.
+    Returns list of { start, end, text } with times in seconds.
+    Cue numbers, VTT headers, NOTE/STYLE blocks and inline markup are dropped.
+    """
+    content = content.replace("\r\n", "\n").replace("\r", "\n").lstrip("﻿")
+    cues = []
+
+    for block in re.split(r"\n\s*\n", content):
+        lines = [line for line in block.split("\n") if line.strip()]
+        timing_index = next(
+            (i for i, line in enumerate(lines) if "-->" in line), None
+        )
+        if timing_index is None:
+            continue
+
+        timing = _TIMING_LINE_RE.match(lines[timing_index])
+        if not timing:
+            continue
+
+        text = " ".join(
+            _MARKUP_RE.sub("", line).strip() for line in lines[timing_index + 1:]
+        ).strip()
+        if not text:
+            continue
+
+        cues.append({
+            "start": _parse_timestamp(timing.group(1)),
+            "end": _parse_timestamp(timing.group(2)),
+            "text": text,
+        })
+
+    return cues
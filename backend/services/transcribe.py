@@ -1,92 +1,212 @@
 """
 Amazon Transcribe service for audio-to-text conversion
 """
+import asyncio
 import boto3
 import os
 import time
+import uuid
 import logging
-from botocore.exceptions import ClientError
+from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, HTTPClientError
+
+from services.aws_executor import run_blocking
+from services.metrics import STAGE_SECONDS, timed
 
 logger = logging.getLogger(__name__)
 
+# Poll schedule for a running job: 1s, 1.5s, 2.25s, ... capped at 10s
+POLL_INITIAL_DELAY = 1.0
+POLL_BACKOFF = 1.5
+POLL_MAX_DELAY = 10.0
+JOB_TIMEOUT = 300  # 5 minutes max
+
+# ClientError codes worth asking again about on the next poll
+TRANSIENT_ERROR_CODES = {
+    'ThrottlingException', 'Throttling', 'TooManyRequestsException', 'RequestLimitExceeded',
+    'LimitExceededException', 'ServiceUnavailable', 'ServiceUnavailableException',
+    'InternalFailure', 'InternalFailureException', 'InternalServerException',
+}
+
+
+class TranscribeTransientError(Exception):
+    """A poll failed for a reason that may clear up (throttling, network); the job itself is fine."""
+
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, ClientError):
+        code = error.response.get('Error', {}).get('Code', '')
+        status = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+        return code in TRANSIENT_ERROR_CODES or status >= 500
+    # Endpoint unreachable, connection reset, read timeouts
+    return isinstance(error, (BotoConnectionError, HTTPClientError))
+
+
+def _poll_delays():
+    """Yield exponentially growing poll delays until JOB_TIMEOUT is used up."""
+    delay = POLL_INITIAL_DELAY
+    elapsed = 0.0
+    while elapsed < JOB_TIMEOUT:
+        delay = min(delay, POLL_MAX_DELAY, JOB_TIMEOUT - elapsed)
+        yield delay
+        elapsed += delay
+        delay *= POLL_BACKOFF
+
+
 class TranscribeService:
-    def __init__(self):
-        self.transcribe_client = boto3.client(
+    def __init__(self, client=None):
+        self.transcribe_client = client or boto3.client(
             'transcribe',
             aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
             aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
             region_name=os.getenv('AWS_REGION', 'us-east-1')
         )
     
-    def transcribe_audio(self, s3_uri: str, language_code: str = 'en-US') -> dict:
+    def start_job(self, s3_uri: str, language_code: str = 'en-US', media_format: str = 'mp3') -> str:
         """
-        Transcribe audio file using Amazon Transcribe
+        Start an Amazon Transcribe job
         
         Args:
             s3_uri: S3 URI of audio file
             language_code: Language code (e.g., 'en-US', 'hi-IN', 'ta-IN')
+            media_format: Transcribe MediaFormat (see services.media)
             
         Returns:
-            Dictionary with transcript text and detected language
+            Transcription job name
         """
         try:
-            # Generate unique job name
-            job_name = f"transcribe_{int(time.time())}"
+            # Unique even when several uploads start in the same second
+            job_name = f"transcribe_{int(time.time())}_{uuid.uuid4().hex[:8]}"
             
-            # Start transcription job
             logger.info(f"Starting transcription job: {job_name}")
-            self.transcribe_client.start_transcription_job(
-                TranscriptionJobName=job_name,
-                Media={'MediaFileUri': s3_uri},
-                MediaFormat='mp3',  # or 'wav' based on file type
-                LanguageCode=language_code,
-                Settings={
-                    'ShowSpeakerLabels': False,
-                    'MaxSpeakerLabels': 2
-                }
-            )
+            with timed("transcribe_start"):
+                self.transcribe_client.start_transcription_job(
+                    TranscriptionJobName=job_name,
+                    Media={'MediaFileUri': s3_uri},
+                    MediaFormat=media_format,
+                    LanguageCode=language_code,
+                    Settings={
+                        'ShowSpeakerLabels': False,
+                        'MaxSpeakerLabels': 2
+                    }
+                )
+            return job_name
+            
+        except ClientError as e:
+            logger.error(f"Error in transcription: {e}")
+            raise Exception(f"Transcription error: {str(e)}")
+    
+    def check_job(self, job_name: str, language_code: str) -> dict | None:
+        """
+        Check a transcription job once
+        
+        Args:
+            job_name: Name of transcription job
+            language_code: Language code the job was started with
             
-            # Wait for job to complete
-            max_tries = 60  # 5 minutes max
-            while max_tries > 0:
-                max_tries -= 1
+        Returns:
+            Result dictionary if the job completed, None if still running
+
+        Raises:
+            TranscribeTransientError: the job couldn't be checked this time
+                (throttling, a 5xx or a network error); poll again later
+        """
+        try:
+            with timed("transcribe_poll"):
                 job = self.transcribe_client.get_transcription_job(
                     TranscriptionJobName=job_name
                 )
-                status = job['TranscriptionJob']['TranscriptionJobStatus']
-                
-                if status == 'COMPLETED':
-                    logger.info(f"Transcription job completed: {job_name}")
-                    # Get transcript
-                    transcript_uri = job['TranscriptionJob']['Transcript']['TranscriptFileUri']
-                    transcript_text = self._get_transcript_text(transcript_uri)
-                    
-                    # Clean up job
-                    self._delete_transcription_job(job_name)
-                    
-                    return {
-                        'transcript': transcript_text,
-                        'language_code': language_code,
-                        'job_name': job_name
-                    }
-                    
-                elif status == 'FAILED':
-                    failure_reason = job['TranscriptionJob'].get('FailureReason', 'Unknown')
-                    logger.error(f"Transcription job failed: {failure_reason}")
-                    self._delete_transcription_job(job_name)
-                    raise Exception(f"Transcription failed: {failure_reason}")
-                
-                # Wait before checking again
-                time.sleep(5)
-            
-            # Timeout
-            logger.error(f"Transcription job timed out: {job_name}")
-            self._delete_transcription_job(job_name)
-            raise Exception("Transcription job timed out")
-            
-        except ClientError as e:
+        except (ClientError, BotoConnectionError, HTTPClientError) as e:
+            if _is_transient(e):
+                raise TranscribeTransientError(f"Transcription poll error: {str(e)}") from e
             logger.error(f"Error in transcription: {e}")
             raise Exception(f"Transcription error: {str(e)}")
+        
+        status = job['TranscriptionJob']['TranscriptionJobStatus']
+        
+        if status == 'COMPLETED':
+            logger.info(f"Transcription job completed: {job_name}")
+            # Get transcript
+            transcript_uri = job['TranscriptionJob']['Transcript']['TranscriptFileUri']
+            with timed("transcript_fetch"):
+                transcript_text = self._get_transcript_text(transcript_uri)
+            
+            # Clean up job
+            self.delete_job(job_name)
+            
+            return {
+                'transcript': transcript_text,
+                'language_code': language_code,
+                'job_name': job_name
+            }
+            
+        elif status == 'FAILED':
+            failure_reason = job['TranscriptionJob'].get('FailureReason', 'Unknown')
+            logger.error(f"Transcription job failed: {failure_reason}")
+            self.delete_job(job_name)
+            raise Exception(f"Transcription failed: {failure_reason}")
+        
+        return None
+    
+    def _timeout(self, job_name: str):
+        logger.error(f"Transcription job timed out: {job_name}")
+        self.delete_job(job_name)
+        raise Exception("Transcription job timed out")
+    
+    def transcribe_audio(self, s3_uri: str, language_code: str = 'en-US', media_format: str = 'mp3') -> dict:
+        """
+        Transcribe audio file using Amazon Transcribe (blocking)
+        
+        Args:
+            s3_uri: S3 URI of audio file
+            language_code: Language code (e.g., 'en-US', 'hi-IN', 'ta-IN')
+            media_format: Transcribe MediaFormat (see services.media)
+            
+        Returns:
+            Dictionary with transcript text and detected language
+        """
+        job_name = self.start_job(s3_uri, language_code, media_format)
+        started = time.perf_counter()
+        for delay in _poll_delays():
+            time.sleep(delay)
+            try:
+                result = self.check_job(job_name, language_code)
+            except TranscribeTransientError as e:
+                logger.warning(f"{e}; retrying")
+                continue
+            if result is not None:
+                STAGE_SECONDS.observe(time.perf_counter() - started, stage="transcribe_job")
+                return result
+        self._timeout(job_name)
+    
+    async def transcribe_audio_async(self, s3_uri: str, language_code: str = 'en-US', media_format: str = 'mp3') -> dict:
+        """
+        Transcribe audio file without blocking the event loop
+        
+        boto3 and transcript fetches run on the shared AWS executor and the
+        wait between polls is an asyncio.sleep with exponential backoff.
+        
+        Args:
+            s3_uri: S3 URI of audio file
+            language_code: Language code (e.g., 'en-US', 'hi-IN', 'ta-IN')
+            media_format: Transcribe MediaFormat (see services.media)
+            
+        Returns:
+            Dictionary with transcript text and detected language
+        """
+        job_name = await run_blocking(self.start_job, s3_uri, language_code, media_format)
+        started = time.perf_counter()
+        for delay in _poll_delays():
+            await asyncio.sleep(delay)
+            try:
+                result = await run_blocking(self.check_job, job_name, language_code)
+            except TranscribeTransientError as e:
+                logger.warning(f"{e}; retrying")
+                continue
+            if result is not None:
+                # Queue + processing time inside Transcribe, as seen by polling
+                STAGE_SECONDS.observe(time.perf_counter() - started, stage="transcribe_job")
+                return result
+        await run_blocking(self._timeout, job_name)
     
     def _get_transcript_text(self, transcript_uri: str) -> str:
         """
@@ -102,7 +222,7 @@ class TranscribeService:
         import json
         
         try:
-            response = requests.get(transcript_uri)
+            response = requests.get(transcript_uri, timeout=30)
             response.raise_for_status()
             transcript_json = response.json()
             
@@ -110,11 +230,14 @@ class TranscribeService:
             transcript = transcript_json['results']['transcripts'][0]['transcript']
             return transcript
             
+        except (requests.ConnectionError, requests.Timeout) as e:
+            # The job is kept until the transcript is read, so it can be fetched again
+            raise TranscribeTransientError(f"Failed to fetch transcript: {str(e)}") from e
         except Exception as e:
             logger.error(f"Error fetching transcript: {e}")
             raise Exception(f"Failed to fetch transcript: {str(e)}")
     
-    def _delete_transcription_job(self, job_name: str):
+    def delete_job(self, job_name: str):
         """
         Delete transcription job to clean up
         
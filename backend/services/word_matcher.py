@@ -0,0 +1,155 @@
+"""
+Inflection and typo tolerant word matching for ISL dictionary lookups
+"""
+
+# Fuzzy results memoized per matcher; the memo is dropped when it fills up
+_MEMO_SIZE = 10_000
+_VOWELS = frozenset("aeiou")
+# Regular-looking forms that are words in their own right ("news" is not "new" + s)
+_NOT_INFLECTIONS = frozenset({
+    "news", "means", "goods", "glasses", "always", "series", "species",
+    "physics", "politics", "evening", "morning", "during", "thing", "string",
+})
+
+
+def _doubles(word: str) -> bool:
+    """Short consonant-vowel-consonant words double the final consonant (run → running)."""
+    return (
+        len(word) <= 4
+        and word[-1] not in _VOWELS
+        and word[-1] not in "wxy"
+        and word[-2] in _VOWELS
+        and word[-3] not in _VOWELS
+    )
+
+
+def inflections(word: str) -> set[str]:
+    """
+    Regular plural / third-person, past and -ing forms of a base word
+    ("bird" → birds; "hate" → hates, hated, hating; "run" → running;
+    "study" → studies, studied). Generated from the dictionary word rather
+    than stripped from the token, so "hated" finds HATE and never HAT.
+    """
+    if len(word) < 3 or not word.isalpha():
+        return set()
+    if word.endswith(("s", "x", "z", "ch", "sh")):
+        forms = {word + "es"}
+    elif word[-1] == "y" and word[-2] not in _VOWELS:
+        forms = {word[:-1] + "ies", word[:-1] + "ied"}
+    else:
+        forms = {word + "s"}
+
+    if word.endswith("ie"):
+        forms |= {word + "d", word[:-2] + "ying"}
+    elif word.endswith("ee"):
+        forms |= {word + "d", word + "ing"}
+    elif word.endswith("e"):
+        forms |= {word + "d", word[:-1] + "ing"}
+    elif _doubles(word):
+        forms |= {word + word[-1] + "ed", word + word[-1] + "ing"}
+    else:
+        forms |= {word + "ing"}
+        if not (word[-1] == "y" and word[-2] not in _VOWELS):
+            forms.add(word + "ed")
+    return forms - _NOT_INFLECTIONS
+
+
+def _deletes(word: str, max_edits: int) -> set[str]:
+    """Every string reachable from `word` by deleting up to max_edits characters."""
+    result = {word}
+    frontier = {word}
+    for _ in range(max_edits):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        result |= frontier
+    return result
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance (insert, delete, substitute,
+    swap adjacent). Returns limit + 1 as soon as it must exceed `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def deletion_index(words, max_edits: int, min_length: int = 4, max_length: int = 24) -> dict[str, list[str]]:
+    """
+    SymSpell deletion index: every string reachable from each word by
+    deleting up to `max_edits` characters → the words it came from.
+    Empty when max_edits is 0.
+    """
+    index = {}
+    if max_edits <= 0:
+        return index
+    for word in words:
+        if min_length <= len(word) <= max_length and word.isalpha():
+            for key in _deletes(word, max_edits):
+                index.setdefault(key, []).append(word)
+    return index
+
+
+class FuzzyMatcher:
+    """
+    Typo lookups over a SymSpell-style deletion index.
+
+    Words are indexed under every string reachable by deleting up to
+    `max_edits` characters (see deletion_index). A query generates its
+    own deletes and only the words sharing one are compared, so a lookup
+    costs O(len(token) ** max_edits) index probes plus a few distance
+    checks, independent of how many words are loaded.
+    `candidates(deletion)` returns the words indexed under a string.
+    """
+
+    def __init__(self, candidates, max_edits: int = 1, min_length: int = 4, max_length: int = 24):
+        self.candidates = candidates
+        self.max_edits = max_edits
+        self.min_length = min_length
+        self.max_length = max_length
+        self._memo = {}
+
+    def lookup(self, token: str) -> str | None:
+        """
+        The indexed word closest to `token` within max_edits, or None.
+        Ties go to the word closest in length, then alphabetical order.
+        """
+        if self.max_edits <= 0 or not (self.min_length <= len(token) <= self.max_length) or not token.isalpha():
+            return None
+        try:
+            return self._memo[token]
+        except KeyError:
+            pass
+        if len(self._memo) >= _MEMO_SIZE:
+            self._memo = {}
+        best = self._memo[token] = self._closest(token)
+        return best
+
+    def _closest(self, token: str) -> str | None:
+        best = None
+        best_key = None
+        seen = set()
+        for key in _deletes(token, self.max_edits):
+            for word in self.candidates(key):
+                if word in seen:
+                    continue
+                seen.add(word)
+                distance = edit_distance(token, word, self.max_edits)
+                if distance > self.max_edits:
+                    continue
+                rank = (distance, abs(len(word) - len(token)), word)
+                if best_key is None or rank < best_key:
+                    best, best_key = word, rank
+        return best
@@ -0,0 +1,59 @@
+"""
+Loading ClipIndex from the dictionary JSON and its compiled .idx
+
+python -m pytest tests/test_clip_index.py
+"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services import clip_index  # noqa: E402
+from services.clip_index import ClipIndex, _open_compiled, _stamp  # noqa: E402
+
+
+class CompiledIndexTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.json_path = self.dir / "isl_dictionary.json"
+        self.idx_path = self.dir / "isl_dictionary.idx"
+        self.manifest_path = self.dir / "manifest.json"
+        self.write({"hello": "hello.mp4"})
+
+    def write(self, mapping: dict):
+        self.json_path.write_text(json.dumps(mapping))
+
+    def load(self) -> ClipIndex:
+        return ClipIndex.from_file(self.json_path, self.manifest_path, compiled_path=self.idx_path)
+
+    def current(self) -> bool:
+        return _open_compiled(self.idx_path, _stamp(self.json_path, self.manifest_path)) is not None
+
+    def test_missing_index_is_built(self):
+        self.assertTrue(self.load().lookup("hello"))
+        self.assertTrue(self.current())
+        self.assertEqual([p.name for p in self.dir.iterdir() if p.name.endswith(".partial")], [])
+
+    def test_stale_index_is_rebuilt(self):
+        self.load()
+        self.write({"hello": "hello.mp4", "book": "book.mp4"})
+        os.utime(self.json_path, ns=(1, 1))
+        self.assertFalse(self.current())
+        self.assertTrue(self.load().lookup("book"))
+        self.assertTrue(self.current())
+
+    def test_unwritable_index_falls_back_to_memory(self):
+        with mock.patch.object(clip_index, "build", side_effect=PermissionError("read-only")), \
+                self.assertLogs("services.clip_index", "WARNING"):
+            self.assertTrue(self.load().lookup("hello"))
+        self.assertFalse(self.idx_path.exists())
+
+if __name__ == "__main__":
+    unittest.main()
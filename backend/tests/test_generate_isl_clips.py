@@ -0,0 +1,111 @@
+"""
+The scripts/generate_isl_clips.py scheduler against StubBackend
+
+python -m pytest tests/test_generate_isl_clips.py
+"""
+import json
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import generate_isl_clips  # noqa: E402
+from generate_isl_clips import STATE_NAME, StubBackend, generate_clips  # noqa: E402
+
+
+class ThrottlingException(Exception):
+    pass
+
+
+class RecordingBackend(StubBackend):
+    """
+    StubBackend that records submissions and the most jobs ever in flight,
+    and throttles the first `throttle` submissions.
+    """
+
+    def __init__(self, throttle: int = 0):
+        super().__init__(delay=0)
+        self.throttle = throttle
+        self.submitted = []
+        self.active = set()
+        self.max_active = 0
+
+    def submit(self, word: str, prompt: str, s3_key: str) -> str:
+        if self.throttle:
+            self.throttle -= 1
+            raise ThrottlingException("Too many concurrent invocations")
+        self.submitted.append(word)
+        self.active.add(word)
+        self.max_active = max(self.max_active, len(self.active))
+        return super().submit(word, prompt, s3_key)
+
+    def status(self, arn: str) -> tuple[str, str | None]:
+        status, reason = super().status(arn)
+        if status != "InProgress":
+            self.active.discard(arn.split(":", 2)[2])
+        return status, reason
+
+
+class GenerateClipsTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.output = Path(tmp.name)
+        patcher = mock.patch("builtins.print")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def generate(self, words: list[str], backend, concurrency: int = 5) -> tuple[list, list]:
+        return generate_clips(words, backend, concurrency=concurrency, poll_interval=0, output_dir=self.output)
+
+    def state(self) -> dict:
+        return json.loads((self.output / STATE_NAME).read_text())
+
+    def test_concurrency_limit(self):
+        backend = RecordingBackend()
+        words = ["one", "two", "three", "four", "five"]
+        succeeded, failed = self.generate(words, backend, concurrency=2)
+        self.assertEqual(sorted(succeeded), sorted(words))
+        self.assertEqual(failed, [])
+        self.assertEqual(backend.max_active, 2)
+        self.assertEqual(sorted(p.name for p in self.output.glob("*.mp4")), sorted(f"{w}.mp4" for w in words))
+        self.assertEqual(self.state(), {})
+
+    def test_throttled_submission_is_retried(self):
+        backend = RecordingBackend(throttle=2)
+        with mock.patch.object(generate_isl_clips.time, "sleep") as sleep:
+            succeeded, failed = self.generate(["one", "two"], backend)
+        self.assertEqual(sorted(succeeded), ["one", "two"])
+        self.assertEqual(failed, [])
+        # Each throttle ends the round: the word waits a poll interval before it is tried again
+        self.assertEqual(backend.submitted, ["one", "two"])
+        self.assertGreaterEqual(sleep.call_count, 3)
+
+    def test_failed_jobs_are_reported(self):
+        succeeded, failed = self.generate(["one", "failing"], RecordingBackend())
+        self.assertEqual(succeeded, ["one"])
+        self.assertEqual(failed, ["failing"])
+        self.assertFalse((self.output / "failing.mp4").exists())
+        self.assertEqual(self.state(), {})
+
+    def test_resume_from_state_file(self):
+        (self.output / "one.mp4").write_bytes(b"done before")
+        (self.output / STATE_NAME).write_text(json.dumps({
+            "two": {"arn": f"stub:{time.time()}:two", "submitted_at": time.time()},
+        }))
+        backend = RecordingBackend()
+        succeeded, failed = self.generate(["one", "two", "three"], backend)
+        self.assertEqual(sorted(succeeded), ["one", "three", "two"])
+        # one.mp4 exists and two's invocation is picked up again: only three is submitted
+        self.assertEqual(backend.submitted, ["three"])
+        self.assertEqual((self.output / "one.mp4").read_bytes(), b"done before")
+        self.assertTrue((self.output / "two.mp4").exists())
+        self.assertEqual(self.state(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
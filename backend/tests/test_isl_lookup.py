@@ -0,0 +1,66 @@
+"""
+Clip resolution (services/isl_lookup.py) against a ClipIndex over a temporary clip library
+
+python -m pytest tests/test_isl_lookup.py
+"""
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "scripts"))
+
+import generate_isl_clips  # noqa: E402
+from services.clip_index import ClipIndex, scan_alphabet  # noqa: E402
+from services.isl_lookup import resolve_clips  # noqa: E402
+
+
+class FingerspellTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.clips_dir = Path(cls.tmp.name)
+        for name in ("hello.mp4", "unknown.mp4"):
+            (cls.clips_dir / name).write_bytes(b"clip")
+        # The alphabet set as generate_isl_clips.py --alphabet --stub writes it
+        with mock.patch("builtins.print"):
+            succeeded, failed = generate_isl_clips.generate_clips(
+                list("ravi"), generate_isl_clips.StubBackend(delay=0), poll_interval=0,
+                output_dir=cls.clips_dir / generate_isl_clips.ALPHABET_DIR,
+                prompt_template=generate_isl_clips.ISL_FINGERSPELL_PROMPT_TEMPLATE,
+            )
+        assert sorted(succeeded) == ["a", "i", "r", "v"] and not failed
+        cls.index = ClipIndex(
+            {"hello": "hello.mp4", "UNKNOWN": "unknown.mp4"},
+            clips_dir=cls.clips_dir,
+            fuzzy_edits=0,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_alphabet_is_indexed(self):
+        self.assertEqual(scan_alphabet(self.clips_dir / "alphabet"),
+                         {c: f"alphabet/{c}.mp4" for c in "ravi"})
+
+    def test_unknown_word_is_fingerspelled(self):
+        clips = resolve_clips(["HELLO", "RAVI"], index=self.index, fingerspell="letters")
+        self.assertEqual([c["kind"] for c in clips], ["signed"] + ["fingerspelled"] * 4)
+        self.assertEqual([c["letter"] for c in clips[1:]], ["R", "A", "V", "I"])
+        self.assertTrue(clips[1]["url"].split("?")[0].endswith("/alphabet/r.mp4"))
+
+    def test_fingerspelling_off_keeps_placeholder(self):
+        clips = resolve_clips(["RAVI"], index=self.index)
+        self.assertEqual([c["kind"] for c in clips], ["unknown"])
+
+    def test_missing_letter_keeps_placeholder(self):
+        clips = resolve_clips(["RAVE"], index=self.index, fingerspell="letters")
+        self.assertEqual([c["kind"] for c in clips], ["unknown"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+TranscriptionJobManager polling against a stub Transcribe client
+
+python -m pytest tests/test_jobs.py
+"""
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from botocore.exceptions import ClientError, EndpointConnectionError  # noqa: E402
+
+from services import jobs  # noqa: E402
+from services.jobs import InMemoryJobStore, TranscriptionJobManager  # noqa: E402
+from services.transcribe import TranscribeService  # noqa: E402
+
+
+def client_error(code: str, status: int = 400) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code},
+                        "ResponseMetadata": {"HTTPStatusCode": status}}, "GetTranscriptionJob")
+
+
+class StubTranscribeClient:
+    """get_transcription_job raises `errors` in turn, then reports the job COMPLETED."""
+
+    def __init__(self, *errors: Exception):
+        self.errors = list(errors)
+        self.deleted = []
+
+    def get_transcription_job(self, TranscriptionJobName):
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"TranscriptionJob": {
+            "TranscriptionJobStatus": "COMPLETED",
+            "Transcript": {"TranscriptFileUri": f"stub://{TranscriptionJobName}"},
+        }}
+
+    def delete_transcription_job(self, TranscriptionJobName):
+        self.deleted.append(TranscriptionJobName)
+
+
+class StubTranscribeService(TranscribeService):
+    def _get_transcript_text(self, transcript_uri: str) -> str:
+        return "good morning"
+
+
+class PollTest(unittest.TestCase):
+    def poll(self, client: StubTranscribeClient, polls: int, started_at: float | None = None) -> dict:
+        store = InMemoryJobStore()
+        manager = TranscriptionJobManager(store, None, StubTranscribeService(client=client), poll_interval=1)
+        now = jobs.time.time()
+        store.create({"id": "job", "status": "transcribing", "transcribe_job": "transcribe_1",
+                      "language_code": "en-IN", "created_at": now, "updated_at": now,
+                      "started_at": now if started_at is None else started_at})
+
+        async def run():
+            for _ in range(polls):
+                await manager._check(store.get("job"))
+
+        asyncio.run(run())
+        return store.get("job")
+
+    def test_throttling_is_retried(self):
+        client = StubTranscribeClient(client_error("ThrottlingException"), client_error("InternalFailure", 500),
+                                      EndpointConnectionError(endpoint_url="https://transcribe"))
+        with self.assertLogs("services.jobs", "WARNING"):
+            job = self.poll(client, polls=3)
+        self.assertEqual(job["status"], "transcribing")
+        job = self.poll(StubTranscribeClient(client_error("ThrottlingException")), polls=2)
+        self.assertEqual(job["status"], "completed")
+        self.assertEqual(job["transcript"], "good morning")
+
+    def test_terminal_error_fails_the_job(self):
+        job = self.poll(StubTranscribeClient(client_error("AccessDeniedException")), polls=1)
+        self.assertEqual(job["status"], "failed")
+        self.assertIn("AccessDeniedException", job["error"])
+
+    def test_transient_errors_still_time_out(self):
+        client = StubTranscribeClient(client_error("ThrottlingException"))
+        job = self.poll(client, polls=1, started_at=jobs.time.time() - jobs.JOB_TIMEOUT - 1)
+        self.assertEqual(job["status"], "failed")
+        self.assertEqual(job["error"], "Transcription job timed out")
+        self.assertEqual(client.deleted, ["transcribe_1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
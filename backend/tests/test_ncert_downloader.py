@@ -0,0 +1,221 @@
+"""
+scripts/ncert_downloader.py against a local stub of the DIKSHA content API
+
+python -m pytest tests/test_ncert_downloader.py   (or python -m unittest discover tests)
+"""
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import ncert_downloader  # noqa: E402
+
+VIDEO = bytes(range(256)) * 40  # 10 KB
+
+
+def etag(data: bytes) -> str:
+    return f'"{hashlib.md5(data).hexdigest()}"'
+
+
+class StubDiksha(BaseHTTPRequestHandler):
+    """
+    /api/content/v1/read/<do_id> → content JSON from `contents`
+    /files/<name>                → `video`, honouring Range and If-Range like a CDN
+                                   (`if_range=False`: a server that ignores If-Range)
+    """
+
+    contents = {}
+    requests = []
+    video = VIDEO
+    if_range = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b"", headers: dict | None = None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        type(self).requests.append((path, self.headers.get("Range"), self.headers.get("If-Range")))
+
+        if path.startswith("/api/content/v1/read/"):
+            content = self.contents.get(path.rsplit("/", 1)[1])
+            if content is None:
+                return self._send(404)
+            if content == "garbage":
+                return self._send(200, b"not json", {"Content-Type": "application/json"})
+            return self._send(200, json.dumps({"result": {"content": content}}).encode())
+
+        if path.startswith("/files/"):
+            video = self.video
+            tag = {"ETag": etag(video)}
+            requested = self.headers.get("Range")
+            if_range = self.headers.get("If-Range")
+            if not requested or (self.if_range and if_range and if_range != tag["ETag"]):
+                return self._send(200, video, tag)
+            start = int(requested.split("=")[1].rstrip("-"))
+            if start >= len(video):
+                return self._send(416, headers={"Content-Range": f"bytes */{len(video)}", **tag})
+            return self._send(206, video[start:], {
+                "Content-Range": f"bytes {start}-{len(video) - 1}/{len(video)}", **tag,
+            })
+
+        self._send(404)
+
+
+class DownloaderTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubDiksha)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output = self.tmp.name
+        StubDiksha.requests = []
+        StubDiksha.video = VIDEO
+        StubDiksha.if_range = True
+        StubDiksha.contents = {
+            "do_1": self.video("do_1", "Lesson 1"),
+            # Same title as do_1
+            "do_2": self.video("do_2", "Lesson 1"),
+            "do_garbage": "garbage",
+            "do_nested": {"identifier": "do_nested", "mimeType": ncert_downloader.COLLECTION_MIME,
+                          "children": [{"identifier": "do_2", "mimeType": "video/mp4"}]},
+            "do_book": {"identifier": "do_book", "mimeType": ncert_downloader.COLLECTION_MIME, "children": [
+                {"identifier": "do_1", "mimeType": "video/mp4"},
+                # Listed without its children: must be fetched
+                {"identifier": "do_nested", "mimeType": ncert_downloader.COLLECTION_MIME},
+            ]},
+        }
+        patcher = mock.patch.object(ncert_downloader, "BASE_URL", f"{self.base}/api/content/v1")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def video(self, do_id: str, name: str) -> dict:
+        return {"identifier": do_id, "name": name, "mimeType": "video/mp4",
+                "artifactUrl": f"{self.base}/files/{do_id}.mp4"}
+
+    def run_main(self, *args: str) -> int:
+        argv = ["ncert_downloader.py", "--output", self.output, "--base-url", f"{self.base}/api/content/v1", *args]
+        with mock.patch.object(sys, "argv", argv), mock.patch("builtins.print"):
+            try:
+                ncert_downloader.main()
+            except SystemExit as e:
+                return e.code
+        return 0
+
+    def file_requests(self) -> list:
+        return [r[:2] for r in StubDiksha.requests if r[0].startswith("/files/")]
+
+    def write_partial(self, data: bytes, of: bytes = VIDEO):
+        """An interrupted download of `of`: the first bytes and its validator."""
+        partial = Path(self.output, "lesson_1_do_1.mp4.part")
+        partial.write_bytes(data)
+        Path(str(partial) + ncert_downloader.VALIDATOR_SUFFIX).write_text(
+            json.dumps({"etag": etag(of), "last_modified": None, "size": len(of)}))
+
+    def test_crawl_collection_recurses(self):
+        session = ncert_downloader.make_session()
+        self.assertEqual(sorted(ncert_downloader.crawl_collection("do_book", session)), ["do_1", "do_2"])
+
+    def test_same_title_gets_separate_files(self):
+        self.assertEqual(self.run_main("--ids", "do_1", "do_2"), 0)
+        files = sorted(f for f in os.listdir(self.output) if f.endswith(".mp4"))
+        self.assertEqual(files, ["lesson_1_do_1.mp4", "lesson_1_do_2.mp4"])
+        for name in files:
+            self.assertEqual(Path(self.output, name).read_bytes(), VIDEO)
+
+    def test_failed_item_does_not_abort_the_run(self):
+        code = self.run_main("--ids", "do_garbage", "do_missing", "do_1", "--workers", "1")
+        self.assertEqual(code, 1)
+        self.assertEqual(Path(self.output, "lesson_1_do_1.mp4").read_bytes(), VIDEO)
+
+    def test_rerun_skips_completed(self):
+        self.run_main("--ids", "do_1")
+        StubDiksha.requests = []
+        self.assertEqual(self.run_main("--ids", "do_1"), 0)
+        self.assertEqual(self.file_requests(), [])
+
+    def test_resume_with_range(self):
+        self.write_partial(VIDEO[:1000])
+        self.run_main("--ids", "do_1")
+        self.assertEqual(StubDiksha.requests[-1], ("/files/do_1.mp4", "bytes=1000-", etag(VIDEO)))
+        self.assertEqual(Path(self.output, "lesson_1_do_1.mp4").read_bytes(), VIDEO)
+        self.assertEqual(sorted(os.listdir(self.output)), [ncert_downloader.MANIFEST_NAME, "lesson_1_do_1.mp4"])
+
+    def test_interrupted_download_leaves_validator(self):
+        partial = str(Path(self.output, "lesson_1_do_1.mp4.part"))
+        real_open = open
+
+        def open_failing_partial(path, *args, **kwargs):
+            if path == partial:
+                raise OSError("disk full")
+            return real_open(path, *args, **kwargs)
+
+        with mock.patch("builtins.open", open_failing_partial), mock.patch("builtins.print"):
+            self.assertFalse(ncert_downloader.download_video(StubDiksha.contents["do_1"], self.output))
+        with open(partial + ncert_downloader.VALIDATOR_SUFFIX) as f:
+            self.assertEqual(json.load(f), {"etag": etag(VIDEO), "last_modified": None, "size": len(VIDEO)})
+
+    def test_changed_remote_file_is_downloaded_again(self):
+        changed = VIDEO[::-1] + b"v2"
+        StubDiksha.video = changed
+        self.write_partial(VIDEO[:1000])
+        self.run_main("--ids", "do_1")
+        # If-Range doesn't match: the server sends the whole new file
+        self.assertEqual(self.file_requests(), [("/files/do_1.mp4", "bytes=1000-")])
+        self.assertEqual(Path(self.output, "lesson_1_do_1.mp4").read_bytes(), changed)
+
+    def test_changed_remote_file_without_if_range_support(self):
+        changed = VIDEO[::-1] + b"v2"
+        StubDiksha.video = changed
+        StubDiksha.if_range = False
+        self.write_partial(VIDEO[:1000])
+        self.run_main("--ids", "do_1")
+        # 206 of another object: the partial is discarded, not appended to
+        self.assertEqual(self.file_requests(), [("/files/do_1.mp4", "bytes=1000-"), ("/files/do_1.mp4", None)])
+        self.assertEqual(Path(self.output, "lesson_1_do_1.mp4").read_bytes(), changed)
+
+    def test_partial_without_validator_downloads_again(self):
+        Path(self.output, "lesson_1_do_1.mp4.part").write_bytes(VIDEO[:1000])
+        self.run_main("--ids", "do_1")
+        self.assertEqual(self.file_requests(), [("/files/do_1.mp4", None)])
+        self.assertEqual(Path(self.output, "lesson_1_do_1.mp4").read_bytes(), VIDEO)
+
+    def test_416_with_complete_partial(self):
+        self.write_partial(VIDEO)
+        self.run_main("--ids", "do_1")
+        self.assertEqual(self.file_requests(), [("/files/do_1.mp4", f"bytes={len(VIDEO)}-")])
+        self.assertEqual(Path(self.output, "lesson_1_do_1.mp4").read_bytes(), VIDEO)
+
+    def test_416_with_oversized_partial_downloads_again(self):
+        self.write_partial(VIDEO + b"stale")
+        self.run_main("--ids", "do_1")
+        self.assertEqual(self.file_requests()[-1], ("/files/do_1.mp4", None))
+        self.assertEqual(Path(self.output, "lesson_1_do_1.mp4").read_bytes(), VIDEO)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+scripts/normalize_clips.py job planning and --update-dictionary, with ffmpeg/ffprobe stubbed out
+
+python -m pytest tests/test_normalize_clips.py
+"""
+import json
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import normalize_clips  # noqa: E402
+
+PROBE = {"duration": 1.0, "fps": 25.0, "width": 512, "height": 512,
+         "codec": "h264", "pix_fmt": "yuv420p", "keyframes": [0.0]}
+
+
+class NormalizeClipsTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.clips = self.root / "isl_clips"
+        self.clips.mkdir()
+        self.output = self.root / "normalized"
+        self.dict_path = self.root / "isl_dictionary.json"
+        self.transcoded = []
+        for name, value in (("DICT_PATH", self.dict_path), ("CLIPS_DIR", self.clips),
+                            ("probe", mock.Mock(return_value=PROBE)), ("transcode", self.transcode)):
+            patcher = mock.patch.object(normalize_clips, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def transcode(self, src: Path, dst: Path, *args):
+        self.transcoded.append(src.name)
+        shutil.copyfile(src, dst)
+
+    def setup_library(self, dictionary: dict):
+        self.dict_path.write_text(json.dumps(dictionary))
+        for name in set(dictionary.values()):
+            (self.clips / name).write_bytes(name.encode())
+
+    def run_main(self, *args: str):
+        argv = ["normalize_clips.py", "--input_dir", str(self.clips), "--output_dir", str(self.output),
+                "--workers", "1", *args]
+        with mock.patch.object(sys, "argv", argv), mock.patch("builtins.print"):
+            normalize_clips.main()
+
+    def test_update_dictionary_publishes_clips_first(self):
+        self.setup_library({"hello": "hello.webm", "book": "book.mp4"})
+        original_write = normalize_clips.write_dictionary
+
+        def write_dictionary(dictionary):
+            for clip in dictionary.values():
+                self.assertTrue((self.clips / clip).exists(), clip)
+            original_write(dictionary)
+
+        with mock.patch.object(normalize_clips, "write_dictionary", write_dictionary):
+            self.run_main("--update-dictionary")
+        self.assertEqual(json.loads(self.dict_path.read_text()), {"hello": "hello.mp4", "book": "book.mp4"})
+        self.assertEqual((self.clips / "hello.mp4").read_bytes(), b"hello.webm")
+        manifest = json.loads((self.clips / normalize_clips.MANIFEST_NAME).read_text())
+        self.assertIn("hello.mp4", manifest["clips"])
+        self.assertEqual([p.name for p in self.clips.iterdir() if p.name.endswith(".partial")], [])
+
+    def test_same_stem_sources_are_refused(self):
+        self.setup_library({"hello": "hello.webm", "hi": "hello.mp4"})
+        with self.assertRaises(SystemExit):
+            self.run_main("--update-dictionary")
+        self.assertEqual(self.transcoded, [])
+        self.assertEqual(json.loads(self.dict_path.read_text()), {"hello": "hello.webm", "hi": "hello.mp4"})
+
+    def test_overwriting_another_referenced_clip_is_refused(self):
+        self.setup_library({"hello": "hello.webm", "hi": "hello.mp4"})
+        with self.assertRaises(SystemExit):
+            self.run_main("--files", "hello.webm")
+        self.assertEqual(self.transcoded, [])
+
+    def test_find_collisions(self):
+        jobs = [(Path("a.webm"), Path("out/a.mp4")), (Path("b.mp4"), Path("out/b.mp4"))]
+        self.assertEqual(normalize_clips.find_collisions(jobs, {"a.webm", "b.mp4"}), {})
+        self.assertEqual(normalize_clips.find_collisions(jobs, {"a.webm", "a.mp4"}), {"a.mp4": ["a.webm", "a.mp4"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
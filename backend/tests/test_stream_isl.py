@@ -0,0 +1,95 @@
+"""
+WS /ws/stream-isl end to end with the fake streaming ASR backend
+
+python -m pytest tests/test_stream_isl.py
+"""
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from starlette.websockets import WebSocketDisconnect  # noqa: E402
+
+from routes.stream_isl import MAX_CHUNK_BYTES, _new_tokens, router  # noqa: E402
+from services import streaming_asr  # noqa: E402
+from services.isl_grammar import get_gloss_engine  # noqa: E402
+
+# Audio for one word at the fake backend's default 3 words per second
+WORD_BYTES = streaming_asr.SAMPLE_RATE * 2 // 3 + 1
+
+
+class StreamISLTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        app = FastAPI()
+        app.include_router(router)
+        cls.client = TestClient(app)
+
+    def stream(self, script: str, words: int, chunk: int = WORD_BYTES) -> tuple[list, int]:
+        """Send `words` words of audio for `script`; (messages received, close code)."""
+        env = {"STREAM_ASR_BACKEND": "fake", "STREAM_ASR_FAKE_SCRIPT": script}
+        messages = []
+        with mock.patch.dict(os.environ, env), self.client.websocket_connect("/ws/stream-isl") as ws:
+            for _ in range(words):
+                ws.send_bytes(b"\0" * chunk)
+            ws.send_text("end")
+            while True:
+                try:
+                    messages.append(ws.receive_json())
+                except WebSocketDisconnect as e:
+                    return messages, e.code
+
+    def test_partials_send_each_sign_once(self):
+        text = "Today we read a new book"
+        messages, code = self.stream(text + ".", words=6)
+        self.assertEqual(code, 1000)
+        signs = [m for m in messages if m["type"] in ("partial", "final")]
+        self.assertEqual([m["type"] for m in signs][-1], "final")
+        self.assertFalse(any(m["replace"] for m in signs))
+        sent = [token for m in signs for token in m["gloss"]]
+        self.assertEqual(sent, get_gloss_engine().convert(text))
+        self.assertEqual([c["word"] for m in signs for c in m["clips"]], sent)
+        self.assertEqual(messages[-1]["type"], "summary")
+
+    def test_reordered_gloss_is_sent_as_replace(self):
+        # "good" alone, then the phrase "good morning" replaces it
+        messages, _ = self.stream("Good morning class.", words=3)
+        signs = [m for m in messages if m["type"] in ("partial", "final")]
+        self.assertEqual(signs[0]["gloss"], ["GOOD"])
+        final = signs[-1]
+        self.assertTrue(final["replace"])
+        self.assertEqual(final["gloss"], get_gloss_engine().convert("Good morning class"))
+
+    def test_half_spoken_sentence_is_flushed_as_final(self):
+        messages, _ = self.stream("Today we read a new book.", words=2)
+        finals = [m for m in messages if m["type"] == "final"]
+        self.assertEqual(len(finals), 1)
+        self.assertEqual(finals[0]["text"], "Today we")
+
+    def test_oversized_chunk_closes_without_errors(self):
+        with self.assertNoLogs("routes.stream_isl", "ERROR"):
+            _, code = self.stream("Hello.", words=1, chunk=MAX_CHUNK_BYTES + 1)
+        self.assertEqual(code, 1009)
+
+    def test_missing_aws_package_closes_with_error(self):
+        with mock.patch.dict(os.environ, {"STREAM_ASR_BACKEND": "aws"}), \
+                mock.patch.object(streaming_asr.importlib.util, "find_spec", return_value=None), \
+                self.client.websocket_connect("/ws/stream-isl") as ws:
+            self.assertEqual(ws.receive_json()["type"], "error")
+            with self.assertRaises(WebSocketDisconnect) as closed:
+                ws.receive_json()
+        self.assertEqual(closed.exception.code, 1011)
+
+    def test_new_tokens(self):
+        self.assertEqual(_new_tokens(["A"], ["A", "B"]), ["B"])
+        self.assertEqual(_new_tokens([], ["A"]), ["A"])
+        self.assertIsNone(_new_tokens(["GOOD"], ["GOOD MORNING"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
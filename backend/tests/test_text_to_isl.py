@@ -0,0 +1,64 @@
+"""
+/api/text-to-isl routes in-process, against the shipped dictionary and clips
+
+python -m pytest tests/test_text_to_isl.py
+"""
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from routes import text_to_isl  # noqa: E402
+from routes.text_to_isl import gloss_cache, router  # noqa: E402
+from services import isl_grammar  # noqa: E402
+
+
+class TextToISLTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        app = FastAPI()
+        app.include_router(router)
+        cls.client = TestClient(app)
+
+    def setUp(self):
+        gloss_cache.clear()
+
+    def post(self, text: str, **fields) -> dict:
+        response = self.client.post("/api/text-to-isl", json={"text": text, **fields})
+        self.assertEqual(response.status_code, 200, response.text)
+        return response.json()
+
+    def test_numbers_are_dropped_without_fingerspelling(self):
+        result = self.post("It's 2024 now")
+        self.assertEqual(result["gloss"], ["NOW"])
+        self.assertEqual([c["kind"] for c in result["clips"]], ["signed"])
+
+    def test_numbers_are_kept_for_fingerspelling(self):
+        result = self.post("It's 2024 now", fingerspell="letters")
+        self.assertEqual(result["gloss"], ["NOW", "2024"])
+
+    def test_batch_process_count_is_not_client_controlled(self):
+        convert_many = mock.Mock(return_value=[["HELLO"]])
+        with mock.patch.object(isl_grammar.GlossEngine, "convert_many", convert_many):
+            response = self.client.post("/api/text-to-isl/batch", json={"texts": ["hello"], "n_process": 8})
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual(convert_many.call_args.kwargs["n_process"], text_to_isl.NLP_PROCESSES)
+
+    def test_linguistic_mode_without_spacy_model_is_503(self):
+        with mock.patch.object(isl_grammar, "SPACY_MODEL", "no_such_spacy_model"), \
+                mock.patch.object(isl_grammar, "_nlp", None), \
+                mock.patch.object(isl_grammar, "_nlp_error", None):
+            response = self.client.post("/api/text-to-isl", json={"text": "hello", "gloss_mode": "linguistic"})
+            self.assertEqual(response.status_code, 503)
+            self.assertIn("no_such_spacy_model", response.json()["detail"])
+            batch = self.client.post("/api/text-to-isl/batch", json={"texts": ["hello"], "gloss_mode": "linguistic"})
+            self.assertEqual(batch.status_code, 503)
+
+
+if __name__ == "__main__":
+    unittest.main()
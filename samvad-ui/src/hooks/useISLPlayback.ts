@@ -21,6 +21,10 @@ export function useISLPlayback(
             if (!videoRef.current || clips.length === 0) return;
 
             const video = videoRef.current;
+            // Off-screen element that downloads the upcoming clip while the current one plays
+            const prefetch = document.createElement('video');
+            prefetch.preload = 'auto';
+            prefetch.muted = true;
 
             function loadNext(index: number) {
                 if (index >= clips.length) {
@@ -33,6 +37,9 @@ export function useISLPlayback(
                 setState({ isPlaying: true, currentIndex: index, currentWord: clip.word });
                 video.play().catch(console.error);
                 video.onended = () => loadNext(index + 1);
+                if (index + 1 < clips.length && clips[index + 1].url !== clip.url) {
+                    prefetch.src = clips[index + 1].url;
+                }
             }
 
             loadNext(0);
@@ -2,26 +2,57 @@ export interface ClipItem {
     word: string;
     url: string;
     found: boolean;
+    duration?: number | null;
+    bytes?: number | null;
+    kind?: 'signed' | 'lemma' | 'fingerspelled' | 'fuzzy' | 'unknown';
+    letter?: string | null;
+}
+
+export interface CoverageBreakdown {
+    signed: number;
+    lemma: number;
+    fingerspelled: number;
+    fuzzy: number;
+    unknown: number;
+}
+
+export type FingerspellMode = 'off' | 'letters' | 'word';
+
+export interface PlaybackItem {
+    url: string;
+    start?: number | null;
+    duration?: number | null;
+    bytes?: number | null;
+}
+
+export interface PlaybackManifest {
+    speed: number;
+    duration?: number | null;
+    items: PlaybackItem[];
 }
 
 export interface TextToISLResponse {
     gloss: string[];
     clips: ClipItem[];
     coverage: number;
+    breakdown?: CoverageBreakdown;
     mode: string;
+    render_url?: string | null;
+    playback?: PlaybackManifest | null;
 }
 
 export async function translateToISL(
     text: string,
     speed: number,
-    persona: string
+    persona: string,
+    fingerspell: FingerspellMode = 'off'
 ): Promise<TextToISLResponse> {
     const res = await fetch(
         `${import.meta.env.VITE_API_URL}/api/text-to-isl`,
         {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ text, speed, persona }),
+            body: JSON.stringify({ text, speed, persona, fingerspell }),
         }
     );
     if (!res.ok) throw new Error(`Translation failed: ${res.status}`);